@@ -0,0 +1,155 @@
+"""Per-step rerun latency and allocation benchmark for app.py, built on AppTest.
+
+Each scenario drives a fresh AppTest session to its step with test_app.run_to_step, then
+repeats one action: a plain rerun of the whole script at that step, or a widget change
+(each repetition alternates the widget between two values, so every run sees a real
+change). Wall time is taken over `repeats` runs and reported as p50/p99; allocation
+(tracemalloc peak during the run) over a separate `memory_repeats` runs, because tracing
+slows the script down and would distort the timings.
+
+AppTest compiles app.py afresh on every run, where a server session reuses the bytecode;
+that cost is measured on its own (script_compile_overhead) and reported alongside, since
+it sets the allocation floor of every scenario.
+
+    python benchmark_app.py --repeats 50 --save app_latency.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from test_app import run_to_step
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DEFAULT_REPEATS = 30
+DEFAULT_MEMORY_REPEATS = 5
+LATENCY_PERCENTILES = (50, 99)
+
+
+def _rerun(at, i):
+    at.run()
+
+
+def _toggle(kind, key, values):
+    def action(at, i):
+        getattr(at, kind)(key=key).set_value(values[i % 2]).run()
+    return action
+
+
+# {name: (step, action(at, repetition))}
+SCENARIOS = {
+    **{f'Step {step} rerun': (step, _rerun) for step in range(1, 7)},
+    'Step 2 rating slider': (2, _toggle('slider', 'current_rating_data_infrastructure', (2, 4))),
+    'Step 3 success probability slider': (3, _toggle('slider', 'prob_success_predictive_maintenance', (0.6, 0.8))),
+    'Step 4 planning horizon slider': (4, _toggle('slider', 'planning_horizon', (4, 3))),
+    'Step 5 fund budget input': (5, _toggle('number_input', 'fund_budget_M', (12.0, 10.0))),
+    'Step 6 exit readiness slider': (6, _toggle('slider', 'visible_score', (60, 75))),
+}
+
+
+def _session_at_step(step, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    return run_to_step(at, step)
+
+
+def _percentiles(values):
+    return dict(zip((f'p{p}' for p in LATENCY_PERCENTILES), np.percentile(values, LATENCY_PERCENTILES).tolist()))
+
+
+def run_scenario(name, repeats=DEFAULT_REPEATS, memory_repeats=DEFAULT_MEMORY_REPEATS, timeout=60):
+    """
+    Time one scenario: {'step', 'repeats', 'seconds': {'p50', 'p99', 'mean'},
+    'peak_memory_bytes': {'p50', 'p99'}}.
+    """
+    step, action = SCENARIOS[name]
+    at = _session_at_step(step, timeout)
+    action(at, 0)  # warm-up: the first change of a widget also builds its caches
+
+    seconds = []
+    for i in range(1, repeats + 1):
+        start = time.perf_counter()
+        action(at, i)
+        seconds.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(f"{name} raised in the app: {at.exception[0].message}")
+
+    peaks = []
+    for i in range(repeats + 1, repeats + 1 + memory_repeats):
+        tracemalloc.start()
+        try:
+            action(at, i)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    assert at.session_state['current_step'] == step
+    return {
+        'step': step,
+        'repeats': repeats,
+        'seconds': {**_percentiles(seconds), 'mean': float(np.mean(seconds))},
+        'peak_memory_bytes': _percentiles(peaks) if peaks else {},
+    }
+
+
+def script_compile_overhead(repeats=5):
+    """Median seconds and peak bytes of compiling app.py, which every AppTest run includes."""
+    with open(APP_PATH) as f:
+        source = f.read()
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        compile(source, APP_PATH, 'exec')
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        compile(source, APP_PATH, 'exec')
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': float(np.median(seconds)), 'peak_memory_bytes': peak}
+
+
+def run_app_benchmarks(names=None, repeats=DEFAULT_REPEATS, memory_repeats=DEFAULT_MEMORY_REPEATS, progress=None):
+    """Run the named scenarios (default: all); {name: run_scenario(...)}."""
+    results = {}
+    for name in (SCENARIOS if names is None else names):
+        results[name] = run_scenario(name, repeats, memory_repeats)
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def _print_row(name, result):
+    seconds, peaks = result['seconds'], result['peak_memory_bytes']
+    memory = f"{peaks['p50'] / 2**20:>8.1f} / {peaks['p99'] / 2**20:>6.1f} MiB" if peaks else ''
+    print(f"{name:<36} p50 {seconds['p50'] * 1e3:>8.1f} ms  p99 {seconds['p99'] * 1e3:>8.1f} ms  {memory}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-step rerun latency and allocation of app.py under AppTest.")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), metavar='SCENARIO',
+                        help="scenarios to run (default: all)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="timed runs per scenario")
+    parser.add_argument('--memory-repeats', type=int, default=DEFAULT_MEMORY_REPEATS,
+                        help="additional runs per scenario under tracemalloc")
+    parser.add_argument('--save', help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    overhead = script_compile_overhead()
+    print(f"AppTest recompiles app.py on every run: {overhead['seconds'] * 1e3:.1f} ms, "
+          f"{overhead['peak_memory_bytes'] / 2**20:.1f} MiB peak (included below)")
+    print(f"{'':<36} {'wall time':^34}  peak alloc p50 / p99")
+    results = run_app_benchmarks(args.scenarios, args.repeats, args.memory_repeats, progress=_print_row)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'script_compile': overhead, 'scenarios': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
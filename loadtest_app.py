@@ -0,0 +1,236 @@
+"""Concurrent-session load test of app.py, built on AppTest.
+
+Each simulated analyst walks Steps 1-6 like test_app.run_to_step, making `interactions`
+random changes at every step (a slider, multiselect or number input of the main area, set
+to a random allowed value) before moving on. N analysts run at once on threads of this
+process, so they share the process-wide caches, reference data and GIL the way sessions of
+one Streamlit server do; every script run is timed. For each N the report gives throughput
+(script runs per second), p50/p95/p99 rerun latency and the growth of the process's resident
+memory (after one warm-up session has done the imports and filled the process-wide caches),
+and the largest N whose p95 stays within --p95-budget is reported as the capacity.
+
+`--think-time` adds a random pause (exponential, that mean in seconds) after every
+interaction; 0 (the default) makes every analyst click as fast as the app answers, the worst
+case. As in benchmark_app, AppTest recompiles app.py on every run, which a server does not.
+
+    python loadtest_app.py --sessions 1 2 4 8 --interactions 3 --save load.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import streamlit.config
+import streamlit.logger
+import streamlit.testing.v1.app_test as app_test
+from streamlit.runtime.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+from benchmark_app import APP_PATH
+from planner.metrics import resident_memory_bytes
+from test_app import run_to_step
+
+DEFAULT_SESSIONS = (1, 2, 4, 8)
+DEFAULT_INTERACTIONS = 3
+DEFAULT_P95_BUDGET = 2.0
+LATENCY_PERCENTILES = (50, 95, 99)
+LAST_STEP = 6
+
+
+# --- Running AppTest sessions concurrently ---
+
+class _KeepRuntime(type):
+    def __setattr__(cls, name, value):
+        # AppTest installs a fresh mock Runtime for each run and clears it afterwards, which
+        # pulls the runtime from under runs in other threads: forward installs, drop clears
+        if name == '_instance':
+            if value is not None:
+                Runtime._instance = value
+            return
+        super().__setattr__(name, value)
+
+
+class _SharedRuntime(Runtime, metaclass=_KeepRuntime):
+    pass
+
+
+@contextlib.contextmanager
+def concurrent_apptest():
+    """While active, AppTest runs on several threads at once no longer clear each other's runtime or config."""
+    with mock.patch.object(app_test, 'Runtime', _SharedRuntime), patch_config_options({'global.appTest': True}):
+        try:
+            yield
+        finally:
+            Runtime._instance = None
+
+
+# --- Simulated analysts ---
+
+def _interactive_widgets(at):
+    widgets = [*at.main.slider, *at.main.multiselect, *at.main.number_input]
+    # Range sliders (tuple values) are left alone
+    return [w for w in widgets if not w.disabled and (w.type == 'multiselect' or not isinstance(w.value, (list, tuple)))]
+
+
+def _random_value(widget, rng):
+    if widget.type == 'multiselect':
+        most = min(len(widget.options), widget.max_selections or 3, 3)
+        return [str(o) for o in rng.choice(widget.options, rng.integers(1, most + 1), replace=False)]
+    value, step = widget.value, widget.step or 1
+    low = widget.min if widget.min is not None else value * 0.5
+    high = widget.max if widget.max is not None else value * 1.5 + step
+    chosen = low + step * rng.integers(0, int((high - low) / step) + 1)
+    return int(round(chosen)) if isinstance(value, int) else round(float(chosen), 6)
+
+
+def _set(widget, value):
+    return widget.set_values(value) if widget.type == 'multiselect' else widget.set_value(value)
+
+
+def analyst_session(seed, interactions=DEFAULT_INTERACTIONS, think_time=0.0, timeout=120):
+    """
+    One simulated analyst; returns {'latencies': [(step, seconds), ...] of every script run,
+    'error': None or the message of the failure that ended the session}.
+    """
+    rng = np.random.default_rng(seed)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    latencies = []
+    run_script = at._run
+
+    def timed_run(*args, **kwargs):
+        # Every run (widget change, button click, navigation) goes through AppTest._run
+        start = time.perf_counter()
+        result = run_script(*args, **kwargs)
+        latencies.append((at.session_state['current_step'], time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return result
+    at._run = timed_run
+
+    try:
+        at.run()
+        for step in range(1, LAST_STEP + 1):
+            run_to_step(at, step, initial_run=False)
+            for _ in range(interactions):
+                widgets = _interactive_widgets(at)
+                if widgets:
+                    widget = widgets[rng.integers(len(widgets))]
+                    _set(widget, _random_value(widget, rng)).run()
+                if think_time:
+                    time.sleep(rng.exponential(think_time))
+    except Exception as e:
+        return {'latencies': latencies, 'error': f"{type(e).__name__}: {e}"}
+    return {'latencies': latencies, 'error': None}
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    return dict(zip((f'p{p}' for p in LATENCY_PERCENTILES), np.percentile(values, LATENCY_PERCENTILES).tolist()))
+
+
+def run_load(n_sessions, interactions=DEFAULT_INTERACTIONS, think_time=0.0, seed=0, timeout=120):
+    """
+    Run `n_sessions` analysts at once; {'sessions', 'runs', 'errors', 'wall_seconds',
+    'runs_per_second', 'latency_seconds': {'p50', 'p95', 'p99'}, 'latency_by_step':
+    {step: {'p50', ...}}, 'rss_before_bytes', 'rss_after_bytes', 'rss_growth_bytes'}.
+    """
+    gc.collect()
+    rss_before = resident_memory_bytes()
+    results = [None] * n_sessions
+
+    def run(i):
+        results[i] = analyst_session(seed * 10_000 + i, interactions, think_time, timeout)
+
+    threads = [threading.Thread(target=run, args=(i,), name=f'analyst-{i}') for i in range(n_sessions)]
+    start = time.perf_counter()
+    with concurrent_apptest():
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall_seconds = time.perf_counter() - start
+    gc.collect()
+    rss_after = resident_memory_bytes()
+
+    latencies = [latency for result in results for latency in result['latencies']]
+    seconds = [s for _, s in latencies]
+    by_step = {}
+    for step, s in latencies:
+        by_step.setdefault(step, []).append(s)
+    return {
+        'sessions': n_sessions,
+        'runs': len(seconds),
+        'errors': [result['error'] for result in results if result['error']],
+        'wall_seconds': wall_seconds,
+        'runs_per_second': len(seconds) / wall_seconds,
+        'latency_seconds': _percentiles(seconds),
+        'latency_by_step': {str(step): _percentiles(by_step[step]) for step in sorted(by_step)},
+        'rss_before_bytes': rss_before,
+        'rss_after_bytes': rss_after,
+        'rss_growth_bytes': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def capacity(levels, p95_budget=DEFAULT_P95_BUDGET):
+    """Largest session count whose run completed without errors and within the p95 budget (0 if none)."""
+    within = [level['sessions'] for level in levels
+              if not level['errors'] and level['latency_seconds'].get('p95', np.inf) <= p95_budget]
+    return max(within, default=0)
+
+
+def _print_level(level):
+    latency, growth = level['latency_seconds'], level['rss_growth_bytes']
+    memory = f"{growth / 2**20:>+8.1f} MiB" if growth is not None else ''
+    print(f"{level['sessions']:>8} {level['runs']:>6} {level['runs_per_second']:>8.2f}/s "
+          f"{latency['p50'] * 1e3:>8.0f} {latency['p95'] * 1e3:>8.0f} {latency['p99'] * 1e3:>8.0f} ms  {memory}"
+          + (f"  {len(level['errors'])} failed: {level['errors'][0]}" if level['errors'] else ''), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent simulated analyst sessions against app.py under AppTest.")
+    parser.add_argument('--sessions', nargs='+', type=int, default=list(DEFAULT_SESSIONS),
+                        help="concurrent session counts to run, one load level each")
+    parser.add_argument('--interactions', type=int, default=DEFAULT_INTERACTIONS,
+                        help="random widget changes per step and session")
+    parser.add_argument('--think-time', type=float, default=0.0, help="mean pause after each interaction, seconds")
+    parser.add_argument('--p95-budget', type=float, default=DEFAULT_P95_BUDGET,
+                        help="p95 rerun latency (seconds) a load level must stay within to count as served")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # Bare-mode script threads and the app's own widget warnings would log once per run; the
+    # config is parsed first, since parsing it resets the log level
+    streamlit.config.get_config_options()
+    streamlit.logger.set_log_level('error')
+    with concurrent_apptest():
+        # Imports and process-wide caches are filled once here, not counted as memory growth
+        warm_up = analyst_session(args.seed, interactions=1)
+    if warm_up['error']:
+        print(f"error: warm-up session failed: {warm_up['error']}", file=sys.stderr)
+        return 1
+
+    print(f"{'sessions':>8} {'runs':>6} {'throughput':>10} {'p50':>8} {'p95':>8} {'p99':>8}     RSS growth")
+    levels = []
+    for n_sessions in args.sessions:
+        levels.append(run_load(n_sessions, args.interactions, args.think_time, args.seed))
+        _print_level(levels[-1])
+    served = capacity(levels, args.p95_budget)
+    print(f"Capacity: {served} concurrent sessions within p95 <= {args.p95_budget:g}s")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'interactions': args.interactions, 'think_time': args.think_time,
+                       'p95_budget': args.p95_budget, 'capacity': served, 'levels': levels}, f, indent=2)
+    return 1 if any(level['errors'] for level in levels) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
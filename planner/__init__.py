@@ -0,0 +1 @@
+"""Library code behind the QuLab AI Value Creation & Investment Efficiency Planner."""
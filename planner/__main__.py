@@ -0,0 +1,39 @@
+"""Command-line batch runner: `python -m planner companies.parquet scored.parquet`."""
+import argparse
+import os
+import sys
+import time
+
+from planner.ingest import DEFAULT_CHUNK_ROWS
+from planner.pipeline import run_pipeline, write_pipeline_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m planner',
+        description="Run every company in a portfolio file through the full planner pipeline "
+                    "(screening, Org-AI-R, default initiatives, multi-year plan, AIE, "
+                    "portfolio benchmarks and exit valuation).")
+    parser.add_argument('input', help="CSV or Parquet file: Company, Sector, EBITDA ($M) and one 1-5 rating column per dimension")
+    parser.add_argument('output', help="where to write the results; .parquet/.pq for Parquet, .csv for CSV")
+    parser.add_argument('--years', type=int, choices=range(1, 6), default=3, metavar='{1..5}',
+                        help="planning horizon in years, as the Step 4 slider (default 3)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"companies per work item (default {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        results = run_pipeline(args.input, total_years=args.years, chunk_rows=args.chunk_rows, n_workers=args.workers)
+        write_pipeline_results(results, args.output)
+    except (ValueError, KeyError, ImportError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"Scored {len(results):,} companies in {time.perf_counter() - start:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Fund-level allocation of an AI budget across every portfolio company.
+
+Posed as a multiple-choice knapsack: each company contributes one "option" per budget level,
+namely its best initiative set at that cost (the exact per-company knapsack frontier from
+planner.optimize). Picking one option per company under the fund budget is solved exactly by
+dynamic programming over the fund budget in $0.01M steps, one company at a time, trying each
+of its frontier breakpoints; the cost is companies x breakpoints x budget steps as vector ops.
+
+Portfolio AIE, (sum Delta Org-AI-R / sum Investment) x sum EBITDA, does not decompose by
+company, so that objective pools every candidate into planner.optimize's AIE local search.
+"""
+import numpy as np
+import pandas as pd
+
+from planner.batch import (
+    DIMENSIONS, estimate_project_parameters_batch, portfolio_use_case_rows, score_companies, sector_index,
+)
+from planner.memo import cached_simulate_dimension_ratings
+from planner.optimize import (
+    COST_RESOLUTION_M, candidate_contributions, cost_units, knapsack_table, knapsack_selection,
+    local_search_aie, aie_from_totals, VALUE_TOLERANCE,
+)
+from planner.profiling import profiled
+
+ALLOCATION_OBJECTIVES = ('ebitda', 'org_ai_r', 'aie')
+
+
+def portfolio_candidates(companies_df, company_column='Company'):
+    """
+    Default-estimated candidate initiatives for every company x sector use case.
+
+    Uses a 'Current V_org_R' column when present, otherwise scores each company's simulated
+    current dimension ratings the way the app does when a company is selected.
+    """
+    companies = companies_df.copy()
+    if 'Current V_org_R' not in companies:
+        ratings = np.array([
+            cached_simulate_dimension_ratings(name, sector, is_target=False).reindex(DIMENSIONS).to_numpy()
+            for name, sector in zip(companies[company_column], companies['Sector'])
+        ], dtype=np.float64).reshape(len(companies), len(DIMENSIONS))
+        companies['Current V_org_R'] = score_companies(ratings, sector_index(companies['Sector']))['V_org_R']
+    rows = portfolio_use_case_rows(companies)
+    estimates = estimate_project_parameters_batch(rows)
+    return pd.concat([rows[[company_column, 'Sector']], estimates], axis=1)
+
+
+def _company_frontier(units, value, capacity):
+    """Breakpoints (cost units, value, selected positions) of one company's knapsack frontier."""
+    best, take = knapsack_table(units, value, capacity)
+    breakpoints = np.flatnonzero(np.diff(best, prepend=-np.inf) > VALUE_TOLERANCE)
+    return [(int(c), float(best[c]), knapsack_selection(take, units, int(c))) for c in breakpoints]
+
+
+def _allocate_additive(frontiers, capacity):
+    """
+    Exact multiple-choice knapsack over the company frontiers: best[b] is the highest fund
+    value with total cost <= b over the companies seen so far, each picking one of its
+    breakpoints. Returns the chosen breakpoint per company and the optimal value.
+    """
+    capacity = min(capacity, sum(points[-1][0] for points in frontiers))
+    best = np.zeros(capacity + 1)
+    choice = np.zeros((len(frontiers), capacity + 1), dtype=np.int32)
+    for company, points in enumerate(frontiers):
+        # Breakpoint 0 costs nothing, so every budget keeps a feasible option
+        updated = best.copy()
+        for j, (c, v, _) in enumerate(points[1:], start=1):
+            if c > capacity:
+                break
+            candidate = best[:capacity + 1 - c] + v
+            improves = candidate > updated[c:] + VALUE_TOLERANCE
+            choice[company, c:][improves] = j
+            updated[c:] = np.where(improves, candidate, updated[c:])
+        best = updated
+
+    position, b = [0] * len(frontiers), capacity
+    for company in range(len(frontiers) - 1, -1, -1):
+        position[company] = int(choice[company, b])
+        b -= frontiers[company][position[company]][0]
+    return position, float(best[capacity])
+
+
+@profiled
+def allocate_fund_budget(candidates_df, budget_M, total_years=3, objective='ebitda', company_column='Company',
+                         max_per_company_M=None):
+    """
+    Split a fund-wide AI budget across every company's candidate initiatives.
+
+    `candidates_df` stacks planned-initiative rows for all companies (see
+    portfolio_candidates). `objective` is 'ebitda' (total cumulative EBITDA impact),
+    'org_ai_r' (total Org-AI-R uplift) or 'aie' (portfolio AIE). `max_per_company_M` caps
+    any single company's allocation (additive objectives only).
+
+    Returns a dict with the selected rows, a per-company allocation table, fund totals, the
+    method used.
+    """
+    if objective not in ALLOCATION_OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; expected one of {list(ALLOCATION_OBJECTIVES)}")
+    candidates = candidates_df.reset_index(drop=True)
+    cost, ebitda, delta = candidate_contributions(candidates, total_years)
+    if objective == 'aie':
+        if max_per_company_M is not None:
+            raise ValueError("Per-company caps are only supported for the additive objectives")
+        selected = local_search_aie(cost, ebitda, delta, budget_M)
+        method = 'local-search'
+    else:
+        value = ebitda if objective == 'ebitda' else delta
+        capacity = int(np.floor(budget_M / COST_RESOLUTION_M + VALUE_TOLERANCE))
+        company_cap = capacity if max_per_company_M is None else min(
+            capacity, int(np.floor(max_per_company_M / COST_RESOLUTION_M + VALUE_TOLERANCE)))
+        units = cost_units(cost)
+
+        members, frontiers = [], []
+        for _, rows in candidates.groupby(company_column, sort=False).indices.items():
+            members.append(rows)
+            frontiers.append(_company_frontier(units[rows], value[rows], min(company_cap, int(units[rows].sum()))))
+        position, _ = _allocate_additive(frontiers, capacity)
+        selected = np.sort(np.concatenate(
+            [rows[frontier[p][2]] for rows, frontier, p in zip(members, frontiers, position)] or [np.array([], int)]
+        )).astype(np.intp)
+        method = 'dynamic-programming'
+
+    chosen = candidates.iloc[selected]
+    contributions = pd.DataFrame({
+        company_column: chosen[company_column].to_numpy(),
+        'Investment ($M)': cost[selected],
+        'Cumulative EBITDA Impact ($M)': ebitda[selected],
+        'Delta Org-AI-R': delta[selected],
+        'Use Case': chosen['Use Case'].to_numpy(),
+    })
+    allocation = contributions.groupby(company_column, sort=False).agg(**{
+        'Budget Allocated ($M)': ('Investment ($M)', 'sum'),
+        'Initiatives': ('Use Case', 'size'),
+        'Use Cases': ('Use Case', ', '.join),
+        'Cumulative EBITDA Impact ($M)': ('Cumulative EBITDA Impact ($M)', 'sum'),
+        'Delta Org-AI-R': ('Delta Org-AI-R', 'sum'),
+    }).reindex(candidates[company_column].unique())
+    allocation = allocation.fillna({'Budget Allocated ($M)': 0.0, 'Initiatives': 0, 'Use Cases': '',
+                                    'Cumulative EBITDA Impact ($M)': 0.0, 'Delta Org-AI-R': 0.0})
+    allocation['Initiatives'] = allocation['Initiatives'].astype(int)
+    allocation['AIE'] = aie_from_totals(allocation['Delta Org-AI-R'].to_numpy(),
+                                        allocation['Budget Allocated ($M)'].to_numpy(),
+                                        allocation['Cumulative EBITDA Impact ($M)'].to_numpy())
+
+    total_cost, total_ebitda, total_delta = cost[selected].sum(), ebitda[selected].sum(), delta[selected].sum()
+    return {
+        'Selected': chosen,
+        'Allocation': allocation.reset_index(),
+        'Objective': objective,
+        'Method': method,
+        'Total Investment ($M)': float(total_cost),
+        'Cumulative EBITDA Impact ($M)': float(total_ebitda),
+        'Delta Org-AI-R': float(total_delta),
+        'Portfolio AIE': float(aie_from_totals(total_delta, total_cost, total_ebitda)),
+    }
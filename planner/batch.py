@@ -0,0 +1,347 @@
+"""Vectorized batch versions of the planner.model scoring functions.
+
+The scalar functions in planner.model work one company (one pandas Series) at a time.
+The functions here take whole arrays of companies/scenarios and evaluate the same
+formulas in a single NumPy pass, so fund-wide screening does not loop in Python.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from planner.model import (
+    model_coefficients, systematic_opportunity_scores, general_dimension_weights,
+    all_dimension_weights_df, high_value_use_cases, default_use_cases_for_sector, complexity_map, timeline_map_avg,
+    DEFAULT_COMPLEXITY_FACTOR, DEFAULT_TIMELINE_MONTHS, PLANNED_INITIATIVE_COLUMNS,
+    PLAN_TRAJECTORY_COLUMNS, use_case_rng, plan_trajectory_arrays,
+)
+from planner.profiling import profiled
+
+# Fixed column/row orders used by every array in this module
+DIMENSIONS = list(general_dimension_weights.keys())
+SECTORS = list(systematic_opportunity_scores.keys())
+
+
+def build_weight_matrix(weights_df=None, sectors=None):
+    # (7 x sectors) weight matrix; dimensions missing for a sector weigh 0, as in calculate_V_org_R
+    weights_df = all_dimension_weights_df if weights_df is None else weights_df
+    sectors = SECTORS if sectors is None else list(sectors)
+    return weights_df.reindex(index=DIMENSIONS, columns=sectors).fillna(0).to_numpy(dtype=np.float64)
+
+
+def build_opportunity_vector(scores=None, sectors=None):
+    scores = systematic_opportunity_scores if scores is None else scores
+    sectors = SECTORS if sectors is None else list(sectors)
+    return np.array([scores[s] for s in sectors], dtype=np.float64)
+
+
+WEIGHT_MATRIX = build_weight_matrix()
+OPPORTUNITY_VECTOR = build_opportunity_vector()
+
+
+def sector_index(sectors, sector_order=None):
+    """Map an array of sector names to integer column indices of the weight matrix."""
+    sector_order = SECTORS if sector_order is None else list(sector_order)
+    codes = pd.Index(sector_order).get_indexer(np.asarray(sectors))
+    if (codes < 0).any():
+        # Blank cells arrive as NaN or None, which do not sort against the names
+        unknown = sorted({'(blank)' if pd.isna(s) else str(s) for s in np.asarray(sectors)[codes < 0]})
+        raise KeyError(f"Unknown sector(s): {unknown}")
+    return codes.astype(np.intp)
+
+
+def ratings_array(ratings):
+    """Coerce ratings to an (N x 7) float array in DIMENSIONS order."""
+    if isinstance(ratings, pd.DataFrame):
+        return ratings.reindex(columns=DIMENSIONS, fill_value=0).to_numpy(dtype=np.float64)
+    ratings = np.asarray(ratings, dtype=np.float64)
+    if ratings.ndim == 1:
+        ratings = ratings[np.newaxis, :]
+    if ratings.shape[-1] != len(DIMENSIONS):
+        raise ValueError(f"Expected {len(DIMENSIONS)} dimension ratings per row, got {ratings.shape[-1]}")
+    return ratings
+
+
+def batch_dimension_scores(ratings):
+    return np.round(ratings_array(ratings) / 5 * 100, 2)
+
+
+def batch_V_org_R(ratings, sector_idx, weight_matrix=None):
+    weight_matrix = WEIGHT_MATRIX if weight_matrix is None else weight_matrix
+    scores = batch_dimension_scores(ratings)
+    sector_weights = weight_matrix.T[np.asarray(sector_idx)]
+    return np.round(np.einsum('ij,ij->i', scores, sector_weights), 2)
+
+
+def batch_org_ai_r(V_org_R, H_org_k_R, alpha=None, beta=None):
+    alpha = model_coefficients['alpha'] if alpha is None else alpha
+    beta = model_coefficients['beta'] if beta is None else beta
+    synergy = np.minimum(V_org_R, H_org_k_R)
+    return np.round(alpha * V_org_R + (1 - alpha) * H_org_k_R + beta * synergy, 2)
+
+
+@profiled
+def score_companies(ratings, sector_idx, external_signals_score=None, coefficients=None,
+                    weight_matrix=None, opportunity_vector=None):
+    """
+    Score N companies (or scenarios) at once.
+
+    `ratings` is an (N x 7) array of 1-5 ratings in DIMENSIONS order (or a DataFrame with
+    dimension-named columns) and `sector_idx` an N-vector of indices into SECTORS (see
+    sector_index). Returns a dict of N-vectors: V_org_R, H_org_k_R, Synergy, Org-AI-R and,
+    when external signal scores are given, Screening Score. Values match the scalar
+    calculate_V_org_R / calculate_synergy / calculate_org_ai_r / calculate_screening_score.
+    """
+    coefficients = model_coefficients if coefficients is None else coefficients
+    opportunity_vector = OPPORTUNITY_VECTOR if opportunity_vector is None else opportunity_vector
+    sector_idx = np.asarray(sector_idx)
+
+    V_org_R = batch_V_org_R(ratings, sector_idx, weight_matrix)
+    H_org_k_R = opportunity_vector[sector_idx]
+    result = {
+        'V_org_R': V_org_R,
+        'H_org_k_R': H_org_k_R,
+        'Synergy': np.minimum(V_org_R, H_org_k_R),
+        'Org-AI-R': batch_org_ai_r(V_org_R, H_org_k_R, coefficients['alpha'], coefficients['beta']),
+    }
+    if external_signals_score is not None:
+        external = np.asarray(external_signals_score, dtype=np.float64)
+        result['Screening Score'] = np.round(H_org_k_R + coefficients['epsilon'] * external, 2)
+    return result
+
+
+# --- Project parameter estimation ---
+
+# Per-initiative impact before Probability of Success / Execution Quality scaling
+UNADJUSTED_IMPACT_COLUMNS = ['EBITDA Impact (%) - Unadjusted', 'Delta Org-AI-R - Unadjusted']
+
+
+def _use_case_draws(use_case_names):
+    """
+    Replay the per-use-case RNG stream of estimate_project_parameters once per unique
+    name: investment noise, base impact, the Diagnostic AI fallback draw and the
+    Org-AI-R delta draw, as standard uniforms.
+    """
+    names, inverse = np.unique(np.asarray(use_case_names, dtype=object).astype(str), return_inverse=True)
+    draws = np.array([_use_case_uniforms(name) for name in names]).reshape(len(names), 4)
+    return draws[inverse]
+
+
+@functools.lru_cache(maxsize=4096)
+def _use_case_uniforms(use_case_name):
+    # Seeds are content-derived, so the draws for a name never change within or across processes
+    return tuple(use_case_rng(use_case_name).random(4))
+
+
+def _column_or_value(rows, column, value):
+    if value is not None:
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (len(rows),))
+    return rows[column].to_numpy(dtype=np.float64)
+
+
+def _override(rows, column, default):
+    if column not in rows:
+        return default
+    user_value = rows[column].to_numpy(dtype=np.float64)
+    return np.where(np.isnan(user_value), default, user_value)
+
+
+def _round_like_scalar(values, ndigits=2):
+    """
+    round(float(x), ndigits) elementwise. np.round rounds the binary value x 10^ndigits half
+    to even, so it disagrees with round() on values within rounding error of a tie (2.675,
+    7.025); those few are passed through round(), the rest agree with np.round.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(x), ndigits) for x in values[near_tie]]
+    return rounded
+
+
+def use_case_constants(rows):
+    """
+    The parts of estimate_project_parameters that depend only on the use case, not on the
+    company context: complexity factor, timeline, default investment, base EBITDA impact (%)
+    and the Org-AI-R delta before Probability of Success / Execution Quality scaling.
+    """
+    complexity_factor = rows['Complexity'].map(complexity_map).fillna(
+        DEFAULT_COMPLEXITY_FACTOR).to_numpy(dtype=np.float64)
+    timeline = rows['Timeline (months)'].astype(str).map(timeline_map_avg).fillna(
+        DEFAULT_TIMELINE_MONTHS).to_numpy(dtype=np.float64)
+    impact_min = rows['EBITDA Impact (min%)'].to_numpy(dtype=np.float64)
+    impact_max = rows['EBITDA Impact (max%)'].to_numpy(dtype=np.float64)
+    u = _use_case_draws(rows['Use Case']) if len(rows) else np.empty((0, 4))
+
+    base_impact = impact_min + (impact_max - impact_min) * u[:, 1]
+    # Diagnostic AI has no catalog range; the scalar path draws a 1-3% fallback and then
+    # takes the Org-AI-R draw from the next position in the stream
+    fallback = (rows['Use Case'].to_numpy() == 'Diagnostic AI') & (base_impact == 0)
+    base_impact = np.where(fallback, 1 + 2 * u[:, 2], base_impact)
+    delta_draw = np.where(fallback, u[:, 3], u[:, 2])
+    return {
+        'complexity_factor': complexity_factor,
+        'timeline': timeline,
+        'default_investment': _round_like_scalar(0.2 * complexity_factor * (timeline / 6) * (0.8 + 0.4 * u[:, 0]) + 0.1),
+        'base_impact': base_impact,
+        'delta_base': _round_like_scalar((5 + 10 * delta_draw) * complexity_factor * (base_impact / 2)),
+    }
+
+
+@profiled
+def estimate_project_parameters_batch(rows, current_V_org_R=None, H_org_k_R=None, initial_ebitda_M=None,
+                                      include_unadjusted=False):
+    """
+    Columnar estimate_project_parameters over any number of (company, use case) rows.
+
+    `rows` needs the catalog columns 'Use Case', 'Complexity', 'Timeline (months)',
+    'EBITDA Impact (min%)' and 'EBITDA Impact (max%)'. The company context comes from the
+    'Current V_org_R', 'H_org_k_R' and 'Initial EBITDA ($M)' columns unless passed as
+    scalars/arrays. Optional 'User Investment ($M)', 'User Probability of Success' and
+    'User Execution Quality' columns override the defaults wherever they are not NaN.
+
+    Returns a DataFrame in PLANNED_INITIATIVE_COLUMNS order, aligned to rows.index. With
+    `include_unadjusted`, the contextual EBITDA impact and Org-AI-R delta before scaling by
+    Probability of Success and Execution Quality are appended as
+    UNADJUSTED_IMPACT_COLUMNS (used by planner.simulation).
+    """
+    V = _column_or_value(rows, 'Current V_org_R', current_V_org_R)
+    H = _column_or_value(rows, 'H_org_k_R', H_org_k_R)
+    ebitda = _column_or_value(rows, 'Initial EBITDA ($M)', initial_ebitda_M)
+    constants = use_case_constants(rows)
+    complexity_factor, timeline = constants['complexity_factor'], constants['timeline']
+
+    default_prob_success = _round_like_scalar(np.clip(
+        0.6 + (V / 100 * 0.2) - (complexity_factor * 0.3), 0.5, 0.95))
+    default_exec_quality = _round_like_scalar(np.clip(V / 100 * 0.8, 0.6, 0.9))
+
+    investment = _override(rows, 'User Investment ($M)', constants['default_investment'])
+    prob_success = _override(rows, 'User Probability of Success', default_prob_success)
+    exec_quality = _override(rows, 'User Execution Quality', default_exec_quality)
+
+    contextual = constants['base_impact'] * (H / 100) * (V / 100 * 0.5 + 0.5)
+    impact_pct = _round_like_scalar(contextual * prob_success * exec_quality)
+    impact_M = _round_like_scalar(ebitda * (impact_pct / 100))
+
+    delta_base = constants['delta_base']
+    delta_org_ai_r = np.maximum(_round_like_scalar(delta_base * prob_success * exec_quality), 1)
+
+    estimates = pd.DataFrame({
+        'Use Case': rows['Use Case'].to_numpy(),
+        'Complexity': rows['Complexity'].to_numpy(),
+        'Timeline (months)': timeline,
+        'Investment ($M)': investment,
+        'Probability of Success': prob_success,
+        'Execution Quality': exec_quality,
+        'EBITDA Impact (%)': impact_pct,
+        'EBITDA Impact ($M)': impact_M,
+        'Delta Org-AI-R': delta_org_ai_r,
+    }, index=rows.index, columns=PLANNED_INITIATIVE_COLUMNS)
+    if include_unadjusted:
+        estimates[UNADJUSTED_IMPACT_COLUMNS[0]] = contextual
+        estimates[UNADJUSTED_IMPACT_COLUMNS[1]] = delta_base
+    return estimates
+
+
+def default_use_case_catalog():
+    """The use-case catalog restricted to each sector's default initiatives."""
+    return {sector: catalog[catalog['Use Case'].isin(default_use_cases_for_sector.get(sector, ()))]
+            for sector, catalog in high_value_use_cases.items()}
+
+
+def portfolio_use_case_rows(companies_df, catalog=None, v_org_r_column='Current V_org_R',
+                            ebitda_column='EBITDA ($M)'):
+    """
+    Cross every company with its sector's use-case catalog, producing the input rows for
+    estimate_project_parameters_batch (one row per company x candidate use case).
+    """
+    catalog = high_value_use_cases if catalog is None else catalog
+    catalog_long = pd.concat(
+        [df.assign(Sector=sector) for sector, df in catalog.items()], ignore_index=True)
+    companies = companies_df[['Company', 'Sector', v_org_r_column, ebitda_column]].rename(
+        columns={v_org_r_column: 'Current V_org_R', ebitda_column: 'Initial EBITDA ($M)'})
+    rows = companies.merge(catalog_long, on='Sector', how='inner', sort=False)
+    rows['H_org_k_R'] = rows['Sector'].map(systematic_opportunity_scores).astype(np.float64)
+    return rows
+
+
+# --- Multi-year plans ---
+
+@profiled
+def create_multi_year_plan_batch(initiatives_df, initial_org_ai_r, total_years=3, group_column='Company'):
+    """
+    Build plan trajectories for many companies/scenarios at once.
+
+    `initiatives_df` holds the planned initiatives of every group stacked together, with
+    `group_column` naming the company/scenario each row belongs to. `initial_org_ai_r` is
+    either a scalar or a Series indexed by group; in the latter case every group in its
+    index gets a trajectory, even if it has no initiatives. Returns a long-format frame
+    with one row per (group, year) in PLAN_TRAJECTORY_COLUMNS order after the group column.
+    """
+    if isinstance(initial_org_ai_r, pd.Series):
+        groups = pd.Index(initial_org_ai_r.index)
+        group_codes = groups.get_indexer(initiatives_df[group_column])
+        if (group_codes < 0).any():
+            raise KeyError(f"Initiatives reference groups without an initial Org-AI-R: "
+                           f"{sorted(set(initiatives_df[group_column][group_codes < 0]))}")
+        initial = initial_org_ai_r.to_numpy(dtype=np.float64)
+    else:
+        group_codes, groups = pd.factorize(initiatives_df[group_column])
+        initial = np.full(len(groups), initial_org_ai_r, dtype=np.float64)
+
+    trajectory = plan_trajectory_arrays(
+        initiatives_df['Timeline (months)'].to_numpy(),
+        initiatives_df['Investment ($M)'].to_numpy(),
+        initiatives_df['Delta Org-AI-R'].to_numpy(),
+        initiatives_df['EBITDA Impact ($M)'].to_numpy(),
+        total_years, group_codes=group_codes, n_groups=len(groups),
+    )
+    long_format = {
+        group_column: np.repeat(np.asarray(groups), total_years),
+        'Year': np.tile(np.arange(1, total_years + 1), len(groups)),
+        'Org-AI-R': np.round(initial[:, np.newaxis] + trajectory['Delta Org-AI-R - Cumulative'], 2).ravel(),
+    }
+    for column in PLAN_TRAJECTORY_COLUMNS[2:]:
+        long_format[column] = np.round(trajectory[column], 2).ravel()
+    return pd.DataFrame(long_format)
+
+
+def initiative_plan_weights(timeline_months, total_years):
+    """
+    Per-initiative contribution weights of the plan kernel at the horizon.
+
+    Runs plan_trajectory_arrays with unit impacts and one group per initiative: the
+    cumulative EBITDA at the horizon is the number of years each initiative's impact is
+    live, and the cumulative Org-AI-R delta is 1 for initiatives that complete within the
+    horizon (0 otherwise). Every plan total is then a dot product with these weights.
+    """
+    n = len(timeline_months)
+    unit = plan_trajectory_arrays(timeline_months, np.zeros(n), np.ones(n), np.ones(n), total_years,
+                                  group_codes=np.arange(n), n_groups=n)
+    return unit['Cumulative EBITDA Impact ($M)'][:, -1], unit['Delta Org-AI-R - Cumulative'][:, -1]
+
+
+# --- Exit valuation ---
+
+def batch_exit_valuation(visible_score, documented_score, sustainable_score, base_multiple, initial_ebitda_M,
+                         cumulative_ebitda_impact_M, coefficients=None):
+    """
+    Step 6 for N companies: a dict of N-vectors 'Exit-AI-R', 'Exit Multiple',
+    'Projected EBITDA ($M)' and 'Implied Valuation ($M)', matching assess_exit_readiness /
+    predict_exit_multiple and the app's valuation exactly.
+    """
+    coefficients = model_coefficients if coefficients is None else coefficients
+    exit_ai_r = _round_like_scalar(coefficients['w1_exit'] * np.asarray(visible_score, dtype=np.float64)
+                                   + coefficients['w2_exit'] * np.asarray(documented_score, dtype=np.float64)
+                                   + coefficients['w3_exit'] * np.asarray(sustainable_score, dtype=np.float64))
+    exit_multiple = _round_like_scalar(np.asarray(base_multiple, dtype=np.float64)
+                                       + (coefficients['delta_exit'] * exit_ai_r / 100))
+    projected_ebitda_M = np.asarray(initial_ebitda_M, dtype=np.float64) + np.maximum(cumulative_ebitda_impact_M, 0.0)
+    return {
+        'Exit-AI-R': exit_ai_r,
+        'Exit Multiple': exit_multiple,
+        'Projected EBITDA ($M)': projected_ebitda_M,
+        'Implied Valuation ($M)': projected_ebitda_M * exit_multiple,
+    }
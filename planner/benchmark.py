@@ -0,0 +1,271 @@
+"""Throughput and peak-memory benchmarks for the core model functions, with JSON baselines.
+
+Each case times one model function on inputs of a given number of rows (companies,
+(company, use case) rows, initiatives or portfolio values) and records the median wall time,
+rows per second and the peak memory traced while it runs. The scalar functions the app calls
+per company are timed as a per-row loop up to `max_rows`; their batch counterparts run at
+every size. Inputs are built from a fixed seed before timing, so only the function is measured.
+
+    python -m planner.benchmark --save baseline.json      # record a baseline
+    python -m planner.benchmark --baseline baseline.json  # exit 1 on regressions
+
+A case regresses when its median time exceeds the baseline by more than `tolerance` (or its
+peak memory by more than `memory_tolerance`). Timings below NOISE_FLOOR_SECONDS are compared
+at the floor, since sub-millisecond runs mostly measure timer and scheduler noise.
+Baselines are machine-specific: compare runs from the same kind of node.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from planner.batch import (
+    DIMENSIONS, SECTORS, score_companies, estimate_project_parameters_batch, create_multi_year_plan_batch,
+    batch_exit_valuation,
+)
+from planner.model import (
+    model_coefficients, all_dimension_weights_df, high_value_use_cases, calculate_dimension_score,
+    calculate_V_org_R, estimate_project_parameters, create_multi_year_plan,
+    calculate_within_portfolio_percentile, assess_exit_readiness, predict_exit_multiple,
+)
+from planner.pipeline import add_portfolio_benchmarks
+from planner.simulation import simulate_company_exit_valuation
+
+BENCHMARK_SIZES = (10, 1_000, 100_000, 1_000_000)
+SCALAR_MAX_ROWS = 1_000
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.10
+NOISE_FLOOR_SECONDS = 1e-3
+NOISE_FLOOR_BYTES = 64 * 1024
+INITIATIVES_PER_COMPANY = 4
+
+
+# --- Inputs ---
+
+def _ratings(n, rng):
+    return rng.integers(1, 6, size=(n, len(DIMENSIONS))), rng.integers(0, len(SECTORS), size=n)
+
+
+def _use_case_rows(n, rng):
+    catalog = pd.concat([df.assign(Sector=sector) for sector, df in high_value_use_cases.items()], ignore_index=True)
+    rows = catalog.iloc[rng.integers(0, len(catalog), size=n)].reset_index(drop=True)
+    return rows.assign(**{'Current V_org_R': rng.uniform(20, 95, n).round(2), 'H_org_k_R': 72.0,
+                          'Initial EBITDA ($M)': rng.uniform(2, 30, n).round(1)})
+
+
+def _initiatives(n, rng):
+    return pd.DataFrame({
+        'Company': np.arange(n) // INITIATIVES_PER_COMPANY,
+        'Timeline (months)': rng.choice([2, 4.5, 9, 15, 18, 30], size=n),
+        'Investment ($M)': rng.uniform(0.1, 2.0, n).round(2),
+        'Delta Org-AI-R': rng.uniform(1, 10, n).round(2),
+        'EBITDA Impact ($M)': rng.uniform(0, 1, n).round(2),
+    })
+
+
+def _exit_inputs(n, rng):
+    return (rng.integers(0, 101, n), rng.integers(0, 101, n), rng.integers(0, 101, n),
+            rng.choice([6.0, 6.5, 7.0, 7.5, 8.0], n), rng.uniform(2, 30, n).round(1), rng.uniform(0, 5, n).round(2))
+
+
+# --- Cases: factory(n, rng) -> zero-argument callable over n rows ---
+
+def _V_org_R_scalar(n, rng):
+    ratings, sector_idx = _ratings(n, rng)
+    ratings = [pd.Series(r, index=DIMENSIONS) for r in ratings]
+    weights = [all_dimension_weights_df[SECTORS[j]] for j in sector_idx]
+    return lambda: [calculate_V_org_R(calculate_dimension_score(r), w) for r, w in zip(ratings, weights)]
+
+
+def _V_org_R_batch(n, rng):
+    ratings, sector_idx = _ratings(n, rng)
+    return lambda: score_companies(ratings, sector_idx)
+
+
+def _estimate_scalar(n, rng):
+    rows = _use_case_rows(n, rng)
+    records = rows.to_dict('records')
+    return lambda: [estimate_project_parameters(r, r['Current V_org_R'], r['H_org_k_R'], r['Initial EBITDA ($M)'])
+                    for r in records]
+
+
+def _estimate_batch(n, rng):
+    rows = _use_case_rows(n, rng)
+    return lambda: estimate_project_parameters_batch(rows)
+
+
+def _plan_scalar(n, rng):
+    groups = list(_initiatives(n, rng).groupby('Company'))
+    return lambda: [create_multi_year_plan(company, 50.0, 10.0, df, 72) for company, df in groups]
+
+
+def _plan_batch(n, rng):
+    initiatives = _initiatives(n, rng)
+    initial = pd.Series(50.0, index=np.arange(initiatives['Company'].iloc[-1] + 1))
+    return lambda: create_multi_year_plan_batch(initiatives, initial)
+
+
+def _percentile_scalar(n, rng):
+    # One company ranked within an n-company portfolio, as Step 5 does
+    values = rng.normal(60, 12, n).round(2).tolist()
+    return lambda: calculate_within_portfolio_percentile(values[0], values)
+
+
+def _percentile_batch(n, rng):
+    # Every company ranked within the portfolio, as the batch runner does
+    results = pd.DataFrame({'Final Org-AI-R': rng.normal(60, 12, n).round(2)})
+    return lambda: add_portfolio_benchmarks(results)
+
+
+def _exit_scalar(n, rng):
+    rows = list(zip(*_exit_inputs(n, rng)))
+    w1, w2, w3, delta = (model_coefficients[k] for k in ('w1_exit', 'w2_exit', 'w3_exit', 'delta_exit'))
+
+    def run():
+        valuations = []
+        for visible, documented, sustainable, base_multiple, ebitda_M, impact_M in rows:
+            exit_ai_r = assess_exit_readiness(visible, documented, sustainable, w1, w2, w3)
+            valuations.append((ebitda_M + max(0.0, impact_M)) * predict_exit_multiple(base_multiple, exit_ai_r, delta))
+        return valuations
+    return run
+
+
+def _exit_batch(n, rng):
+    inputs = _exit_inputs(n, rng)
+    return lambda: batch_exit_valuation(*inputs)
+
+
+def _exit_simulation(n, rng):
+    # Rows are Monte Carlo draws of one company's exit valuation
+    plan = estimate_project_parameters_batch(high_value_use_cases['Manufacturing'], 55.0, 72, 9.0,
+                                             include_unadjusted=True)
+    return lambda: simulate_company_exit_valuation(plan, 9.0, (75, 80, 70), 6.0, n_paths=n, seed=0)
+
+
+# {name: (factory, max_rows)}; max_rows None runs at every size
+BENCHMARKS = {
+    'calculate_V_org_R': (_V_org_R_scalar, SCALAR_MAX_ROWS),
+    'score_companies': (_V_org_R_batch, None),
+    'estimate_project_parameters': (_estimate_scalar, SCALAR_MAX_ROWS),
+    'estimate_project_parameters_batch': (_estimate_batch, None),
+    'create_multi_year_plan': (_plan_scalar, SCALAR_MAX_ROWS),
+    'create_multi_year_plan_batch': (_plan_batch, None),
+    'calculate_within_portfolio_percentile': (_percentile_scalar, 100_000),
+    'add_portfolio_benchmarks': (_percentile_batch, None),
+    'assess_exit_readiness + predict_exit_multiple': (_exit_scalar, SCALAR_MAX_ROWS),
+    'batch_exit_valuation': (_exit_batch, None),
+    'simulate_company_exit_valuation': (_exit_simulation, None),
+}
+
+
+# --- Running ---
+
+def _peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _median_seconds(run, min_seconds, min_repeats=3, max_repeats=100):
+    times = []
+    while len(times) < min_repeats or (sum(times) < min_seconds and len(times) < max_repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(times)
+
+
+def run_benchmark(name, n, min_seconds=0.5, seed=0):
+    """Time one case at `n` rows: {'seconds', 'rows_per_second', 'peak_memory_bytes', 'repeats'}."""
+    factory, _ = BENCHMARKS[name]
+    run = factory(n, np.random.default_rng(seed))
+    run()  # warm-up: lazy imports and first-use caches are not what we are measuring
+    peak = _peak_memory(run)
+    seconds, repeats = _median_seconds(run, min_seconds)
+    return {'seconds': seconds, 'rows_per_second': n / seconds, 'peak_memory_bytes': peak, 'repeats': repeats}
+
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, names=None, min_seconds=0.5, progress=None):
+    """
+    Run the named cases (default: all) at every size within their max_rows. Returns a
+    JSON-ready report: {'environment': {...}, 'results': {name: {str(n): run_benchmark(...)}}}.
+    """
+    results = {}
+    for name in (BENCHMARKS if names is None else names):
+        max_rows = BENCHMARKS[name][1]
+        for n in sizes:
+            if max_rows is None or n <= max_rows:
+                results.setdefault(name, {})[str(n)] = run_benchmark(name, n, min_seconds)
+                if progress is not None:
+                    progress(name, n, results[name][str(n)])
+    return {
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                        'machine': platform.machine(), 'processor': platform.processor()},
+        'results': results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """Regressions of `report` against `baseline` (both run_benchmarks reports), as messages."""
+    regressions = []
+    for name, by_size in report['results'].items():
+        for size, current in by_size.items():
+            previous = baseline['results'].get(name, {}).get(size)
+            if previous is None:
+                continue
+            allowed = max(previous['seconds'], NOISE_FLOOR_SECONDS) * (1 + tolerance)
+            if current['seconds'] > allowed:
+                regressions.append(f"{name} @ {size} rows: {current['seconds'] * 1e3:.2f} ms vs baseline "
+                                   f"{previous['seconds'] * 1e3:.2f} ms (+{current['seconds'] / previous['seconds'] - 1:.0%})")
+            allowed = max(previous['peak_memory_bytes'], NOISE_FLOOR_BYTES) * (1 + memory_tolerance)
+            if current['peak_memory_bytes'] > allowed:
+                regressions.append(f"{name} @ {size} rows: peak memory {current['peak_memory_bytes'] / 2**20:.1f} MiB "
+                                   f"vs baseline {previous['peak_memory_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+
+def _print_row(name, n, result):
+    print(f"{name:<46} {n:>10,} rows {result['seconds'] * 1e3:>11.3f} ms {result['rows_per_second']:>14,.0f} rows/s "
+          f"{result['peak_memory_bytes'] / 2**20:>9.1f} MiB peak", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m planner.benchmark',
+                                     description="Benchmark the core model functions and check for regressions.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BENCHMARK_SIZES), help="row counts to run")
+    parser.add_argument('--cases', nargs='+', choices=list(BENCHMARKS), metavar='CASE', help="cases to run (default: all)")
+    parser.add_argument('--baseline', help="baseline JSON to compare against; exit 1 on regressions")
+    parser.add_argument('--save', help="write this run's results as JSON (e.g. a new baseline)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed slowdown vs baseline (default {DEFAULT_TOLERANCE:.0%})")
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help=f"allowed peak-memory growth vs baseline (default {DEFAULT_MEMORY_TOLERANCE:.0%})")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="minimum timed seconds per case and size")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.cases, args.min_seconds, progress=_print_row)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance, args.memory_tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against", args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Rendered-chart cache for the app's matplotlib/seaborn figures.
+
+Every chart is drawn by a function of the plotted data and styling only. render_chart keys
+the rendered PNG on the content digest of that function and its arguments (planner.seeding),
+so an unchanged chart costs a dict lookup on rerun. Entries are evicted least recently used
+beyond a fixed bound. Charts are drawn on standalone Figure objects that never enter pyplot's
+global figure registry, and any pyplot figure handed to figure_png is closed once rendered,
+so server memory stays flat over long sessions even when a chart fails halfway.
+
+matplotlib and seaborn (which pulls in scipy) are imported on the first chart actually drawn,
+not with this module, so steps without charts, and reruns served from the cache, never pay
+for them. The non-interactive Agg backend is selected up front so pyplot never probes for a
+GUI toolkit.
+"""
+import collections
+import io
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from planner.metrics import chart_render_seconds
+from planner.profiling import span
+from planner.seeding import content_digest
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+DEFAULT_MAX_CHARTS = 128
+# Same output settings st.pyplot uses, so cached images look like the figures they replace
+SAVEFIG_KWARGS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+
+
+class ChartCache:
+    def __init__(self, max_entries=DEFAULT_MAX_CHARTS):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, draw):
+        """PNG bytes cached under `key`; `draw()` must return a matplotlib Figure."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        png = figure_png(draw())
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': sum(len(png) for png in self._entries.values()),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def figure_png(fig):
+    """Render `fig` to PNG bytes, closing it if pyplot manages it, whether or not rendering succeeds."""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **SAVEFIG_KWARGS)
+        return buffer.getvalue()
+    finally:
+        # Figures from _figure are unknown to pyplot; only close what pyplot could be holding
+        plt = sys.modules.get('matplotlib.pyplot')
+        if plt is not None:
+            plt.close(fig)
+
+
+chart_cache = ChartCache()
+
+
+def render_chart(draw, *args, cache=None, **kwargs):
+    """PNG of `draw(*args, **kwargs)`, rendered once per distinct data and styling."""
+    cache = chart_cache if cache is None else cache
+    started = time.perf_counter()
+    with span(f'chart:{draw.__qualname__}'):
+        key = content_digest(draw.__module__, draw.__qualname__, args, kwargs)
+        png = cache.get_or_render(key, lambda: _draw(draw, args, kwargs))
+    chart_render_seconds.observe(time.perf_counter() - started, chart=draw.__name__)
+    return png
+
+
+def _draw(draw, args, kwargs):
+    # Its own span, so cache misses show up under the chart's span
+    with span('draw'):
+        return draw(*args, **kwargs)
+
+
+# --- Chart definitions ---
+
+def _figure(figsize, **subplot_kw):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(subplot_kw=subplot_kw or None)
+
+
+def radar_chart(dimension_df):
+    """Current vs target score per dimension of a Step 2 dimension assessment table."""
+    fig, ax = _figure((8, 8), polar=True)
+    categories = dimension_df.index.tolist()
+    N = len(categories)
+    angles = [n / float(N) * 2 * np.pi for n in range(N)]
+    angles += angles[:1]  # Complete the loop
+
+    current_values = dimension_df['Current Score (0-100)'].tolist()
+    target_values = dimension_df['Target Score (0-100)'].tolist()
+    current_values += current_values[:1]
+    target_values += target_values[:1]
+
+    ax.plot(angles, current_values, linewidth=1, linestyle='solid',
+            label='Current Score', color='skyblue')
+    ax.fill(angles, current_values, 'skyblue', alpha=0.25)
+    ax.plot(angles, target_values, linewidth=1, linestyle='solid',
+            label='Target Score', color='lightcoral')
+    ax.fill(angles, target_values, 'lightcoral', alpha=0.25)
+
+    ax.set_xticks(angles[:-1], categories, color='grey', size=10)
+    ax.set_rlabel_position(0)
+    ax.set_yticks([20, 40, 60, 80, 100], ["20", "40", "60", "80", "100"], color="grey", size=8)
+    ax.set_ylim(0, 100)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
+    return fig
+
+
+def gap_bar_chart(gap_df):
+    import seaborn as sns
+
+    fig, ax = _figure((10, 6))
+    sns.barplot(x=gap_df.index, y='Gap (Target - Current)', data=gap_df, palette='viridis', ax=ax)
+    ax.set_ylabel('Gap (Target - Current Score)')
+    ax.set_xlabel('AI Dimension')
+    ax.set_title('AI Readiness Gap Analysis')
+    ax.tick_params(axis='x', rotation=45)
+    return fig
+
+
+def plan_line_chart(plan_df, y, title, ylabel, ylim=None):
+    """One column of a multi-year plan trajectory against 'Year'."""
+    import seaborn as sns
+
+    fig, ax = _figure((10, 6))
+    sns.lineplot(x='Year', y=y, data=plan_df, marker='o', ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel('Year')
+    ax.set_ylabel(ylabel)
+    if ylim is not None:
+        ax.set_ylim(*ylim)
+    ax.grid(True)
+    return fig
+
+
+def portfolio_bar_chart(portfolio_df, y, palette, marker_value, marker_label, title, ylabel, legend_loc):
+    """Per-company bars of `y` by sector, with the selected company's value as a reference line."""
+    import seaborn as sns
+
+    fig, ax = _figure((10, 6))
+    sns.barplot(x='Company', y=y, hue='Sector', data=portfolio_df, palette=palette, ax=ax)
+    ax.axhline(marker_value, color='red', linestyle='--', label=marker_label)
+    ax.set_title(title)
+    ax.set_xlabel('Company')
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', rotation=45)
+    ax.legend(loc=legend_loc)
+    return fig
+
+
+def tornado_chart(tornado_df, output, step_pct):
+    """Bars from the base output to the output at each parameter's low and high value."""
+    fig, ax = _figure((10, 6))
+    base_output = tornado_df['Base Output'].iloc[0]
+    labels = tornado_df['Parameter'].iloc[::-1]
+    ax.barh(labels, tornado_df['Output at Low'].iloc[::-1] - base_output, left=base_output,
+            color='steelblue', label=f'Parameter -{step_pct}%')
+    ax.barh(labels, tornado_df['Output at High'].iloc[::-1] - base_output, left=base_output,
+            color='darkorange', label=f'Parameter +{step_pct}%')
+    ax.axvline(base_output, color='black', linewidth=1)
+    ax.set_title(f'Tornado Chart: {output}')
+    ax.set_xlabel(output)
+    ax.legend(loc='lower right')
+    return fig
+
+
+def portfolio_histogram_chart(values, marker_value, marker_label, title, xlabel, bins=50, ylabel='Companies'):
+    """Distribution of one metric over a large portfolio (or simulation), with the selected company's value marked."""
+    fig, ax = _figure((10, 6))
+    ax.hist(values, bins=bins, color='steelblue', alpha=0.8)
+    ax.axvline(marker_value, color='red', linestyle='--', label=marker_label)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend(loc='upper right')
+    return fig
@@ -0,0 +1,182 @@
+"""Incremental recompute of the planner's derived quantities.
+
+The app's chain ratings -> V_org_R -> Org-AI-R -> initiative estimates -> plan trajectory ->
+AIE -> exit valuation is declared once as a dependency graph. Setting an input whose content
+changed marks every node downstream of it dirty; reading a node recomputes it only when it
+is dirty and one of its dependencies actually changed value (early cutoff), so a rerun with
+unchanged inputs is a handful of digest comparisons however many initiatives there are.
+Each node's value is fingerprinted with planner.seeding.content_digest.
+"""
+import pandas as pd
+
+from planner.batch import estimate_project_parameters_batch
+from planner.lattice import default_rating_lattice
+from planner.model import (
+    model_coefficients, systematic_opportunity_scores, create_multi_year_plan, calculate_ai_investment_efficiency,
+    assess_exit_readiness, predict_exit_multiple,
+)
+from planner.profiling import span
+from planner.seeding import content_digest
+
+
+class DependencyGraph:
+    def __init__(self):
+        self._inputs = set()
+        self._funcs = {}
+        self._deps = {}
+        self._dependents = {}
+        self._values = {}
+        self._fingerprints = {}
+        # Fingerprints of each node's dependencies when it was last computed
+        self._dep_fingerprints = {}
+        self._dirty = set()
+        self.recomputed = []
+
+    def add_input(self, name):
+        self._inputs.add(name)
+        self._dependents.setdefault(name, [])
+        return self
+
+    def add_node(self, name, func, deps):
+        """`func` is called with the values of `deps`, in order."""
+        unknown = [d for d in deps if d not in self._dependents]
+        if unknown:
+            raise KeyError(f"Node {name!r} depends on undeclared node(s) {unknown}")
+        self._funcs[name] = func
+        self._deps[name] = list(deps)
+        self._dependents.setdefault(name, [])
+        for d in deps:
+            self._dependents[d].append(name)
+        self._dirty.add(name)
+        return self
+
+    def set_input(self, name, value):
+        """Set an input; returns whether its content changed (and downstream nodes went dirty)."""
+        if name not in self._inputs:
+            raise KeyError(f"Unknown input {name!r}")
+        fingerprint = content_digest(value)
+        if name in self._fingerprints and self._fingerprints[name] == fingerprint:
+            return False
+        self._values[name] = value
+        self._fingerprints[name] = fingerprint
+        self._dirty.update(self.downstream(name))
+        return True
+
+    def downstream(self, name):
+        seen, stack = [], list(self._dependents[name])
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.append(node)
+                stack.extend(self._dependents[node])
+        return seen
+
+    def get(self, name):
+        if name in self._inputs:
+            if name not in self._values:
+                raise KeyError(f"Input {name!r} has not been set")
+            return self._values[name]
+        if name in self._dirty:
+            dep_values = [self.get(d) for d in self._deps[name]]
+            dep_fingerprints = [self._fingerprints[d] for d in self._deps[name]]
+            if self._dep_fingerprints.get(name) != dep_fingerprints:
+                with span(f'graph:{name}'):
+                    value = self._funcs[name](*dep_values)
+                self._values[name] = value
+                self._fingerprints[name] = content_digest(value)
+                self._dep_fingerprints[name] = dep_fingerprints
+                self.recomputed.append(name)
+            self._dirty.discard(name)
+        return self._values[name]
+
+    def begin_run(self):
+        """Start a new rerun: clears the list of nodes recomputed during the previous one."""
+        self.recomputed = []
+
+    def is_dirty(self, name):
+        return name in self._dirty
+
+
+# --- The planner chain ---
+
+PLANNER_INPUTS = [
+    'company', 'sector', 'current_ratings', 'target_ratings', 'initial_ebitda_M', 'use_case_rows',
+    'planning_horizon', 'exit_scores', 'base_exit_multiple',
+]
+
+
+def _opportunity_score(sector):
+    return systematic_opportunity_scores[sector]
+
+
+def _current_scores(current_ratings, sector):
+    V_org_R, org_ai_r = default_rating_lattice().lookup(current_ratings, sector)
+    return {'V_org_R': V_org_R, 'Org-AI-R': org_ai_r}
+
+
+def _planned_initiatives(use_case_rows, current_scores, H_org_k_R, initial_ebitda_M):
+    if use_case_rows.empty:
+        return pd.DataFrame()
+    return estimate_project_parameters_batch(use_case_rows, current_scores['V_org_R'], H_org_k_R, initial_ebitda_M)
+
+
+def _plan_trajectory(company, current_scores, initial_ebitda_M, planned_initiatives, H_org_k_R, planning_horizon):
+    if planned_initiatives.empty:
+        return pd.DataFrame()
+    return create_multi_year_plan(company, current_scores['Org-AI-R'], initial_ebitda_M, planned_initiatives,
+                                  H_org_k_R, planning_horizon)
+
+
+def _plan_totals(plan_trajectory, current_scores):
+    if plan_trajectory.empty:
+        return {'Final Org-AI-R': current_scores['Org-AI-R'], 'Delta Org-AI-R': 0.0, 'Investment ($M)': 0.0,
+                'Cumulative EBITDA Impact ($M)': 0.0, 'AIE': 0.0}
+    final_org_ai_r = plan_trajectory['Org-AI-R'].iloc[-1]
+    delta = final_org_ai_r - current_scores['Org-AI-R']
+    investment = plan_trajectory['Cumulative Investment ($M)'].iloc[-1]
+    ebitda = plan_trajectory['Cumulative EBITDA Impact ($M)'].iloc[-1]
+    return {
+        'Final Org-AI-R': final_org_ai_r,
+        'Delta Org-AI-R': delta,
+        'Investment ($M)': investment,
+        'Cumulative EBITDA Impact ($M)': ebitda,
+        'AIE': calculate_ai_investment_efficiency(delta, investment, ebitda),
+    }
+
+
+def _exit_ai_r(exit_scores):
+    return assess_exit_readiness(*exit_scores, model_coefficients['w1_exit'], model_coefficients['w2_exit'],
+                                 model_coefficients['w3_exit'])
+
+
+def _target_V_org_R(target_ratings, sector):
+    return default_rating_lattice().lookup(target_ratings, sector)[0]
+
+
+def _exit_multiple(exit_ai_r, base_exit_multiple):
+    return predict_exit_multiple(base_exit_multiple, exit_ai_r, model_coefficients['delta_exit'])
+
+
+def _exit_valuation(exit_multiple, initial_ebitda_M, plan_totals):
+    projected_ebitda_M = initial_ebitda_M + max(0.0, plan_totals['Cumulative EBITDA Impact ($M)'])
+    return {'Projected EBITDA ($M)': projected_ebitda_M, 'Implied Valuation ($M)': projected_ebitda_M * exit_multiple}
+
+
+def build_planner_graph():
+    """Dependency graph of one company's derived planner quantities (inputs: PLANNER_INPUTS)."""
+    graph = DependencyGraph()
+    for name in PLANNER_INPUTS:
+        graph.add_input(name)
+    graph.add_node('H_org_k_R', _opportunity_score, ['sector'])
+    graph.add_node('current_scores', _current_scores, ['current_ratings', 'sector'])
+    graph.add_node('target_V_org_R', _target_V_org_R, ['target_ratings', 'sector'])
+    graph.add_node('planned_initiatives', _planned_initiatives,
+                   ['use_case_rows', 'current_scores', 'H_org_k_R', 'initial_ebitda_M'])
+    graph.add_node('plan_trajectory', _plan_trajectory,
+                   ['company', 'current_scores', 'initial_ebitda_M', 'planned_initiatives', 'H_org_k_R',
+                    'planning_horizon'])
+    graph.add_node('plan_totals', _plan_totals, ['plan_trajectory', 'current_scores'])
+    graph.add_node('exit_ai_r', _exit_ai_r, ['exit_scores'])
+    graph.add_node('exit_multiple', _exit_multiple, ['exit_ai_r', 'base_exit_multiple'])
+    graph.add_node('exit_valuation', _exit_valuation, ['exit_multiple', 'initial_ebitda_M', 'plan_totals'])
+    return graph
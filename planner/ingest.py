@@ -0,0 +1,146 @@
+"""Chunked ingest and streaming scoring of a portfolio file.
+
+A CSV or Parquet file with one row per company (Company, Sector, EBITDA ($M) and a 1-5
+rating column per AI dimension) is read `chunk_rows` rows at a time. Each chunk is scored in
+one vectorized pass: V_org_R and Org-AI-R from the ratings, then the sector's default
+initiatives, the multi-year plan and AIE. Only the scored columns of each chunk are kept,
+in the app's portfolio layout (planner.reference.PORTFOLIO_COLUMNS), so a file of hundreds
+of thousands of rows is never held as raw rows or as per-company Python objects.
+
+Parquet support needs pyarrow, which is imported only when a Parquet file is read.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from planner.batch import (
+    DIMENSIONS, ratings_array, sector_index, score_companies, portfolio_use_case_rows,
+    estimate_project_parameters_batch, create_multi_year_plan_batch, default_use_case_catalog,
+)
+from planner.profiling import profiled
+from planner.reference import PORTFOLIO_COLUMNS
+
+INGEST_COLUMNS = ['Company', 'Sector', 'EBITDA ($M)'] + DIMENSIONS
+DEFAULT_CHUNK_ROWS = 50_000
+FILE_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+
+def detect_file_format(source):
+    """'csv' or 'parquet' from the file name of a path or an uploaded file object."""
+    name = getattr(source, 'name', source)
+    extension = os.path.splitext(str(name))[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError(f"Unsupported portfolio file {name!r}; expected one of {sorted(FILE_FORMATS)}")
+    return FILE_FORMATS[extension]
+
+
+def read_company_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS, file_format=None, columns=None):
+    """Yield DataFrames of at most `chunk_rows` companies, reading only `columns` (default INGEST_COLUMNS)."""
+    file_format = detect_file_format(source) if file_format is None else file_format
+    columns = INGEST_COLUMNS if columns is None else columns
+    if file_format == 'csv':
+        yield from pd.read_csv(source, chunksize=chunk_rows, usecols=lambda column: column in columns,
+                               dtype={'Company': str, 'Sector': str})
+    elif file_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet portfolio files requires pyarrow") from e
+        parquet_file = pq.ParquetFile(source)
+        present = [c for c in columns if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=present):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unknown file format {file_format!r}")
+
+
+def plan_company_chunk(chunk, total_years=3, external_signals_score=None):
+    """
+    Score one chunk of companies and plan each with its sector's default initiatives over
+    `total_years`. Returns a dict of N-vectors: the score_companies outputs (with Screening
+    Score when `external_signals_score` is given) plus 'EBITDA ($M)', 'Final Org-AI-R',
+    'Delta Org-AI-R' (unclamped), 'Investment ($M)', 'Cumulative EBITDA Impact ($M)' and 'AIE'.
+    """
+    missing = [c for c in INGEST_COLUMNS if c not in chunk]
+    if missing:
+        raise ValueError(f"Portfolio file is missing column(s) {missing}")
+    ratings = ratings_array(chunk[DIMENSIONS])
+    if not ((ratings >= 1) & (ratings <= 5)).all():
+        raise ValueError("Dimension ratings must be between 1 and 5")
+    n = len(chunk)
+    scores = score_companies(ratings, sector_index(chunk['Sector']), external_signals_score)
+    ebitda_M = chunk['EBITDA ($M)'].to_numpy(dtype=np.float64)
+    blank_ebitda = np.count_nonzero(np.isnan(ebitda_M))
+    if blank_ebitda:
+        raise ValueError(f"EBITDA ($M) is blank for {blank_ebitda} company row(s)")
+
+    # Companies are keyed by position: names in a deal pipeline need not be unique
+    companies = pd.DataFrame({'Company': np.arange(n), 'Sector': chunk['Sector'].to_numpy(),
+                              'Current V_org_R': scores['V_org_R'], 'EBITDA ($M)': ebitda_M})
+    rows = portfolio_use_case_rows(companies, catalog=default_use_case_catalog())
+    initiatives = pd.concat([rows[['Company']], estimate_project_parameters_batch(rows)], axis=1)
+    plan = create_multi_year_plan_batch(initiatives, pd.Series(scores['Org-AI-R'], index=np.arange(n)), total_years)
+    final = plan.iloc[total_years - 1::total_years]
+
+    final_org_ai_r = final['Org-AI-R'].to_numpy()
+    delta = final_org_ai_r - scores['Org-AI-R']
+    investment_M = final['Cumulative Investment ($M)'].to_numpy()
+    impact_M = final['Cumulative EBITDA Impact ($M)'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aie = np.where(investment_M > 0, np.round(delta / investment_M * impact_M, 2), 0.0)
+    return {
+        **scores,
+        'EBITDA ($M)': ebitda_M,
+        'Final Org-AI-R': final_org_ai_r,
+        'Delta Org-AI-R': delta,
+        'Investment ($M)': investment_M,
+        'Cumulative EBITDA Impact ($M)': impact_M,
+        'AIE': aie,
+    }
+
+
+@profiled
+def score_company_chunk(chunk, total_years=3):
+    """
+    plan_company_chunk in PORTFOLIO_COLUMNS layout: 'Baseline Org-AI-R' is the score from
+    the ratings and 'Current Org-AI-R' the score at the end of the plan, as Step 5 writes it
+    for the selected company.
+    """
+    planned = plan_company_chunk(chunk, total_years)
+    ebitda_M, impact_M = planned['EBITDA ($M)'], planned['Cumulative EBITDA Impact ($M)']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        impact_pct = np.where(ebitda_M > 0, np.round(impact_M / ebitda_M * 100, 2), 0.0)
+    return pd.DataFrame({
+        'Company': chunk['Company'].to_numpy(),
+        'Sector': chunk['Sector'].to_numpy(),
+        'Baseline Org-AI-R': planned['Org-AI-R'],
+        'Current Org-AI-R': planned['Final Org-AI-R'],
+        'Delta Org-AI-R': np.maximum(planned['Delta Org-AI-R'], 0.0),
+        'Investment ($M)': np.maximum(planned['Investment ($M)'], 0.0),
+        'Efficiency (pts/$M$)': planned['AIE'],
+        'EBITDA Impact (%)': impact_pct,
+        'EBITDA ($M)': ebitda_M,
+        'EBITDA Impact ($M)': np.maximum(impact_M, 0.0),
+    }, columns=PORTFOLIO_COLUMNS)
+
+
+def score_company_file(source, chunk_rows=DEFAULT_CHUNK_ROWS, total_years=3, file_format=None):
+    """Yield the scored chunks of a portfolio file as they are read (see score_company_chunk)."""
+    for chunk in read_company_chunks(source, chunk_rows, file_format):
+        yield score_company_chunk(chunk, total_years)
+
+
+@profiled
+def portfolio_benchmark(portfolio_values, company_value):
+    """
+    Percentile and z-score of `company_value` within `portfolio_values`, computed as
+    calculate_within_portfolio_percentile / calculate_cross_portfolio_z_score do, on arrays.
+    """
+    values = np.asarray(portfolio_values, dtype=np.float64)
+    if len(values) == 0:
+        return {'Percentile': 0.0, 'Z-Score': 0.0}
+    std = values.std(ddof=1) if len(values) > 1 else np.nan
+    z_score = 0.0 if std == 0 or np.isnan(std) else round((company_value - values.mean()) / std, 2)
+    return {'Percentile': round(np.count_nonzero(values <= company_value) / len(values) * 100, 2),
+            'Z-Score': z_score}
@@ -0,0 +1,109 @@
+"""Precomputed scores for every possible Step 2 rating vector.
+
+Seven dimensions rated 1-5 give only 5^7 = 78,125 rating vectors, so V_org_R and Org-AI-R
+for every vector and sector fit in a few MB: ratings are stored as uint8 codes and scores
+as float32 (every score is rounded to 2 decimals and below 1,000, which float32 holds to
+well within 0.005, so lookups round back to the exact scalar-model value). A slider change
+becomes an index computation, and inverse questions such as "cheapest set of rating
+upgrades that reaches Org-AI-R >= X" become one masked pass over the table.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from planner.batch import DIMENSIONS, SECTORS, WEIGHT_MATRIX, OPPORTUNITY_VECTOR, ratings_array, score_companies
+
+MIN_RATING = 1
+MAX_RATING = 5
+RATING_LEVELS = MAX_RATING - MIN_RATING + 1
+# Place value of each dimension's rating code in the lattice index (first dimension most significant)
+_PLACE_VALUES = RATING_LEVELS ** np.arange(len(DIMENSIONS) - 1, -1, -1)
+
+
+def lattice_index(ratings):
+    """Row index of each rating vector (N x 7 array or DataFrame, or one vector) in the lattice."""
+    codes = ratings_array(ratings) - MIN_RATING
+    if ((codes < 0) | (codes >= RATING_LEVELS) | (codes != np.round(codes))).any():
+        raise ValueError(f"Ratings must be whole numbers from {MIN_RATING} to {MAX_RATING}")
+    return codes.astype(np.intp) @ _PLACE_VALUES
+
+
+class RatingLattice:
+    """V_org_R and Org-AI-R of every rating vector for every sector."""
+
+    def __init__(self, coefficients=None, weight_matrix=None, opportunity_vector=None, sectors=None):
+        self.sectors = SECTORS if sectors is None else list(sectors)
+        weight_matrix = WEIGHT_MATRIX if weight_matrix is None else weight_matrix
+        opportunity_vector = OPPORTUNITY_VECTOR if opportunity_vector is None else opportunity_vector
+        n = RATING_LEVELS ** len(DIMENSIONS)
+        # (N x 7) uint8 rating codes, row i being the base-5 digits of i
+        self.codes = ((np.arange(n)[:, np.newaxis] // _PLACE_VALUES) % RATING_LEVELS).astype(np.uint8)
+        ratings = self.codes + MIN_RATING
+        self.V_org_R = np.empty((len(self.sectors), n), dtype=np.float32)
+        self.org_ai_r = np.empty((len(self.sectors), n), dtype=np.float32)
+        for s in range(len(self.sectors)):
+            scores = score_companies(ratings, np.full(n, s), coefficients=coefficients,
+                                     weight_matrix=weight_matrix, opportunity_vector=opportunity_vector)
+            self.V_org_R[s] = scores['V_org_R']
+            self.org_ai_r[s] = scores['Org-AI-R']
+
+    def _sector_row(self, sector):
+        try:
+            return self.sectors.index(sector)
+        except ValueError:
+            raise KeyError(f"Unknown sector: {sector!r}") from None
+
+    def lookup(self, ratings, sector):
+        """(V_org_R, Org-AI-R) of one rating vector (dict/Series by dimension, or 7 values)."""
+        s, i = self._sector_row(sector), lattice_index(_ordered(ratings))[0]
+        return round(float(self.V_org_R[s, i]), 2), round(float(self.org_ai_r[s, i]), 2)
+
+    def min_upgrades(self, current_ratings, sector, target_org_ai_r, max_ratings=None):
+        """
+        Cheapest rating upgrades from `current_ratings` reaching Org-AI-R >= `target_org_ai_r`.
+
+        Cost is the total number of rating steps raised, then the number of dimensions
+        touched; remaining ties go to the highest Org-AI-R. Ratings are never lowered and,
+        when `max_ratings` is given (e.g. the target assessment), never raised above it.
+        Returns None when the target is unreachable, otherwise a dict with the new
+        'Ratings', the per-dimension 'Upgrades', 'Steps', 'V_org_R' and 'Org-AI-R'.
+        """
+        s = self._sector_row(sector)
+        current = lattice_index(_ordered(current_ratings))[0]
+        lower = self.codes[current]
+        upper = (np.full(len(DIMENSIONS), RATING_LEVELS - 1) if max_ratings is None
+                 else np.maximum(ratings_array(_ordered(max_ratings))[0] - MIN_RATING, lower))
+
+        # Org-AI-R is rounded to 2 decimals; compare at that precision
+        feasible = ((self.codes >= lower) & (self.codes <= upper)).all(axis=1)
+        feasible &= np.round(self.org_ai_r[s].astype(np.float64), 2) >= target_org_ai_r - 1e-9
+        candidates = np.flatnonzero(feasible)
+        if not len(candidates):
+            return None
+        raised = self.codes[candidates].astype(np.int16) - lower
+        order = np.lexsort((-self.org_ai_r[s, candidates], (raised > 0).sum(axis=1), raised.sum(axis=1)))
+        best = candidates[order[0]]
+        ratings = pd.Series(self.codes[best].astype(int) + MIN_RATING, index=DIMENSIONS, name='Rating (1-5)')
+        upgrades = ratings - (lower.astype(int) + MIN_RATING)
+        return {
+            'Ratings': ratings,
+            'Upgrades': upgrades[upgrades > 0],
+            'Steps': int(upgrades.sum()),
+            'V_org_R': round(float(self.V_org_R[s, best]), 2),
+            'Org-AI-R': round(float(self.org_ai_r[s, best]), 2),
+        }
+
+
+def _ordered(ratings):
+    if isinstance(ratings, dict):
+        ratings = pd.Series(ratings)
+    if isinstance(ratings, pd.Series):
+        return ratings.reindex(DIMENSIONS).to_numpy()
+    return ratings
+
+
+@functools.lru_cache(maxsize=1)
+def default_rating_lattice():
+    """Lattice for the default model coefficients and weight table, built once per process."""
+    return RatingLattice()
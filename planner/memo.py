@@ -0,0 +1,116 @@
+"""Persistent memo cache for seeded simulations and other pure planner computations.
+
+Results are keyed on the same content digest that seeds them (planner.seeding), so a key
+means the same thing in every process. Entries live in an in-process dict and, when a
+cache directory is configured (argument or the PLANNER_CACHE_DIR environment variable),
+also as one pickle file per entry so warm workers and restarted containers can reuse them.
+Keys are salted with MEMO_VERSION and the model coefficients, so files written by an older
+model are never read back; the in-process dict is an LRU capped at `max_entries`.
+"""
+import collections
+import functools
+import os
+import pickle
+import tempfile
+import threading
+
+from planner.model import model_coefficients, simulate_dimension_ratings
+from planner.optimize import optimize_use_cases
+from planner.seeding import content_digest
+
+CACHE_DIR_ENV_VAR = 'PLANNER_CACHE_DIR'
+DEFAULT_MAX_ENTRIES = 4096
+# Bump when a memoized function's formulas change, so persisted results from the old code are not reused
+MEMO_VERSION = 1
+
+
+class PersistentMemo:
+    def __init__(self, namespace, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        cache_dir = cache_dir if cache_dir is not None else os.environ.get(CACHE_DIR_ENV_VAR)
+        self.directory = os.path.join(cache_dir, namespace) if cache_dir else None
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return (pickle.load(f),)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key, value):
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Write-then-rename so concurrent workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        loaded = self._load(key)
+        if loaded is not None:
+            value = loaded[0]
+            with self._lock:
+                self.hits += 1
+        else:
+            value = compute()
+            self._store(key, value)
+            with self._lock:
+                self.misses += 1
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'namespace': self.namespace, 'entries': len(self._entries),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def persistent_memo(namespace, cache_dir=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """Decorator memoizing a function on the content digest of its arguments and the model version."""
+    def decorator(func):
+        memo = PersistentMemo(namespace, cache_dir, max_entries)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = content_digest(namespace, MEMO_VERSION, model_coefficients, args, kwargs)
+            # Callers may mutate what they get back (e.g. a ratings Series), so hand out copies
+            return _copy(memo.get_or_compute(key, lambda: func(*args, **kwargs)))
+
+        wrapper.memo = memo
+        return wrapper
+    return decorator
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, 'copy') else value
+
+
+cached_simulate_dimension_ratings = persistent_memo('dimension_ratings')(simulate_dimension_ratings)
+# Step 3's budget optimizer sits outside the parameters fragment, so every full rerun asks again
+cached_optimize_use_cases = persistent_memo('use_case_optimizer')(optimize_use_cases)
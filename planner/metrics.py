@@ -0,0 +1,344 @@
+"""Process-wide server metrics in the Prometheus text exposition format.
+
+The app records every rerun (step, full script or fragment, wall time) and touches a session
+registry, render_chart times every chart, and the data caches are read when the metrics are
+rendered, so a scrape always sees their current hit/miss counts. Sessions count as active
+while they have rerun within ACTIVE_SESSION_SECONDS; each one's state size is an estimate
+(approximate_size) refreshed at most every SESSION_SIZE_INTERVAL seconds, since walking a
+large session on every rerun would cost more than it tells.
+
+Metrics are exported without any extra dependency, configured by environment variables:
+PLANNER_METRICS_PORT serves them over HTTP at /metrics, and PLANNER_METRICS_FILE rewrites a
+file every PLANNER_METRICS_INTERVAL seconds (e.g. for node_exporter's textfile collector).
+"""
+import collections
+import http.server
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+METRICS_PORT_ENV_VAR = 'PLANNER_METRICS_PORT'
+METRICS_FILE_ENV_VAR = 'PLANNER_METRICS_FILE'
+METRICS_INTERVAL_ENV_VAR = 'PLANNER_METRICS_INTERVAL'
+DEFAULT_METRICS_INTERVAL = 15.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+RERUN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHART_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ACTIVE_SESSION_SECONDS = 30 * 60
+SESSION_SIZE_INTERVAL = 30.0
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# --- Metric types ---
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values = collections.defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=RERUN_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # {label values: [count per bucket (non-cumulative)..., sum]}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        bucket = next(i for i, upper in enumerate(self.buckets) if value <= upper)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * len(self.buckets) + [0.0])
+            counts[bucket] += 1
+            counts[-1] += value
+
+    def count(self, **labels):
+        counts = self._values.get(tuple(str(labels[name]) for name in self.labelnames))
+        return sum(counts[:-1]) if counts else 0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, counts in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for upper, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append((f'{self.name}_bucket', {**labels, 'le': _format_value(float(upper))}, cumulative))
+                samples.append((f'{self.name}_sum', labels, counts[-1]))
+                samples.append((f'{self.name}_count', labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        self._metrics.append(Counter(name, documentation, labelnames))
+        return self._metrics[-1]
+
+    def histogram(self, name, documentation, labelnames=(), buckets=RERUN_BUCKETS):
+        self._metrics.append(Histogram(name, documentation, labelnames, buckets))
+        return self._metrics[-1]
+
+    def collector(self, func):
+        """Register `func() -> [(name, kind, documentation, [(labels, value), ...]), ...]`, called per render."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines += [f'# HELP {metric.name} {metric.documentation}', f'# TYPE {metric.name} {metric.kind}']
+            lines += [f'{name}{_format_labels(labels)} {_format_value(value)}' for name, labels, value in metric.samples()]
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines += [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+                lines += [f'{name}{_format_labels(labels)} {_format_value(value)}' for labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+reruns = registry.counter('planner_reruns_total', "Script reruns by step and kind (full or fragment).", ['step', 'kind'])
+rerun_seconds = registry.histogram('planner_rerun_duration_seconds', "Rerun wall time by step and kind.",
+                                   ['step', 'kind'], RERUN_BUCKETS)
+chart_render_seconds = registry.histogram('planner_chart_render_seconds', "render_chart wall time, cache hits included.",
+                                          ['chart'], CHART_BUCKETS)
+
+
+def record_rerun(step, kind, seconds):
+    reruns.inc(step=step, kind=kind)
+    rerun_seconds.observe(seconds, step=step, kind=kind)
+
+
+# --- Sessions ---
+
+def approximate_size(obj, _seen=None):
+    """
+    Estimated bytes held by `obj`: deep memory usage of pandas objects, nbytes of arrays and
+    sys.getsizeof of everything else, following containers and object attributes once each.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, collections.abc.Mapping)):
+        size += sum(approximate_size(k, seen) + approximate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+        size += sum(approximate_size(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        if hasattr(obj, '__dict__'):
+            size += approximate_size(vars(obj), seen)
+        for slot in getattr(type(obj), '__slots__', ()):
+            size += approximate_size(getattr(obj, slot, None), seen)
+    return size
+
+
+class SessionRegistry:
+    def __init__(self, idle_seconds=ACTIVE_SESSION_SECONDS, size_interval=SESSION_SIZE_INTERVAL, clock=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.size_interval = size_interval
+        self._clock = clock
+        # {session id: [last seen, last sized, state bytes]}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id, state_size=None):
+        """Mark a session as seen; `state_size()` is called when its size estimate is due."""
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, [now, -math.inf, 0])
+            entry[0] = now
+            due = state_size is not None and now - entry[1] >= self.size_interval
+        if due:
+            size = state_size()
+            with self._lock:
+                entry[1:] = [now, size]
+
+    def active(self):
+        """{session id: state bytes} of the sessions seen within idle_seconds (older ones are dropped)."""
+        now = self._clock()
+        with self._lock:
+            for session_id in [s for s, entry in self._sessions.items() if now - entry[0] > self.idle_seconds]:
+                del self._sessions[session_id]
+            return {session_id: entry[2] for session_id, entry in self._sessions.items()}
+
+
+sessions = SessionRegistry()
+
+
+@registry.collector
+def _session_metrics():
+    sizes = list(sessions.active().values())
+    return [
+        ('planner_active_sessions', 'gauge', f"Sessions with a rerun in the last {ACTIVE_SESSION_SECONDS // 60} minutes.",
+         [({}, len(sizes))]),
+        ('planner_session_state_bytes', 'gauge', "Estimated session state size across active sessions.",
+         [({'stat': 'max'}, max(sizes, default=0)), ({'stat': 'mean'}, float(np.mean(sizes)) if sizes else 0.0),
+          ({'stat': 'sum'}, sum(sizes))]),
+    ]
+
+
+# --- Caches and process ---
+
+def _cache_stats():
+    # Imported here: the caches' modules import this one (charts) or are heavier than a scrape needs at import
+    from planner.batch import _use_case_uniforms
+    from planner.charts import chart_cache
+    from planner.memo import cached_simulate_dimension_ratings, cached_optimize_use_cases
+
+    use_case_draws = _use_case_uniforms.cache_info()
+    return {
+        'charts': chart_cache.stats(),
+        'dimension_ratings': cached_simulate_dimension_ratings.memo.stats(),
+        'use_case_optimizer': cached_optimize_use_cases.memo.stats(),
+        'use_case_draws': {'entries': use_case_draws.currsize, 'hits': use_case_draws.hits, 'misses': use_case_draws.misses},
+    }
+
+
+@registry.collector
+def _cache_metrics():
+    stats = _cache_stats()
+    return [
+        ('planner_cache_hits_total', 'counter', "Data cache hits.", [({'cache': c}, s['hits']) for c, s in stats.items()]),
+        ('planner_cache_misses_total', 'counter', "Data cache misses.", [({'cache': c}, s['misses']) for c, s in stats.items()]),
+        ('planner_cache_hit_ratio', 'gauge', "Hits / lookups since process start (0 before the first lookup).",
+         [({'cache': c}, s['hits'] / (s['hits'] + s['misses']) if s['hits'] + s['misses'] else 0.0)
+          for c, s in stats.items()]),
+        ('planner_cache_entries', 'gauge', "Entries held by each data cache.", [({'cache': c}, s['entries']) for c, s in stats.items()]),
+        ('planner_chart_cache_bytes', 'gauge', "PNG bytes held by the chart cache.", [({}, stats['charts']['bytes'])]),
+    ]
+
+
+def resident_memory_bytes():
+    """Resident memory of this process, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+@registry.collector
+def _process_metrics():
+    resident = resident_memory_bytes()
+    if resident is None:
+        return []
+    return [('planner_process_resident_memory_bytes', 'gauge', "Resident memory of the server process.",
+             [({}, resident)])]
+
+
+# --- Exporters ---
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, addr='0.0.0.0'):
+    """Serve /metrics from a daemon thread; returns the server (port 0 picks a free port)."""
+    server = http.server.ThreadingHTTPServer((addr, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='planner-metrics-http', daemon=True).start()
+    return server
+
+
+def write_metrics_file(path):
+    """Write the metrics to `path` atomically, so a reader never sees a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(registry.render())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def start_file_writer(path, interval=DEFAULT_METRICS_INTERVAL):
+    """Rewrite `path` every `interval` seconds from a daemon thread."""
+    def run():
+        while True:
+            try:
+                write_metrics_file(path)
+            except OSError as e:
+                print(f"planner metrics: cannot write {path}: {e}", file=sys.stderr)
+            time.sleep(interval)
+    thread = threading.Thread(target=run, name='planner-metrics-file', daemon=True)
+    thread.start()
+    return thread
+
+
+_exporters = {}
+_exporters_lock = threading.Lock()
+
+
+def start_exporters_from_env(environ=None):
+    """Start the exporters the environment asks for, once per process; returns them by kind."""
+    environ = os.environ if environ is None else environ
+    with _exporters_lock:
+        if 'http' not in _exporters and environ.get(METRICS_PORT_ENV_VAR):
+            _exporters['http'] = start_http_server(int(environ[METRICS_PORT_ENV_VAR]))
+        if 'file' not in _exporters and environ.get(METRICS_FILE_ENV_VAR):
+            interval = float(environ.get(METRICS_INTERVAL_ENV_VAR, DEFAULT_METRICS_INTERVAL))
+            _exporters['file'] = start_file_writer(environ[METRICS_FILE_ENV_VAR], interval)
+        return dict(_exporters)
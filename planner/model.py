@@ -0,0 +1,369 @@
+"""Headless scoring core for the AI Value Creation & Investment Efficiency Planner.
+
+Everything in here is plain pandas/NumPy with no Streamlit dependency, so it can be
+imported cheaply by the app, batch scripts and worker processes alike.
+"""
+import numpy as np
+import pandas as pd
+
+from planner.profiling import profiled
+from planner.reference import frozen, SharedFrames
+from planner.seeding import stable_rng
+
+# --- Model Coefficients and Constants ---
+# Reference tables are shared by every session in the process, so they are read-only
+model_coefficients = frozen({
+    'alpha': 0.65,  # Weight on idiosyncratic readiness
+    'beta': 0.15,   # Synergy coefficient
+    'gamma': 0.035,  # Value creation coefficient for Org-AI-R to EBITDA mapping
+    'epsilon': 0.30,  # Screening score weight for external signals
+    'w1_exit': 0.35,  # Exit-Readiness: Visible weight
+    'w2_exit': 0.40,  # Exit-Readiness: Documented weight
+    'w3_exit': 0.25,  # Exit-Readiness: Sustainable weight
+    'delta_exit': 2.0  # AI premium coefficient for exit multiple
+})
+
+# Systematic Opportunity (H_org,k^R) scores by sector
+systematic_opportunity_scores = frozen({
+    'Manufacturing': 72, 'Healthcare': 78, 'Retail': 75,
+    'Business Services': 80, 'Technology': 85
+})
+
+# General Dimension Weights
+general_dimension_weights = frozen({
+    'Data Infrastructure': 0.25, 'AI Governance': 0.20, 'Technology Stack': 0.15,
+    'Talent': 0.15, 'Leadership': 0.10, 'Use Case Portfolio': 0.10, 'Culture': 0.05
+})
+
+# Sector-Specific Dimension Weight Adjustments
+sector_dimension_weight_adjustments = frozen({
+    'Manufacturing': {
+        'Data Infrastructure': 0.28, 'AI Governance': 0.15, 'Technology Stack': 0.18,
+        'Talent': 0.15, 'Leadership': 0.08, 'Use Case Portfolio': 0.12, 'Culture': 0.04
+    },
+    'Healthcare': {
+        'Data Infrastructure': 0.28, 'AI Governance': 0.25, 'Technology Stack': 0.12,
+        'Talent': 0.15, 'Leadership': 0.08, 'Use Case Portfolio': 0.08, 'Culture': 0.04
+    },
+    'Retail': {
+        'Data Infrastructure': 0.28, 'AI Governance': 0.12, 'Technology Stack': 0.18,
+        'Talent': 0.14, 'Leadership': 0.10, 'Use Case Portfolio': 0.13, 'Culture': 0.05
+    },
+    'Business Services': {
+        'Data Infrastructure': 0.22, 'AI Governance': 0.18, 'Technology Stack': 0.15,
+        'Talent': 0.20, 'Leadership': 0.10, 'Use Case Portfolio': 0.10, 'Culture': 0.05
+    },
+    'Technology': {
+        'Data Infrastructure': 0.22, 'AI Governance': 0.15, 'Technology Stack': 0.20,
+        'Talent': 0.22, 'Leadership': 0.08, 'Use Case Portfolio': 0.10, 'Culture': 0.03
+    }
+})
+
+# Combine weights into a DataFrame
+
+
+def get_all_dimension_weights_df():
+    df = pd.DataFrame(dict(general_dimension_weights), index=['General']).T
+    for sector, weights in sector_dimension_weight_adjustments.items():
+        df[sector] = pd.Series(weights)
+    return df
+
+
+all_dimension_weights_df = get_all_dimension_weights_df()
+
+# High-Value Use Cases by Sector
+
+
+def get_high_value_use_cases():
+    return {
+        'Manufacturing': pd.DataFrame([
+            {'Use Case': 'Predictive Maintenance', 'Complexity': 'Medium',
+                'Timeline (months)': '6-12', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 4, 'Description': 'AI-driven equipment monitoring reducing unplanned downtime 15-25%'},
+            {'Use Case': 'Quality Control (CV)', 'Complexity': 'Medium', 'Timeline (months)': '6-9', 'EBITDA Impact (min%)': 1,
+             'EBITDA Impact (max%)': 3, 'Description': 'Computer vision defect detection improving yield 5-10%'},
+            {'Use Case': 'Demand Forecasting', 'Complexity': 'Low-Medium',
+                'Timeline (months)': '3-6', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 2, 'Description': 'ML-based demand planning reducing inventory costs 10-20%'},
+            {'Use Case': 'Supply Chain Optimization', 'Complexity': 'High',
+                'Timeline (months)': '12-18', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 3, 'Description': 'AI route optimization and supplier risk monitoring'},
+        ]),
+        'Healthcare': pd.DataFrame([
+            {'Use Case': 'Revenue Cycle Management', 'Complexity': 'Medium',
+                'Timeline (months)': '6-9', 'EBITDA Impact (min%)': 3, 'EBITDA Impact (max%)': 5, 'Description': 'AI-driven claims processing reducing denials 15-25%'},
+            {'Use Case': 'Clinical Documentation', 'Complexity': 'Medium',
+                'Timeline (months)': '6-12', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 2, 'Description': 'NLP-powered coding improving accuracy and speed'},
+            {'Use Case': 'Patient Scheduling', 'Complexity': 'Low-Medium',
+                'Timeline (months)': '3-6', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 3, 'Description': 'Predictive scheduling reducing wait times, improving utilization'},
+            {'Use Case': 'Diagnostic AI', 'Complexity': 'High', 'Timeline (months)': '12-24', 'EBITDA Impact (min%)': 0,
+             'EBITDA Impact (max%)': 0, 'Description': 'AI imaging analysis (radiology, pathology). Variable impact.'},
+        ]),
+        'Retail': pd.DataFrame([
+            {'Use Case': 'Demand Forecasting', 'Complexity': 'Medium',
+                'Timeline (months)': '6-9', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 3, 'Description': 'ML-powered inventory optimization'},
+            {'Use Case': 'Personalization', 'Complexity': 'Medium',
+                'Timeline (months)': '6-12', 'EBITDA Impact (min%)': 0.5, 'EBITDA Impact (max%)': 1, 'Description': 'AI-driven product recommendations'},
+            {'Use Case': 'Dynamic Pricing', 'Complexity': 'High',
+                'Timeline (months)': '9-15', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 2, 'Description': 'Real-time price optimization'},
+            {'Use Case': 'Customer Service Chatbot', 'Complexity': 'Low',
+                'Timeline (months)': '3-6', 'EBITDA Impact (min%)': 0.5, 'EBITDA Impact (max%)': 1, 'Description': 'AI chatbots reducing contact center costs'},
+        ]),
+        'Business Services': pd.DataFrame([
+            {'Use Case': 'Document Processing', 'Complexity': 'Low-Medium',
+                'Timeline (months)': '3-6', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 4, 'Description': 'AI extraction and analysis'},
+            {'Use Case': 'Knowledge Worker Tools', 'Complexity': 'Low',
+                'Timeline (months)': '1-3', 'EBITDA Impact (min%)': 3, 'EBITDA Impact (max%)': 5, 'Description': 'Gen AI tools improving output'},
+            {'Use Case': 'Sales Enablement', 'Complexity': 'Medium',
+                'Timeline (months)': '6-9', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 3, 'Description': 'AI-powered proposal generation'},
+            {'Use Case': 'Contract Analysis', 'Complexity': 'Medium',
+                'Timeline (months)': '6-9', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 2, 'Description': 'AI review of legal/procurement documents'},
+        ]),
+        'Technology': pd.DataFrame([
+            {'Use Case': 'Product AI Embedding', 'Complexity': 'High',
+                'Timeline (months)': '12-24', 'EBITDA Impact (min%)': 5, 'EBITDA Impact (max%)': 10, 'Description': 'Embedding AI as core product features'},
+            {'Use Case': 'Automated Code Generation', 'Complexity': 'Medium',
+                'Timeline (months)': '6-12', 'EBITDA Impact (min%)': 3, 'EBITDA Impact (max%)': 6, 'Description': 'AI assistance for software development'},
+            {'Use Case': 'Predictive Cybersecurity', 'Complexity': 'High',
+                'Timeline (months)': '9-18', 'EBITDA Impact (min%)': 2, 'EBITDA Impact (max%)': 4, 'Description': 'AI for threat detection and prevention'},
+            {'Use Case': 'ML-driven DevOps', 'Complexity': 'Medium',
+                'Timeline (months)': '6-12', 'EBITDA Impact (min%)': 1, 'EBITDA Impact (max%)': 3, 'Description': 'AI for optimizing deployment pipelines'},
+        ])
+    }
+
+
+# Lookups hand out independent copies (shared_copy), so callers can never modify the shared catalog
+high_value_use_cases = SharedFrames(get_high_value_use_cases())
+
+# Default use cases pre-selected for each sector when a company is (re)selected
+default_use_cases_for_sector = frozen({
+    'Manufacturing': ('Predictive Maintenance', 'Demand Forecasting'),
+    'Healthcare': ('Revenue Cycle Management', 'Patient Scheduling'),
+    'Retail': ('Demand Forecasting', 'Personalization'),
+    'Business Services': ('Document Processing', 'Knowledge Worker Tools'),
+    'Technology': ('Product AI Embedding', 'Automated Code Generation')
+})
+
+# Baseline (pre-AI) exit multiples by sector
+sector_base_multiples = frozen({'Manufacturing': 6.0, 'Healthcare': 7.5,
+                               'Retail': 5.5, 'Business Services': 8.0, 'Technology': 10.0})
+DEFAULT_BASE_MULTIPLE = 6.5
+
+
+# --- Core Functions ---
+
+
+@profiled
+def calculate_org_ai_r(V_org_R, H_org_k_R, synergy_score, alpha, beta):
+    return round((alpha * V_org_R) + ((1 - alpha) * H_org_k_R) + (beta * synergy_score), 2)
+
+
+@profiled
+def calculate_screening_score(H_org_k_R, external_signals_score, epsilon):
+    return round(H_org_k_R + (epsilon * external_signals_score), 2)
+
+
+def screening_recommendation(screening_score, org_ai_r):
+    if screening_score > 120 and org_ai_r > 60:
+        return "Strong AI candidate: High potential and readiness. Prioritize for deep dive."
+    elif screening_score > 100 or org_ai_r > 50:
+        return "Promising AI candidate: Investigate further. May have specific strengths."
+    return "Watchlist: Lower immediate AI priority. Monitor for changes or specific, targeted initiatives."
+
+
+def simulate_dimension_ratings(company_name, sector, is_target=False):
+    rng = stable_rng('dimension_ratings', company_name, sector, is_target)
+    ratings = {}
+    for dim in general_dimension_weights.keys():
+        if is_target:
+            # Target ratings tend to be higher (3,4,5)
+            ratings[dim] = rng.integers(3, 6)
+        else:
+            # Current ratings for baseline (1,2,3)
+            ratings[dim] = rng.integers(1, 4)
+    return pd.Series(ratings, name='Rating (1-5)')
+
+
+def calculate_dimension_score(ratings):
+    return ((ratings / 5) * 100).round(2)
+
+
+@profiled
+def calculate_V_org_R(dimension_scores, sector_weights):
+    aligned_scores = dimension_scores.reindex(
+        sector_weights.index, fill_value=0)
+    weighted_sum = (aligned_scores * sector_weights).sum()
+    return round(weighted_sum, 2)
+
+
+def calculate_synergy(V_org_R, H_org_k_R):
+    return min(V_org_R, H_org_k_R)
+
+
+# Project-estimation lookups shared by the scalar and batch estimators
+complexity_map = frozen({'Low': 0.7, 'Low-Medium': 0.6,
+                         'Medium': 0.5, 'High': 0.3})
+timeline_map_avg = frozen({'1-3': 2, '3-6': 4.5, '6-9': 7.5,
+                           '6-12': 9, '9-15': 12, '12-18': 15, '12-24': 18})
+DEFAULT_COMPLEXITY_FACTOR = 0.5
+DEFAULT_TIMELINE_MONTHS = 6
+
+# Column order of the planned-initiatives table
+PLANNED_INITIATIVE_COLUMNS = [
+    'Use Case', 'Complexity', 'Timeline (months)', 'Investment ($M)', 'Probability of Success',
+    'Execution Quality', 'EBITDA Impact (%)', 'EBITDA Impact ($M)', 'Delta Org-AI-R'
+]
+
+
+def use_case_rng(use_case_name):
+    return stable_rng('use_case', use_case_name)
+
+
+@profiled
+def estimate_project_parameters(use_case_data, current_V_org_R, H_org_k_R, initial_ebitda_M, user_investment=None, user_prob_success=None, user_exec_quality=None):
+    complexity_factor = complexity_map.get(use_case_data['Complexity'], DEFAULT_COMPLEXITY_FACTOR)
+    timeline_months_str = str(use_case_data['Timeline (months)'])
+    timeline_months_numeric = timeline_map_avg.get(timeline_months_str, DEFAULT_TIMELINE_MONTHS)
+
+    rng = use_case_rng(use_case_data['Use Case'])
+
+    # Every estimate is rounded as a Python float: round() on NumPy scalars rounds the
+    # binary value x100 half to even, so ties would otherwise depend on the input types
+    default_investment_cost_M = round(float(
+        0.2 * complexity_factor * (timeline_months_numeric / 6) * rng.uniform(0.8, 1.2) + 0.1), 2)
+    default_prob_success = round(float(np.clip(
+        0.6 + (current_V_org_R / 100 * 0.2) - (complexity_factor * 0.3), 0.5, 0.95)), 2)
+    default_exec_quality = round(float(
+        np.clip(current_V_org_R / 100 * 0.8, 0.6, 0.9)), 2)
+
+    investment_cost_M = user_investment if user_investment is not None else default_investment_cost_M
+    prob_success = user_prob_success if user_prob_success is not None else default_prob_success
+    exec_quality = user_exec_quality if user_exec_quality is not None else default_exec_quality
+
+    ebitda_impact_pct_base = rng.uniform(
+        use_case_data['EBITDA Impact (min%)'], use_case_data['EBITDA Impact (max%)'])
+    if use_case_data['Use Case'] == 'Diagnostic AI' and ebitda_impact_pct_base == 0:
+        ebitda_impact_pct_base = rng.uniform(1, 3)
+
+    ebitda_impact_pct_contextual = ebitda_impact_pct_base * \
+        (H_org_k_R / 100) * (current_V_org_R / 100 * 0.5 + 0.5)
+    ebitda_impact_pct_adjusted = round(float(
+        ebitda_impact_pct_contextual * prob_success * exec_quality), 2)
+    ebitda_impact_M = round(float(
+        initial_ebitda_M * (ebitda_impact_pct_adjusted / 100)), 2)
+
+    delta_org_ai_r_base = round(float(rng.uniform(
+        5, 15) * complexity_factor * (ebitda_impact_pct_base / 2)), 2)
+    delta_org_ai_r_adjusted = round(float(
+        delta_org_ai_r_base * prob_success * exec_quality), 2)
+    if delta_org_ai_r_adjusted < 1:
+        delta_org_ai_r_adjusted = 1
+
+    return {
+        'Investment ($M)': investment_cost_M,
+        'Probability of Success': prob_success,
+        'Execution Quality': exec_quality,
+        'EBITDA Impact (%)': ebitda_impact_pct_adjusted,
+        'EBITDA Impact ($M)': ebitda_impact_M,
+        'Delta Org-AI-R': delta_org_ai_r_adjusted,
+        'Timeline (months)': timeline_months_numeric
+    }
+
+
+# Column order of the plan trajectory table
+PLAN_TRAJECTORY_COLUMNS = [
+    'Year', 'Org-AI-R', 'EBITDA Impact ($M) - Annual', 'Cumulative EBITDA Impact ($M)',
+    'Investment ($M) - Annual', 'Cumulative Investment ($M)'
+]
+
+
+def plan_trajectory_arrays(timeline_months, investment_M, delta_org_ai_r, ebitda_impact_M, total_years,
+                           group_codes=None, n_groups=1):
+    """
+    Array kernel behind create_multi_year_plan.
+
+    Each initiative completes in year min(total_years, ceil(months / 12)); its investment and
+    Org-AI-R delta land in that year and its EBITDA impact recurs every year from then on.
+    Initiatives are bucketed per (group, completion year) with np.bincount and rolled
+    forward with cumulative sums, so the cost is linear in initiatives + years. Returns
+    (n_groups x total_years) arrays for years 1..total_years.
+
+    Sums are taken per completion year instead of initiative by initiative, so the floating-point
+    totals can differ from the original per-initiative loop in the last bits. On the app's
+    $0.01M / 0.01-point grid the rounded plan is identical; with finer inputs a total can land
+    on the other side of a rounding tie and differ by 0.01.
+    """
+    completion_year = np.minimum(
+        total_years, np.ceil(np.asarray(timeline_months, dtype=np.float64) / 12)).astype(np.intp)
+    active = completion_year > 0
+    group_codes = np.zeros(len(completion_year), dtype=np.intp) if group_codes is None else np.asarray(group_codes)
+    bins = total_years + 1
+    flat_bin = group_codes[active] * bins + completion_year[active]
+
+    def added_per_year(values):
+        values = np.asarray(values, dtype=np.float64)[active]
+        return np.bincount(flat_bin, weights=values, minlength=n_groups * bins).reshape(n_groups, bins)[:, 1:]
+
+    investment_annual = added_per_year(investment_M)
+    ebitda_annual = np.cumsum(added_per_year(ebitda_impact_M), axis=1)
+    return {
+        'Delta Org-AI-R - Cumulative': np.cumsum(added_per_year(delta_org_ai_r), axis=1),
+        'EBITDA Impact ($M) - Annual': ebitda_annual,
+        'Cumulative EBITDA Impact ($M)': np.cumsum(ebitda_annual, axis=1),
+        'Investment ($M) - Annual': investment_annual,
+        'Cumulative Investment ($M)': np.cumsum(investment_annual, axis=1),
+    }
+
+
+@profiled
+def create_multi_year_plan(company_name, initial_org_ai_r, initial_ebitda_M, planned_initiatives_df, H_org_k_R, total_years=3):
+    trajectory = plan_trajectory_arrays(
+        planned_initiatives_df['Timeline (months)'].to_numpy(),
+        planned_initiatives_df['Investment ($M)'].to_numpy(),
+        planned_initiatives_df['Delta Org-AI-R'].to_numpy(),
+        planned_initiatives_df['EBITDA Impact ($M)'].to_numpy(),
+        total_years,
+    )
+    return pd.DataFrame({
+        'Year': np.arange(1, total_years + 1),
+        'Org-AI-R': np.round(initial_org_ai_r + trajectory['Delta Org-AI-R - Cumulative'][0], 2),
+        'EBITDA Impact ($M) - Annual': np.round(trajectory['EBITDA Impact ($M) - Annual'][0], 2),
+        'Cumulative EBITDA Impact ($M)': np.round(trajectory['Cumulative EBITDA Impact ($M)'][0], 2),
+        'Investment ($M) - Annual': np.round(trajectory['Investment ($M) - Annual'][0], 2),
+        'Cumulative Investment ($M)': np.round(trajectory['Cumulative Investment ($M)'][0], 2),
+    }, columns=PLAN_TRAJECTORY_COLUMNS)
+
+
+@profiled
+def calculate_ai_investment_efficiency(delta_org_ai_r, total_ai_investment_M, total_ebitda_impact_M):
+    if total_ai_investment_M <= 0:
+        return 0.0
+    aie_score = (delta_org_ai_r / total_ai_investment_M) * \
+        total_ebitda_impact_M
+    return round(aie_score, 2)
+
+
+@profiled
+def calculate_within_portfolio_percentile(company_org_ai_r, portfolio_org_ai_rs):
+    if not portfolio_org_ai_rs or len(portfolio_org_ai_rs) == 0:
+        return 0.0
+    sorted_scores = sorted(portfolio_org_ai_rs)
+    rank = sum(1 for score in sorted_scores if score <= company_org_ai_r)
+    percentile = (rank / len(portfolio_org_ai_rs)) * 100
+    return round(percentile, 2)
+
+
+@profiled
+def calculate_cross_portfolio_z_score(company_org_ai_r, industry_mean, industry_std):
+    if industry_std == 0 or np.isnan(industry_std):
+        return 0.0
+    z_score = (company_org_ai_r - industry_mean) / industry_std
+    return round(z_score, 2)
+
+
+@profiled
+def assess_exit_readiness(visible_score, documented_score, sustainable_score, w1, w2, w3):
+    return round((w1 * visible_score) + (w2 * documented_score) + (w3 * sustainable_score), 2)
+
+
+@profiled
+def predict_exit_multiple(base_multiple, exit_ai_r, delta):
+    return round(base_multiple + (delta * exit_ai_r / 100), 2)
+
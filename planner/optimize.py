@@ -0,0 +1,212 @@
+"""Budget-constrained selection of AI initiatives.
+
+Every plan total at the horizon is a weighted sum over the selected initiatives
+(initiative_plan_weights): cumulative EBITDA uses the years each impact is live, Org-AI-R
+uplift and investment count every initiative that completes within the horizon. Maximizing
+cumulative EBITDA or final Org-AI-R under a budget is therefore a 0/1 knapsack, solved exactly
+by dynamic programming over investment in cents. AIE = (Delta Org-AI-R / Investment) x EBITDA
+is not additive, so it is solved exactly by enumerating subsets of small catalogs and by
+greedy construction plus local search for large ones.
+"""
+import numpy as np
+
+from planner.batch import estimate_project_parameters_batch, initiative_plan_weights
+from planner.model import high_value_use_cases, systematic_opportunity_scores
+from planner.profiling import profiled
+
+OBJECTIVES = {
+    'ebitda': 'Cumulative EBITDA Impact ($M)',
+    'org_ai_r': 'Final Org-AI-R',
+    'aie': 'AIE',
+}
+# Investment granularity of the knapsack DP; estimates and widgets are in $0.01M steps
+COST_RESOLUTION_M = 0.01
+# Largest (candidates x budget steps) table the DP builds before falling back to greedy
+DP_MAX_CELLS = 50_000_000
+# Largest catalog whose 2^n subsets are enumerated exactly for the AIE objective
+ENUMERATION_MAX_CANDIDATES = 18
+_ENUMERATION_BLOCK = 1 << 16
+# Smallest value/budget difference treated as a real improvement or overrun
+VALUE_TOLERANCE = 1e-9
+
+
+def candidate_contributions(candidates_df, total_years):
+    """Per-candidate (investment, cumulative EBITDA, Org-AI-R uplift) at the horizon."""
+    years_live, completes = initiative_plan_weights(candidates_df['Timeline (months)'].to_numpy(), total_years)
+    cost = candidates_df['Investment ($M)'].to_numpy(dtype=np.float64) * completes
+    ebitda = candidates_df['EBITDA Impact ($M)'].to_numpy(dtype=np.float64) * years_live
+    delta = candidates_df['Delta Org-AI-R'].to_numpy(dtype=np.float64) * completes
+    return cost, ebitda, delta
+
+
+def aie_from_totals(delta_sum, cost_sum, ebitda_sum):
+    """AIE of selections with the given totals (scalars or arrays), 0 where nothing is invested."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(cost_sum > 0, delta_sum / cost_sum * ebitda_sum, 0.0)
+
+
+def knapsack_table(units, value, capacity):
+    """
+    0/1 knapsack DP over integer costs. best[c] is the highest value with total cost <= c;
+    take[i, c] records whether item i is in that optimum (see knapsack_selection).
+    """
+    best = np.zeros(capacity + 1)
+    take = np.zeros((len(units), capacity + 1), dtype=bool)
+    for i, (w, v) in enumerate(zip(units, value)):
+        if v <= 0 or w > capacity:
+            continue
+        candidate = best[:capacity + 1 - w] + v
+        improves = candidate > best[w:] + VALUE_TOLERANCE
+        take[i, w:] = improves
+        best[w:] = np.where(improves, candidate, best[w:])
+    return best, take
+
+
+def knapsack_selection(take, units, capacity):
+    selected, c = [], capacity
+    for i in range(len(units) - 1, -1, -1):
+        if take[i, c]:
+            selected.append(i)
+            c -= units[i]
+    return np.array(sorted(selected), dtype=np.intp)
+
+
+def cost_units(cost_M):
+    return np.round(np.asarray(cost_M) / COST_RESOLUTION_M).astype(np.int64)
+
+
+def _knapsack_dp(cost, value, budget_M):
+    units = cost_units(cost)
+    capacity = int(np.floor(budget_M / COST_RESOLUTION_M + VALUE_TOLERANCE))
+    _, take = knapsack_table(units, value, capacity)
+    return knapsack_selection(take, units, capacity)
+
+
+def _greedy_additive(cost, value, budget_M):
+    # Best value density first; zero-cost positive items always fit
+    with np.errstate(divide='ignore'):
+        density = np.where(cost > 0, value / cost, np.inf)
+    selected, spent = [], 0.0
+    for i in np.argsort(-density, kind='stable'):
+        if value[i] > 0 and spent + cost[i] <= budget_M + VALUE_TOLERANCE:
+            selected.append(i)
+            spent += cost[i]
+    return np.array(sorted(selected), dtype=np.intp)
+
+
+def _enumerate_aie(cost, ebitda, delta, budget_M):
+    n = len(cost)
+    best_value, best_cost, best_mask = 0.0, 0.0, 0
+    bits = np.arange(n)
+    for start in range(0, 1 << n, _ENUMERATION_BLOCK):
+        masks = np.arange(start, min(start + _ENUMERATION_BLOCK, 1 << n))
+        membership = ((masks[:, np.newaxis] >> bits) & 1).astype(np.float64)
+        cost_sum = membership @ cost
+        value = np.where(cost_sum <= budget_M + VALUE_TOLERANCE,
+                         aie_from_totals(membership @ delta, cost_sum, membership @ ebitda), -np.inf)
+        # Highest AIE, then cheapest
+        i = np.lexsort((cost_sum, -value))[0]
+        if value[i] > best_value + VALUE_TOLERANCE or (
+                abs(value[i] - best_value) <= VALUE_TOLERANCE and cost_sum[i] < best_cost):
+            best_value, best_cost, best_mask = value[i], cost_sum[i], masks[i]
+    return np.flatnonzero((best_mask >> bits) & 1).astype(np.intp)
+
+
+def local_search_aie(cost, ebitda, delta, budget_M, max_rounds=200):
+    """Positions of a good (not necessarily optimal) AIE selection within `budget_M`."""
+    n = len(cost)
+    chosen = np.zeros(n, dtype=bool)
+
+    def totals(mask):
+        return cost @ mask, ebitda @ mask, delta @ mask
+
+    # Greedy construction: add whichever candidate raises AIE most while it fits
+    while True:
+        c, e, d = totals(chosen)
+        trial = aie_from_totals(d + delta, c + cost, e + ebitda)
+        trial[chosen | (c + cost > budget_M + VALUE_TOLERANCE)] = -np.inf
+        i = int(np.argmax(trial))
+        if not np.isfinite(trial[i]) or trial[i] <= aie_from_totals(d, c, e) + VALUE_TOLERANCE:
+            break
+        chosen[i] = True
+
+    # Local search over single drops, adds and swaps
+    for _ in range(max_rounds):
+        c, e, d = totals(chosen)
+        current = aie_from_totals(d, c, e)
+        sign = np.where(chosen, -1.0, 1.0)
+        flip_cost, flip_ebitda, flip_delta = c + sign * cost, e + sign * ebitda, d + sign * delta
+        flip = np.where(flip_cost <= budget_M + VALUE_TOLERANCE,
+                        aie_from_totals(flip_delta, flip_cost, flip_ebitda), -np.inf)
+
+        inside, outside = np.flatnonzero(chosen), np.flatnonzero(~chosen)
+        swap_cost = c - cost[inside][:, np.newaxis] + cost[outside]
+        swap = np.where(swap_cost <= budget_M + VALUE_TOLERANCE,
+                        aie_from_totals(d - delta[inside][:, np.newaxis] + delta[outside], swap_cost,
+                                        e - ebitda[inside][:, np.newaxis] + ebitda[outside]), -np.inf)
+
+        best_flip = int(np.argmax(flip)) if n else 0
+        best_swap = np.unravel_index(int(np.argmax(swap)), swap.shape) if swap.size else None
+        flip_value = flip[best_flip] if n else -np.inf
+        swap_value = swap[best_swap] if best_swap is not None else -np.inf
+        if max(flip_value, swap_value) <= current + VALUE_TOLERANCE:
+            break
+        if flip_value >= swap_value:
+            chosen[best_flip] = ~chosen[best_flip]
+        else:
+            chosen[inside[best_swap[0]]] = False
+            chosen[outside[best_swap[1]]] = True
+    return np.flatnonzero(chosen).astype(np.intp)
+
+
+def optimize_initiatives(candidates_df, budget_M, total_years=3, objective='ebitda', initial_org_ai_r=0.0,
+                         exact_max_candidates=ENUMERATION_MAX_CANDIDATES):
+    """
+    Choose the subset of `candidates_df` (planned-initiative rows, e.g. from
+    estimate_project_parameters_batch) maximizing `objective` ('ebitda', 'org_ai_r' or 'aie',
+    see OBJECTIVES) with total investment <= `budget_M` over `total_years`.
+
+    Returns a dict with the selected rows, the plan totals of the selection and the method
+    used ('dynamic-programming', 'enumeration', 'greedy' or 'local-search').
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; expected one of {sorted(OBJECTIVES)}")
+    cost, ebitda, delta = candidate_contributions(candidates_df, total_years)
+    n = len(cost)
+
+    if objective == 'aie':
+        if n <= exact_max_candidates:
+            selected, method = _enumerate_aie(cost, ebitda, delta, budget_M), 'enumeration'
+        else:
+            selected, method = local_search_aie(cost, ebitda, delta, budget_M), 'local-search'
+    else:
+        value = ebitda if objective == 'ebitda' else delta
+        if n * (budget_M / COST_RESOLUTION_M + 1) <= DP_MAX_CELLS:
+            selected, method = _knapsack_dp(cost, value, budget_M), 'dynamic-programming'
+        else:
+            selected, method = _greedy_additive(cost, value, budget_M), 'greedy'
+
+    total_cost, total_ebitda, total_delta = cost[selected].sum(), ebitda[selected].sum(), delta[selected].sum()
+    totals = {
+        'Total Investment ($M)': float(total_cost),
+        'Cumulative EBITDA Impact ($M)': float(total_ebitda),
+        'Final Org-AI-R': float(initial_org_ai_r + total_delta),
+        'AIE': float(aie_from_totals(total_delta, total_cost, total_ebitda)),
+    }
+    return {
+        'Selected': candidates_df.iloc[selected],
+        'Objective': objective,
+        'Objective Value': totals[OBJECTIVES[objective]],
+        'Method': method,
+        **totals,
+    }
+
+
+@profiled
+def optimize_use_cases(sector, current_V_org_R, initial_ebitda_M, initial_org_ai_r, budget_M, total_years=3,
+                       objective='ebitda', catalog=None):
+    """optimize_initiatives over a sector's high-value use-case catalog with default estimates."""
+    catalog = high_value_use_cases if catalog is None else catalog
+    candidates = estimate_project_parameters_batch(
+        catalog[sector], current_V_org_R, systematic_opportunity_scores[sector], initial_ebitda_M)
+    return optimize_initiatives(candidates, budget_M, total_years, objective, initial_org_ai_r)
@@ -0,0 +1,126 @@
+"""Non-interactive run of the full six-step pipeline over a file of companies.
+
+Every company in a CSV or Parquet file (the planner.ingest layout, plus optional screening
+and exit-readiness columns) goes through what the app does for one company: screening,
+V_org_R and Org-AI-R, the sector's default use-case estimates, the multi-year plan, AIE,
+exit readiness and valuation. Chunks are scored independently, so with `n_workers` > 1
+they are spread over a process pool; at most two chunks per worker are in flight, so the
+reader never runs far ahead of the pool. The portfolio percentile and z-score of each
+company's final Org-AI-R need the whole file and are added once every chunk is back.
+
+Results are identical for any `n_workers` and `chunk_rows`. `python -m planner` is the
+command-line entry point.
+"""
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from planner.batch import batch_exit_valuation
+from planner.ingest import DEFAULT_CHUNK_ROWS, INGEST_COLUMNS, detect_file_format, read_company_chunks, plan_company_chunk
+from planner.model import sector_base_multiples, screening_recommendation, DEFAULT_BASE_MULTIPLE
+
+# Optional input columns and the values the app starts every company with; blanks get them too
+PIPELINE_DEFAULTS = {
+    'External Signals Score': 45,
+    'Visible Score': 75,
+    'Documented Score': 80,
+    'Sustainable Score': 70,
+}
+# 'Base Exit Multiple' is optional too; missing values fall back to the sector's multiple
+PIPELINE_INPUT_COLUMNS = INGEST_COLUMNS + list(PIPELINE_DEFAULTS) + ['Base Exit Multiple']
+
+PIPELINE_COLUMNS = [
+    'Company', 'Sector', 'EBITDA ($M)', 'V_org_R', 'H_org_k_R', 'Synergy', 'Org-AI-R',
+    'Screening Score', 'Screening Recommendation', 'Final Org-AI-R', 'Delta Org-AI-R', 'Investment ($M)',
+    'Cumulative EBITDA Impact ($M)', 'AIE', 'Org-AI-R Percentile', 'Org-AI-R Z-Score',
+    'Exit-AI-R', 'Exit Multiple', 'Projected EBITDA ($M)', 'Implied Valuation ($M)',
+]
+
+# screening_recommendation's three outcomes, strongest first
+RECOMMENDATIONS = (
+    screening_recommendation(np.inf, np.inf),
+    screening_recommendation(np.inf, 0),
+    screening_recommendation(0, 0),
+)
+
+
+def _input_column(chunk, column, default):
+    """An optional input column as floats, with `default` (a scalar or N-vector) where missing."""
+    default = np.broadcast_to(np.asarray(default, dtype=np.float64), len(chunk))
+    if column not in chunk:
+        return default.copy()
+    values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), default, values)
+
+
+def batch_screening_recommendation(screening_score, org_ai_r):
+    """screening_recommendation on arrays, as a Categorical over RECOMMENDATIONS."""
+    codes = np.select([(screening_score > 120) & (org_ai_r > 60), (screening_score > 100) | (org_ai_r > 50)],
+                      [0, 1], default=2)
+    return pd.Categorical.from_codes(codes, categories=RECOMMENDATIONS)
+
+
+def run_pipeline_chunk(chunk, total_years=3):
+    """
+    Run one chunk of companies through the pipeline. Returns a DataFrame in PIPELINE_COLUMNS
+    layout without the portfolio-wide 'Org-AI-R Percentile' and 'Org-AI-R Z-Score'.
+    """
+    external = _input_column(chunk, 'External Signals Score', PIPELINE_DEFAULTS['External Signals Score'])
+    planned = plan_company_chunk(chunk, total_years, external_signals_score=external)
+    result = pd.DataFrame({'Company': chunk['Company'].to_numpy(), 'Sector': chunk['Sector'].to_numpy(), **planned})
+    result['Screening Recommendation'] = batch_screening_recommendation(result['Screening Score'].to_numpy(),
+                                                                        result['Org-AI-R'].to_numpy())
+
+    visible, documented, sustainable = (_input_column(chunk, column, PIPELINE_DEFAULTS[column])
+                                        for column in ('Visible Score', 'Documented Score', 'Sustainable Score'))
+    sector_multiple = chunk['Sector'].map(dict(sector_base_multiples)).fillna(DEFAULT_BASE_MULTIPLE).to_numpy(dtype=np.float64)
+    base_multiple = _input_column(chunk, 'Base Exit Multiple', sector_multiple)
+    return result.assign(**batch_exit_valuation(visible, documented, sustainable, base_multiple,
+                                                planned['EBITDA ($M)'], planned['Cumulative EBITDA Impact ($M)']))
+
+
+def add_portfolio_benchmarks(results):
+    """
+    Add each company's percentile and z-score of Final Org-AI-R within `results`, computed
+    as planner.ingest.portfolio_benchmark does, for all companies at once.
+    """
+    values = results['Final Org-AI-R'].to_numpy(dtype=np.float64)
+    n = len(values)
+    percentile = np.searchsorted(np.sort(values), values, side='right') / max(n, 1) * 100
+    std = values.std(ddof=1) if n > 1 else np.nan
+    z_score = np.zeros(n) if std == 0 or np.isnan(std) else (values - values.mean()) / std
+    return results.assign(**{'Org-AI-R Percentile': np.round(percentile, 2), 'Org-AI-R Z-Score': np.round(z_score, 2)})
+
+
+def _bounded_map(pool, chunks, total_years, window):
+    # pool.map would read and submit the whole file up front; keep `window` chunks in flight
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.submit(run_pipeline_chunk, chunk, total_years))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_pipeline(source, total_years=3, chunk_rows=DEFAULT_CHUNK_ROWS, n_workers=1, file_format=None):
+    """Run every company in a portfolio file through the pipeline; one PIPELINE_COLUMNS row per company."""
+    chunks = read_company_chunks(source, chunk_rows, file_format, columns=PIPELINE_INPUT_COLUMNS)
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(_bounded_map(pool, chunks, total_years, window=2 * n_workers))
+    else:
+        results = [run_pipeline_chunk(chunk, total_years) for chunk in chunks]
+    if not results:
+        return pd.DataFrame(columns=PIPELINE_COLUMNS)
+    return add_portfolio_benchmarks(pd.concat(results, ignore_index=True))[PIPELINE_COLUMNS]
+
+
+def write_pipeline_results(results, destination):
+    """Write pipeline results as Parquet or CSV, by the extension of `destination`."""
+    if detect_file_format(destination) == 'parquet':
+        results.to_parquet(destination, index=False)
+    else:
+        results.to_csv(destination, index=False)
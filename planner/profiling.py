@@ -0,0 +1,200 @@
+"""Opt-in, per-rerun profiling of the planner's hot paths.
+
+Code marks its hot paths with `span(name)` blocks or the `@profiled` decorator. Nothing is
+recorded unless a Profiler is active in the current context (the app activates a session's
+profiler for one rerun at a time); otherwise a span costs one ContextVar lookup.
+
+An active profiler aggregates spans by call path (('Step 5', 'allocate_fund_budget'), ...):
+call count, total and self wall time and, with `track_memory`, net bytes allocated
+(tracemalloc, which is process-wide and slows every session while it runs). Each rerun's
+records are kept in a short history and export as JSON or as collapsed stacks
+("Step 5;allocate_fund_budget 1234", self time in microseconds) for flamegraph.pl,
+speedscope and similar viewers.
+"""
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+PROFILE_HISTORY = 20
+PROFILE_COLUMNS = ['Path', 'Calls', 'Total (ms)', 'Self (ms)', 'Net Allocated (KiB)']
+
+_active = contextvars.ContextVar('planner_profiler', default=None)
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def active_profiler():
+    return _active.get()
+
+
+def span(name):
+    """Context manager recording `name` under the active profiler, if any."""
+    profiler = _active.get()
+    return _NULL_SPAN if profiler is None else profiler.span(name)
+
+
+def open_span(name):
+    """Open a span on the active profiler (if any) that stays open until the end of the rerun."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.begin_span(name)
+
+
+def profiled(func=None, *, name=None):
+    """Decorator recording every call of `func` as a span (named by its qualname)."""
+    if func is None:
+        return functools.partial(profiled, name=name)
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _active.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.span(label):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def profiled_entry(func, get_profiler):
+    """
+    Wrap an entry point that can run on its own (a Streamlit fragment): inside a profiled
+    rerun it is a span, otherwise it is profiled as a rerun of its own with the profiler
+    `get_profiler()` returns (None to skip).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active.get() is not None:
+            with span(func.__name__):
+                return func(*args, **kwargs)
+        profiler = get_profiler()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.rerun(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class Profiler:
+    def __init__(self, track_memory=False, history=PROFILE_HISTORY):
+        self.track_memory = track_memory
+        self.reruns = collections.deque(maxlen=history)
+        self._records = None
+        self._stack = []
+        self._started_tracemalloc = False
+
+    # --- Reruns ---
+
+    def begin_rerun(self, label):
+        """
+        Activate this profiler in the current context; spans are recorded until end_rerun. A
+        rerun that never reached end_rerun (the script was stopped) is discarded.
+        """
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not self.track_memory:
+            self.close()
+        self._records = {}
+        self._stack = []
+        self._label = label
+        self._started = time.time()
+        _active.set(self)
+        self.begin_span(label)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def end_rerun(self):
+        """Close every open span and keep the rerun's records; returns them."""
+        if _active.get() is not self:
+            return None
+        while self._stack:
+            self.end_span()
+        _active.set(None)
+        rerun = {'label': self._label, 'started': self._started, 'seconds': self._records[(self._label,)][1],
+                 'records': self._records}
+        self.reruns.append(rerun)
+        return rerun
+
+    @contextlib.contextmanager
+    def rerun(self, label):
+        self.begin_rerun(label)
+        try:
+            yield self
+        finally:
+            self.end_rerun()
+
+    # --- Spans ---
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+    def begin_span(self, name):
+        """Open a span that stays open until end_span (or the end of the rerun)."""
+        path = (self._stack[-1][0] if self._stack else ()) + (name,)
+        self._records.setdefault(path, [0, 0.0, 0.0, 0])  # created on entry, so records stay in call order
+        # [path, start time, start memory, seconds spent in child spans]
+        self._stack.append([path, time.perf_counter(), self._memory(), 0.0])
+
+    def end_span(self):
+        path, start, start_memory, child_seconds = self._stack.pop()
+        seconds = time.perf_counter() - start
+        record = self._records[path]
+        record[0] += 1
+        record[1] += seconds
+        record[2] += seconds - child_seconds
+        record[3] += self._memory() - start_memory
+        if self._stack:
+            self._stack[-1][3] += seconds
+
+    @contextlib.contextmanager
+    def span(self, name):
+        self.begin_span(name)
+        try:
+            yield
+        finally:
+            self.end_span()
+
+    # --- Reports ---
+
+    def last_rerun(self):
+        return self.reruns[-1] if self.reruns else None
+
+    def table(self, rerun=None):
+        """One PROFILE_COLUMNS row per call path of `rerun` (default: the last), in call order."""
+        rerun = self.last_rerun() if rerun is None else rerun
+        records = rerun['records'] if rerun else {}
+        return pd.DataFrame([
+            {'Path': ' / '.join(path), 'Calls': calls, 'Total (ms)': round(seconds * 1e3, 2),
+             'Self (ms)': round(self_seconds * 1e3, 2), 'Net Allocated (KiB)': round(allocated / 1024, 1)}
+            for path, (calls, seconds, self_seconds, allocated) in records.items()
+        ], columns=PROFILE_COLUMNS)
+
+    def to_json(self, reruns=None):
+        """The recorded reruns (default: the whole history) as a JSON document."""
+        reruns = list(self.reruns) if reruns is None else reruns
+        return json.dumps([
+            {'label': rerun['label'], 'started': rerun['started'], 'seconds': rerun['seconds'],
+             'spans': [{'path': list(path), 'calls': calls, 'seconds': seconds, 'self_seconds': self_seconds,
+                        'net_allocated_bytes': allocated}
+                       for path, (calls, seconds, self_seconds, allocated) in rerun['records'].items()]}
+            for rerun in reruns
+        ], indent=2)
+
+    def to_collapsed(self, reruns=None):
+        """Collapsed stacks, one 'frame;frame;frame <self microseconds>' line per call path."""
+        reruns = list(self.reruns) if reruns is None else reruns
+        totals = collections.Counter()
+        for rerun in reruns:
+            for path, (_, _, self_seconds, _) in rerun['records'].items():
+                totals[';'.join(frame.replace(';', ',') for frame in path)] += self_seconds
+        return ''.join(f'{stack} {round(seconds * 1e6)}\n' for stack, seconds in totals.items())
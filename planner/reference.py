@@ -0,0 +1,112 @@
+"""Process-wide, read-only reference data shared by every session.
+
+Reference tables (the portfolio companies, the use-case catalog, the weight tables) are
+built once per process. Mappings are exposed as read-only proxies and DataFrames only ever
+as shallow copies: with pandas copy-on-write, a caller writing into its copy duplicates just
+the columns it touches, so the shared data is never modified and concurrent sessions can
+read it without locking. Copy-on-write is always on from pandas 3; on older pandas without it
+enabled, DataFrames are handed out as deep copies instead.
+
+What a session changes in the portfolio (Step 5 writes its plan back into the selected
+company's row) is kept as a small overlay, {company: {column: value}}, and applied on read
+by portfolio_view, so per-session memory does not grow with the size of the portfolio.
+"""
+import collections.abc
+import functools
+import types
+
+import pandas as pd
+
+
+def _copy_on_write_enabled():
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except KeyError:  # pandas < 2 has no copy-on-write option
+        return False
+
+
+def shared_copy(df):
+    """A copy of a shared DataFrame that callers may modify: shallow under copy-on-write, else deep."""
+    return df.copy(deep=not _copy_on_write_enabled())
+
+
+def frozen(mapping):
+    """Read-only view of a (possibly nested) dict."""
+    return types.MappingProxyType({key: frozen(value) if isinstance(value, dict) else value
+                                   for key, value in mapping.items()})
+
+
+class SharedFrames(collections.abc.Mapping):
+    """Read-only mapping of DataFrames; every lookup returns an independent shared_copy."""
+
+    def __init__(self, frames):
+        self._frames = dict(frames)
+
+    def __getitem__(self, key):
+        return shared_copy(self._frames[key])
+
+    def __iter__(self):
+        return iter(self._frames)
+
+    def __len__(self):
+        return len(self._frames)
+
+
+# --- Portfolio companies ---
+
+PORTFOLIO_COLUMNS = [
+    'Company', 'Sector', 'Baseline Org-AI-R', 'Current Org-AI-R', 'Delta Org-AI-R', 'Investment ($M)',
+    'Efficiency (pts/$M$)', 'EBITDA Impact (%)', 'EBITDA ($M)', 'EBITDA Impact ($M)',
+]
+
+INITIAL_PORTFOLIO_COMPANIES = (
+    {'Company': 'Alpha Manufacturing', 'Sector': 'Manufacturing', 'Baseline Org-AI-R': 42, 'Current Org-AI-R': 68,
+        'Delta Org-AI-R': 26, 'Investment ($M)': 2.8, 'EBITDA Impact (%)': 6, 'EBITDA ($M)': 9.0},
+    {'Company': 'Beta Healthcare', 'Sector': 'Healthcare', 'Baseline Org-AI-R': 48, 'Current Org-AI-R': 71,
+        'Delta Org-AI-R': 23, 'Investment ($M)': 3.2, 'EBITDA Impact (%)': 5, 'EBITDA ($M)': 8.0},
+    {'Company': 'Gamma Retail', 'Sector': 'Retail', 'Baseline Org-AI-R': 44, 'Current Org-AI-R': 62,
+        'Delta Org-AI-R': 18, 'Investment ($M)': 2.4, 'EBITDA Impact (%)': 3, 'EBITDA ($M)': 12.0},
+    {'Company': 'Delta Services', 'Sector': 'Business Services', 'Baseline Org-AI-R': 62, 'Current Org-AI-R': 79,
+        'Delta Org-AI-R': 17, 'Investment ($M)': 2.1, 'EBITDA Impact (%)': 8, 'EBITDA ($M)': 7.5},
+    {'Company': 'Epsilon Tech', 'Sector': 'Technology', 'Baseline Org-AI-R': 75, 'Current Org-AI-R': 86,
+        'Delta Org-AI-R': 11, 'Investment ($M)': 1.5, 'EBITDA Impact (%)': 4, 'EBITDA ($M)': 15.0},
+    {'Company': 'Zeta Logistics', 'Sector': 'Manufacturing', 'Baseline Org-AI-R': 38, 'Current Org-AI-R': 58,
+        'Delta Org-AI-R': 20, 'Investment ($M)': 1.9, 'EBITDA Impact (%)': 4, 'EBITDA ($M)': 6.0},
+    {'Company': 'Eta Food', 'Sector': 'Retail', 'Baseline Org-AI-R': 35, 'Current Org-AI-R': 52,
+        'Delta Org-AI-R': 17, 'Investment ($M)': 2.0, 'EBITDA Impact (%)': 3, 'EBITDA ($M)': 10.0},
+    {'Company': 'Theta Finance', 'Sector': 'Business Services', 'Baseline Org-AI-R': 68, 'Current Org-AI-R': 82,
+        'Delta Org-AI-R': 14, 'Investment ($M)': 1.8, 'EBITDA Impact (%)': 5, 'EBITDA ($M)': 11.0},
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _portfolio_frame():
+    df = pd.DataFrame(list(INITIAL_PORTFOLIO_COMPANIES))
+    df['EBITDA Impact ($M)'] = df['EBITDA ($M)'] * (df['EBITDA Impact (%)'] / 100)
+    df['Efficiency (pts/$M$)'] = (df['Delta Org-AI-R'] / df['Investment ($M)']) * df['EBITDA Impact ($M)']
+    # Plan results written back in Step 5 are fractional, so every score column is float
+    numeric = [c for c in PORTFOLIO_COLUMNS if c not in ('Company', 'Sector')]
+    df[numeric] = df[numeric].astype('float64')
+    return df[PORTFOLIO_COLUMNS]
+
+
+def reference_portfolio():
+    """The seed portfolio every session starts from (a shared_copy of the shared frame)."""
+    return shared_copy(_portfolio_frame())
+
+
+def portfolio_view(overlay=None):
+    """
+    The reference portfolio with a session's `overlay` ({company: {column: value}}) applied.
+
+    Without an overlay this is the shared data itself (via shared_copy); with one, only the
+    overlaid columns are materialized for this view.
+    """
+    view = reference_portfolio()
+    for company, values in (overlay or {}).items():
+        rows = view['Company'] == company
+        for column, value in values.items():
+            view.loc[rows, column] = value
+    return view
@@ -0,0 +1,53 @@
+"""Process-stable, content-derived seeds.
+
+Python's built-in hash() of a str is salted per process, so seeding from it gives a
+different company/use-case simulation in every Streamlit worker, restart and test run.
+Seeds here come from a BLAKE2b digest of a canonical encoding of the inputs instead, so
+the same inputs give the same numbers everywhere and the digest can double as a cache key.
+"""
+import collections.abc
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+DIGEST_SIZE = 16
+
+
+def _canonical(part):
+    if isinstance(part, pd.DataFrame):
+        # Row hashes cover values and index; column names and dtypes are encoded alongside
+        row_hashes = pd.util.hash_pandas_object(part, index=True).to_numpy()
+        return ('DataFrame' + _canonical([str(c) for c in part.columns]) + _canonical([str(d) for d in part.dtypes])
+                + hashlib.blake2b(row_hashes.tobytes(), digest_size=DIGEST_SIZE).hexdigest())
+    if isinstance(part, np.ndarray):
+        return (f'ndarray:{part.dtype.str}:{part.shape}:'
+                + hashlib.blake2b(np.ascontiguousarray(part).tobytes(), digest_size=DIGEST_SIZE).hexdigest())
+    if isinstance(part, pd.Series):
+        return '{' + ','.join(f'{_canonical(k)}:{_canonical(v)}' for k, v in part.items()) + '}'
+    if isinstance(part, collections.abc.Mapping):
+        return '{' + ','.join(f'{_canonical(k)}:{_canonical(v)}' for k, v in sorted(part.items(), key=lambda kv: str(kv[0]))) + '}'
+    if isinstance(part, (list, tuple)):
+        return '[' + ','.join(_canonical(p) for p in part) + ']'
+    if isinstance(part, np.generic):
+        part = part.item()
+    if isinstance(part, bool) or part is None:
+        return repr(part)
+    if isinstance(part, (int, float)):
+        # 4 and 4.0 are the same model input
+        return repr(float(part))
+    return f'{type(part).__name__}:{part}'
+
+
+def content_digest(*parts):
+    """Hex digest identifying the given inputs; stable across processes and platforms."""
+    encoded = '\x1f'.join(_canonical(p) for p in parts).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def seed_sequence(*parts):
+    return np.random.SeedSequence(int(content_digest(*parts), 16))
+
+
+def stable_rng(*parts):
+    return np.random.default_rng(seed_sequence(*parts))
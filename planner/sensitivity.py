@@ -0,0 +1,200 @@
+"""Sensitivity of plan outcomes to the model's coefficients.
+
+The whole Org-AI-R -> plan -> AIE -> exit-multiple chain for one company is written as
+array arithmetic over an (S x P) matrix of parameter scenarios, so a one-at-a-time tornado
+sweep (2P + 1 scenarios) or a Sobol design (N x (P + 2) scenarios) is a single evaluation.
+Parameters are every model coefficient, the company's sector opportunity score and its
+sector's dimension weights.
+
+The chain skips the 2-decimal rounding of the display path so that small perturbations are
+not swallowed by rounding steps; at the base parameters it agrees with the scalar model to
+within that rounding.
+"""
+import numpy as np
+import pandas as pd
+
+from planner.batch import DIMENSIONS, initiative_plan_weights, use_case_constants
+from planner.model import model_coefficients, systematic_opportunity_scores, all_dimension_weights_df
+from planner.profiling import profiled
+
+SENSITIVITY_OUTPUTS = [
+    'Org-AI-R', 'Screening Score', 'Final Org-AI-R', 'Cumulative EBITDA Impact ($M)', 'AIE', 'Exit Multiple',
+    'Implied Valuation ($M)',
+]
+OPPORTUNITY_PARAMETER = 'H_org_k_R'
+# Default +/- relative perturbation of every parameter
+DEFAULT_RELATIVE_STEP = 0.10
+DEFAULT_SOBOL_SAMPLES = 1024
+
+
+def weight_parameter(dimension):
+    return f'Weight: {dimension}'
+
+
+def sensitivity_parameters(sector, coefficients=None, weights_df=None, opportunity_scores=None):
+    """Base values of every perturbable parameter for a company in `sector`, as a Series."""
+    coefficients = model_coefficients if coefficients is None else coefficients
+    weights_df = all_dimension_weights_df if weights_df is None else weights_df
+    opportunity_scores = systematic_opportunity_scores if opportunity_scores is None else opportunity_scores
+    weights = weights_df[sector].reindex(DIMENSIONS).fillna(0)
+    return pd.Series({
+        **{name: float(value) for name, value in coefficients.items()},
+        OPPORTUNITY_PARAMETER: float(opportunity_scores[sector]),
+        **{weight_parameter(dim): float(weights[dim]) for dim in DIMENSIONS},
+    })
+
+
+def chain_context(use_case_rows, current_ratings, initial_ebitda_M, total_years=3, external_signals_score=0.0,
+                  exit_scores=(0.0, 0.0, 0.0), base_exit_multiple=0.0):
+    """
+    Everything the chain needs besides the parameters.
+
+    `use_case_rows` are catalog rows of the planned use cases, optionally with the
+    'User Investment ($M)' / 'User Probability of Success' / 'User Execution Quality'
+    override columns of estimate_project_parameters_batch. `exit_scores` are the
+    (visible, documented, sustainable) exit-readiness scores.
+    """
+    constants = use_case_constants(use_case_rows)
+    years_live, completes = initiative_plan_weights(constants['timeline'], total_years)
+    n = len(use_case_rows)
+
+    def user_column(column):
+        if column in use_case_rows:
+            return use_case_rows[column].to_numpy(dtype=np.float64)
+        return np.full(n, np.nan)
+
+    ratings = pd.Series(current_ratings).reindex(DIMENSIONS).to_numpy(dtype=np.float64)
+    investment = user_column('User Investment ($M)')
+    return {
+        'dimension_scores': ratings / 5 * 100,
+        'complexity_factor': constants['complexity_factor'],
+        'investment': np.where(np.isnan(investment), constants['default_investment'], investment),
+        'user_prob_success': user_column('User Probability of Success'),
+        'user_exec_quality': user_column('User Execution Quality'),
+        'base_impact': constants['base_impact'],
+        'delta_base': constants['delta_base'],
+        'years_live': years_live,
+        'completes': completes,
+        'initial_ebitda_M': float(initial_ebitda_M),
+        'external_signals_score': float(external_signals_score),
+        'exit_scores': np.asarray(exit_scores, dtype=np.float64),
+        'base_exit_multiple': float(base_exit_multiple),
+    }
+
+
+def evaluate_chain(parameters, context):
+    """
+    Evaluate the chain for every row of `parameters` (a DataFrame whose columns are the
+    sensitivity_parameters names). Returns a DataFrame of SENSITIVITY_OUTPUTS, one row per
+    scenario.
+    """
+    p = {name: parameters[name].to_numpy(dtype=np.float64)[:, np.newaxis] for name in parameters.columns}
+    weights = parameters[[weight_parameter(dim) for dim in DIMENSIONS]].to_numpy(dtype=np.float64)
+    V = (weights @ context['dimension_scores'])[:, np.newaxis]
+    H = p[OPPORTUNITY_PARAMETER]
+    org_ai_r = p['alpha'] * V + (1 - p['alpha']) * H + p['beta'] * np.minimum(V, H)
+
+    # (S x K) initiative estimates; user overrides stay fixed, defaults follow V
+    cf = context['complexity_factor']
+    prob_success = np.where(np.isnan(context['user_prob_success']),
+                            np.clip(0.6 + V / 100 * 0.2 - cf * 0.3, 0.5, 0.95), context['user_prob_success'])
+    exec_quality = np.where(np.isnan(context['user_exec_quality']),
+                            np.clip(V / 100 * 0.8, 0.6, 0.9), context['user_exec_quality'])
+    scale = prob_success * exec_quality
+    impact_M = context['initial_ebitda_M'] * context['base_impact'] * (H / 100) * (V / 100 * 0.5 + 0.5) * scale / 100
+    delta = np.maximum(context['delta_base'] * scale, 1)
+
+    cumulative_ebitda_M = impact_M @ context['years_live']
+    delta_total = delta @ context['completes']
+    investment_M = context['investment'] @ context['completes']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        aie = np.where(investment_M > 0, delta_total / investment_M * cumulative_ebitda_M, 0.0)
+
+    visible, documented, sustainable = context['exit_scores']
+    exit_ai_r = p['w1_exit'] * visible + p['w2_exit'] * documented + p['w3_exit'] * sustainable
+    exit_multiple = context['base_exit_multiple'] + p['delta_exit'] * exit_ai_r / 100
+    return pd.DataFrame({
+        'Org-AI-R': org_ai_r[:, 0],
+        'Screening Score': (H + p['epsilon'] * context['external_signals_score'])[:, 0],
+        'Final Org-AI-R': org_ai_r[:, 0] + delta_total,
+        'Cumulative EBITDA Impact ($M)': cumulative_ebitda_M,
+        'AIE': aie,
+        'Exit Multiple': exit_multiple[:, 0],
+        'Implied Valuation ($M)': ((context['initial_ebitda_M'] + cumulative_ebitda_M) * exit_multiple[:, 0]),
+    }, columns=SENSITIVITY_OUTPUTS)
+
+
+@profiled
+def one_at_a_time(base_parameters, context, relative_step=DEFAULT_RELATIVE_STEP):
+    """
+    Tornado table: every parameter moved to base x (1 -/+ relative_step) with the others at
+    base, all 2P + 1 scenarios in one chain evaluation.
+
+    Returns a long DataFrame with one row per (output, parameter) holding the low/high
+    parameter values, the output at each and the 'Swing' |high - low|, sorted by output
+    and descending swing.
+    """
+    names = list(base_parameters.index)
+    n = len(names)
+    scenarios = np.tile(base_parameters.to_numpy(dtype=np.float64), (2 * n + 1, 1))
+    rows = np.arange(n)
+    scenarios[1 + rows, rows] *= 1 - relative_step
+    scenarios[1 + n + rows, rows] *= 1 + relative_step
+    outputs = evaluate_chain(pd.DataFrame(scenarios, columns=names), context)
+
+    tables = []
+    for output in SENSITIVITY_OUTPUTS:
+        values = outputs[output].to_numpy()
+        low, high = values[1:n + 1], values[n + 1:]
+        tables.append(pd.DataFrame({
+            'Output': output,
+            'Parameter': names,
+            'Base Value': base_parameters.to_numpy(),
+            'Low Value': scenarios[1 + rows, rows],
+            'High Value': scenarios[1 + n + rows, rows],
+            'Base Output': values[0],
+            'Output at Low': low,
+            'Output at High': high,
+            'Swing': np.abs(high - low),
+        }).sort_values('Swing', ascending=False, kind='stable'))
+    return pd.concat(tables, ignore_index=True)
+
+
+@profiled
+def sobol_indices(base_parameters, context, relative_range=DEFAULT_RELATIVE_STEP, n_samples=DEFAULT_SOBOL_SAMPLES,
+                  seed=0):
+    """
+    Global (Sobol) sensitivity with every parameter uniform on base x [1 - r, 1 + r].
+
+    Uses the Saltelli sampling design with the Saltelli (first-order) and Jansen (total)
+    estimators; all N x (P + 2) scenarios go through one chain evaluation. Returns a long
+    DataFrame with 'First Order' and 'Total' indices per (output, parameter).
+    """
+    names = list(base_parameters.index)
+    base = base_parameters.to_numpy(dtype=np.float64)
+    n_params = len(names)
+    rng = np.random.default_rng(seed)
+    A = base * (1 + relative_range * (2 * rng.random((n_samples, n_params)) - 1))
+    B = base * (1 + relative_range * (2 * rng.random((n_samples, n_params)) - 1))
+    # AB_i is A with column i taken from B
+    AB = np.repeat(A[np.newaxis], n_params, axis=0)
+    AB[np.arange(n_params), :, np.arange(n_params)] = B.T
+    design = np.concatenate([A, B, AB.reshape(-1, n_params)])
+    outputs = evaluate_chain(pd.DataFrame(design, columns=names), context)
+
+    tables = []
+    for output in SENSITIVITY_OUTPUTS:
+        values = outputs[output].to_numpy()
+        # Centering leaves the estimators unbiased and removes noise proportional to the mean
+        values = values - values[:2 * n_samples].mean()
+        f_A, f_B = values[:n_samples], values[n_samples:2 * n_samples]
+        f_AB = values[2 * n_samples:].reshape(n_params, n_samples)
+        variance = np.var(np.concatenate([f_A, f_B]))
+        if variance > 0:
+            first = np.mean(f_B * (f_AB - f_A), axis=1) / variance
+            total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / variance
+        else:
+            first = total = np.zeros(n_params)
+        tables.append(pd.DataFrame({'Output': output, 'Parameter': names, 'First Order': first, 'Total': total})
+                      .sort_values('Total', ascending=False, kind='stable'))
+    return pd.concat(tables, ignore_index=True)
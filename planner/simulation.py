@@ -0,0 +1,396 @@
+"""Monte Carlo simulation of plan outcomes.
+
+The deterministic plan folds Probability of Success and Execution Quality into each
+initiative's EBITDA and Org-AI-R impact as a single multiplier. Here each path instead
+draws whether every initiative succeeds (Bernoulli on Probability of Success) and how well
+it is executed (Beta noise centred on Execution Quality), then runs the realized impacts
+through the same plan kernel as create_multi_year_plan.
+
+Completion years do not depend on the draws, so the kernel is evaluated once per
+initiative (initiative_plan_weights) and every path reduces to a matrix product.
+
+Successes are independent unless a `success_correlation` is given, {'sector': rho,
+'company': rho, 'complexity': rho} with each rho a number or a {sector / company / tier:
+rho} mapping. Success is then sampled with a Gaussian copula: initiative i succeeds when
+sum_g sqrt(rho_g) F_g + sqrt(1 - sum_g rho_g) e_i < Phi^-1(Probability of Success_i), with
+one standard normal factor F per sector, per company and per complexity tier. Each
+initiative keeps its own success probability, and two initiatives' latent normals are
+correlated by the sum of the rhos of the groups they share. Only one factor per group
+and one noise per initiative are drawn, so there is no initiatives x initiatives matrix.
+Chunks hold at most MAX_CHUNK_CELLS paths x initiatives (or companies) values, so
+fund-wide runs stay within memory.
+
+The exit valuation (Step 6) is simulated on top of the same draws, for one company or a
+whole portfolio at once: projected EBITDA from the realized initiatives, the Visible,
+Documented and Sustainable scores (Beta noise around the assessed score) and the sector's
+base exit multiple (lognormal around it) give a distribution of implied valuations per
+company and of their sum, the fund's exit value. valuation_risk_summary reduces samples to
+percentiles and VaR / expected shortfall.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import collections.abc
+import statistics
+
+import numpy as np
+import pandas as pd
+
+from planner.batch import (
+    UNADJUSTED_IMPACT_COLUMNS, initiative_plan_weights, portfolio_use_case_rows, estimate_project_parameters_batch,
+    default_use_case_catalog,
+)
+from planner.model import model_coefficients, sector_base_multiples, DEFAULT_BASE_MULTIPLE
+from planner.pipeline import PIPELINE_DEFAULTS
+
+DEFAULT_PATHS = 100_000
+# Paths simulated per RNG stream / work item; also bounds peak memory per chunk
+DEFAULT_CHUNK_PATHS = 250_000
+# Upper bound on paths x initiatives (or companies) per chunk: 32 MB per float64 array
+MAX_CHUNK_CELLS = 4_000_000
+# Beta(q * k, (1 - q) * k) execution-quality noise; larger k means tighter around q
+EXECUTION_QUALITY_CONCENTRATION = 20.0
+OUTCOME_PERCENTILES = (5, 50, 95)
+OUTCOME_METRICS = ['Cumulative EBITDA Impact ($M)', 'Org-AI-R', 'AIE', 'Initiatives Succeeded']
+SUCCESS_CORRELATION_LEVELS = ('sector', 'company', 'complexity')
+# A starting point for the app; the simulation functions default to independent successes
+DEFAULT_SUCCESS_CORRELATION = {'sector': 0.1, 'company': 0.2, 'complexity': 0.05}
+
+
+def initiative_outcome_inputs(planned_initiatives_df, initial_ebitda_M, total_years):
+    """
+    Per-initiative arrays the simulation needs.
+
+    The unadjusted impact columns from estimate_project_parameters_batch(include_unadjusted=True)
+    are used when present. Otherwise they are backed out of the adjusted columns by dividing
+    by Probability of Success x Execution Quality.
+    Rows where they are NaN (initiatives stacked from both kinds of table) are backed out too.
+    `initial_ebitda_M` is a scalar or one value per row.
+    """
+    df = planned_initiatives_df
+    prob_success = df['Probability of Success'].to_numpy(dtype=np.float64)
+    exec_quality = df['Execution Quality'].to_numpy(dtype=np.float64)
+    scale = prob_success * exec_quality
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ebitda_base_M = np.where(scale > 0, df['EBITDA Impact ($M)'].to_numpy(dtype=np.float64) / scale, 0.0)
+        delta_base = np.where(scale > 0, df['Delta Org-AI-R'].to_numpy(dtype=np.float64) / scale, 0.0)
+    if all(column in df for column in UNADJUSTED_IMPACT_COLUMNS):
+        unadjusted_ebitda_M = initial_ebitda_M * df[UNADJUSTED_IMPACT_COLUMNS[0]].to_numpy(dtype=np.float64) / 100
+        unadjusted_delta = df[UNADJUSTED_IMPACT_COLUMNS[1]].to_numpy(dtype=np.float64)
+        ebitda_base_M = np.where(np.isnan(unadjusted_ebitda_M), ebitda_base_M, unadjusted_ebitda_M)
+        delta_base = np.where(np.isnan(unadjusted_delta), delta_base, unadjusted_delta)
+
+    years_live, completes = initiative_plan_weights(df['Timeline (months)'].to_numpy(), total_years)
+    return {
+        'prob_success': prob_success,
+        'exec_quality': exec_quality,
+        'ebitda_base_M': ebitda_base_M,
+        'delta_base': delta_base,
+        'years_live': years_live,
+        'completes': completes,
+        'total_investment_M': float(df['Investment ($M)'].to_numpy(dtype=np.float64) @ completes),
+    }
+
+
+def success_copula_inputs(success_correlation, prob_success, sectors, companies, complexities):
+    """
+    Gaussian-copula inputs for correlated success (see the module docstring), given each
+    initiative's probability and its sector, company and complexity tier labels. A level
+    missing from `success_correlation`, or a label missing from a level's mapping, has rho 0.
+    Labels of a level are None when unknown, which is an error if that level has a rho.
+    """
+    unknown = set(success_correlation) - set(SUCCESS_CORRELATION_LEVELS)
+    if unknown:
+        raise ValueError(f"Unknown success correlation level(s) {sorted(unknown)}; "
+                         f"expected some of {list(SUCCESS_CORRELATION_LEVELS)}")
+    labels = {'sector': sectors, 'company': companies, 'complexity': complexities}
+    factors = []
+    total_rho = np.zeros(len(prob_success))
+    for level in SUCCESS_CORRELATION_LEVELS:
+        rho = success_correlation.get(level, 0.0)
+        if labels[level] is None:
+            if rho:
+                raise ValueError(f"A {level} success correlation needs each initiative's {level}")
+            continue
+        level_labels = pd.Series(labels[level], dtype=object).fillna('')
+        if isinstance(rho, collections.abc.Mapping):
+            rho = level_labels.map(lambda label: rho.get(label, 0.0)).to_numpy(dtype=np.float64)
+        rho = np.broadcast_to(np.asarray(rho, dtype=np.float64), total_rho.shape)
+        if ((rho < 0) | (rho > 1)).any():
+            raise ValueError(f"{level} success correlation must be between 0 and 1")
+        if rho.any():
+            codes, groups = pd.factorize(level_labels)
+            factors.append((codes, len(groups), np.sqrt(rho)))
+        total_rho = total_rho + rho
+    if (total_rho > 1 + 1e-12).any():
+        raise ValueError("Sector, company and complexity success correlations must add up to at most 1")
+
+    p = np.asarray(prob_success, dtype=np.float64)
+    inside = (p > 0) & (p < 1)
+    threshold = np.where(p >= 1, np.inf, -np.inf)
+    threshold[inside] = [statistics.NormalDist().inv_cdf(q) for q in p[inside]]
+    return {
+        'success_factors': factors,
+        'idiosyncratic_loading': np.sqrt(np.maximum(1 - total_rho, 0.0)),
+        'success_threshold': threshold,
+    }
+
+
+def _success_draws(rng, inputs, n_paths):
+    n = len(inputs['prob_success'])
+    if 'success_factors' not in inputs:
+        return rng.random((n_paths, n)) < inputs['prob_success']
+    latent = inputs['idiosyncratic_loading'] * rng.standard_normal((n_paths, n))
+    for codes, n_groups, loadings in inputs['success_factors']:
+        latent += loadings * rng.standard_normal((n_paths, n_groups))[:, codes]
+    return latent < inputs['success_threshold']
+
+
+def _beta_draws(rng, mean, n_paths, concentration):
+    # Beta(m * k, (1 - m) * k) per path and column, centred on the fractions `mean`
+    m = np.clip(mean, 1e-6, 1 - 1e-6)
+    draws = rng.beta(m * concentration, (1 - m) * concentration, size=(n_paths, len(m)))
+    # Keep degenerate 0/1 means exact rather than nearly-0/1
+    degenerate = (mean <= 0) | (mean >= 1)
+    if degenerate.any():
+        draws[:, degenerate] = (mean[degenerate] >= 1).astype(np.float64)
+    return draws
+
+
+def _realized_impacts(rng, inputs, n_paths, concentration):
+    success = _success_draws(rng, inputs, n_paths)
+    quality = _beta_draws(rng, inputs['exec_quality'], n_paths, concentration)
+    realized_ebitda_M = success * quality * inputs['ebitda_base_M']
+    # Successful initiatives keep the deterministic estimator's 1-point floor on Org-AI-R uplift
+    realized_delta = success * np.maximum(quality * inputs['delta_base'], 1.0)
+    return success, realized_ebitda_M, realized_delta
+
+
+def _simulate_chunk(inputs, initial_org_ai_r, n_paths, seed_seq, concentration):
+    rng = np.random.default_rng(seed_seq)
+    success, realized_ebitda_M, realized_delta = _realized_impacts(rng, inputs, n_paths, concentration)
+
+    cumulative_ebitda_M = realized_ebitda_M @ inputs['years_live']
+    delta_org_ai_r = realized_delta @ inputs['completes']
+    investment_M = inputs['total_investment_M']
+    aie = (delta_org_ai_r / investment_M) * cumulative_ebitda_M if investment_M > 0 else np.zeros(n_paths)
+    return {
+        'Cumulative EBITDA Impact ($M)': cumulative_ebitda_M,
+        'Org-AI-R': initial_org_ai_r + delta_org_ai_r,
+        'AIE': aie,
+        'Initiatives Succeeded': (success * inputs['completes'].astype(bool)).sum(axis=1),
+    }
+
+
+def _chunk_sizes(n_paths, chunk_paths, n_columns=1, max_chunk_cells=MAX_CHUNK_CELLS):
+    chunk_paths = max(1, min(chunk_paths, max_chunk_cells // max(n_columns, 1)))
+    full, remainder = divmod(n_paths, chunk_paths)
+    return [chunk_paths] * full + ([remainder] if remainder else [])
+
+
+def simulate_plan_outcomes(planned_initiatives_df, initial_org_ai_r, initial_ebitda_M, total_years=3,
+                           n_paths=DEFAULT_PATHS, seed=None, exec_quality_concentration=EXECUTION_QUALITY_CONCENTRATION,
+                           chunk_paths=DEFAULT_CHUNK_PATHS, n_workers=1, success_correlation=None, sector=None,
+                           company=None, max_chunk_cells=MAX_CHUNK_CELLS):
+    """
+    Simulate `n_paths` outcomes of a plan and return a dict of per-path arrays keyed by
+    OUTCOME_METRICS. With `success_correlation`, the company's initiatives succeed or fail
+    together as described in the module docstring (`sector` and `company` name the company
+    for per-sector and per-company rhos).
+
+    Paths are generated in chunks of `chunk_paths` (fewer if paths x initiatives would
+    exceed `max_chunk_cells`), each from its own child of np.random.SeedSequence(seed).
+    Results depend only on seed and chunking, not on `n_workers`: with n_workers > 1 the
+    chunks are spread over a process pool.
+    """
+    inputs = initiative_outcome_inputs(planned_initiatives_df, initial_ebitda_M, total_years)
+    if success_correlation is not None:
+        n = len(planned_initiatives_df)
+        inputs.update(success_copula_inputs(success_correlation, inputs['prob_success'],
+                                            None if sector is None else [sector] * n, [company] * n,
+                                            planned_initiatives_df.get('Complexity')))
+    sizes = _chunk_sizes(n_paths, chunk_paths, len(inputs['prob_success']), max_chunk_cells)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(inputs, initial_org_ai_r, size, child, exec_quality_concentration) for size, child in zip(sizes, seeds)]
+
+    if n_workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+    return {metric: np.concatenate([chunk[metric] for chunk in chunks]) for metric in OUTCOME_METRICS}
+
+
+def summarize_outcomes(samples, percentiles=OUTCOME_PERCENTILES):
+    """Mean and percentile table (one row per metric) of simulated samples."""
+    rows = {}
+    for metric, values in samples.items():
+        row = {'Mean': float(np.mean(values))}
+        row.update({f'P{p:g}': q for p, q in zip(percentiles, np.percentile(values, percentiles))})
+        rows[metric] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+# --- Exit valuation ---
+
+# Beta noise on each exit score / 100, as for Execution Quality (k = 50: about +/- 6 points at 75)
+EXIT_SCORE_CONCENTRATION = 50.0
+# Lognormal sigma of the base exit multiple around the sector's (median) multiple
+BASE_MULTIPLE_VOLATILITY = 0.15
+EXIT_COMPANY_COLUMNS = ['Company', 'EBITDA ($M)', 'Visible Score', 'Documented Score', 'Sustainable Score',
+                        'Base Exit Multiple']
+VALUATION_METRICS = ['Exit-AI-R', 'Exit Multiple', 'Projected EBITDA ($M)', 'Implied Valuation ($M)']
+VALUATION_PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+VAR_LEVELS = (95, 99)
+
+
+def exit_valuation_inputs(companies_df, initiatives_df, total_years=3, coefficients=None, success_correlation=None):
+    """
+    Arrays simulate_exit_valuations needs. `companies_df` has EXIT_COMPANY_COLUMNS (one row per
+    company) and, for sector success correlation, 'Sector'; `initiatives_df` the planned
+    initiatives of all of them stacked, with a 'Company' column naming each row's company.
+    """
+    coefficients = model_coefficients if coefficients is None else coefficients
+    companies = pd.Index(companies_df['Company'])
+    codes = companies.get_indexer(initiatives_df['Company'])
+    if (codes < 0).any():
+        raise KeyError(f"Initiatives reference unknown companies: {sorted(set(initiatives_df['Company'][codes < 0]))}")
+    ebitda_M = companies_df['EBITDA ($M)'].to_numpy(dtype=np.float64)
+
+    # Initiatives sorted by company, so per-company sums are one np.add.reduceat
+    order = np.argsort(codes, kind='stable')
+    initiatives = initiative_outcome_inputs(initiatives_df.iloc[order], ebitda_M[codes[order]], total_years)
+    if success_correlation is not None:
+        sectors = companies_df['Sector'].to_numpy()[codes[order]] if 'Sector' in companies_df else None
+        initiatives.update(success_copula_inputs(
+            success_correlation, initiatives['prob_success'], sectors, companies.to_numpy()[codes[order]],
+            initiatives_df['Complexity'].to_numpy()[order] if 'Complexity' in initiatives_df else None))
+    with_initiatives, starts = np.unique(codes[order], return_index=True)
+    scores = companies_df[['Visible Score', 'Documented Score', 'Sustainable Score']].to_numpy(dtype=np.float64)
+    return {
+        **initiatives,
+        'company_starts': starts,
+        'companies_with_initiatives': with_initiatives,
+        'n_companies': len(companies),
+        'ebitda_M': ebitda_M,
+        'exit_score_fractions': scores.T / 100,
+        'exit_weights': np.array([coefficients['w1_exit'], coefficients['w2_exit'], coefficients['w3_exit']]),
+        'base_multiple': companies_df['Base Exit Multiple'].to_numpy(dtype=np.float64),
+        'delta_exit': coefficients['delta_exit'],
+    }
+
+
+def _simulate_exit_chunk(inputs, n_paths, seed_seq, concentration, score_concentration, multiple_volatility, metrics):
+    rng = np.random.default_rng(seed_seq)
+    n_companies = inputs['n_companies']
+    cumulative_ebitda_M = np.zeros((n_paths, n_companies))
+    if len(inputs['prob_success']):
+        _, realized_ebitda_M, _ = _realized_impacts(rng, inputs, n_paths, concentration)
+        cumulative_ebitda_M[:, inputs['companies_with_initiatives']] = np.add.reduceat(
+            realized_ebitda_M * inputs['years_live'], inputs['company_starts'], axis=1)
+    projected_ebitda_M = inputs['ebitda_M'] + np.maximum(cumulative_ebitda_M, 0.0)
+
+    exit_ai_r = np.zeros((n_paths, n_companies))
+    for weight, fractions in zip(inputs['exit_weights'], inputs['exit_score_fractions']):
+        exit_ai_r += weight * 100 * _beta_draws(rng, fractions, n_paths, score_concentration)
+    base_multiple = inputs['base_multiple'] * np.exp(multiple_volatility * rng.standard_normal((n_paths, n_companies)))
+    exit_multiple = base_multiple + inputs['delta_exit'] * exit_ai_r / 100
+    valuation_M = projected_ebitda_M * exit_multiple
+
+    outputs = {'Exit-AI-R': exit_ai_r, 'Exit Multiple': exit_multiple, 'Projected EBITDA ($M)': projected_ebitda_M,
+               'Implied Valuation ($M)': valuation_M}
+    return {**{metric: outputs[metric] for metric in metrics}, 'Fund Implied Valuation ($M)': valuation_M.sum(axis=1)}
+
+
+def simulate_exit_valuations(companies_df, initiatives_df, total_years=3, n_paths=DEFAULT_PATHS, seed=None,
+                             exec_quality_concentration=EXECUTION_QUALITY_CONCENTRATION,
+                             exit_score_concentration=EXIT_SCORE_CONCENTRATION,
+                             base_multiple_volatility=BASE_MULTIPLE_VOLATILITY, metrics=('Implied Valuation ($M)',),
+                             chunk_paths=DEFAULT_CHUNK_PATHS, n_workers=1, coefficients=None, success_correlation=None,
+                             max_chunk_cells=MAX_CHUNK_CELLS):
+    """
+    Simulate the exit of every company in `companies_df` (see exit_valuation_inputs) over
+    `n_paths` paths. Returns the requested VALUATION_METRICS as (n_paths x companies) arrays,
+    columns in companies_df order, plus 'Fund Implied Valuation ($M)', the per-path sum.
+
+    Companies are independent of each other unless `success_correlation` ties their
+    initiatives' success together by sector, company and complexity tier (module
+    docstring); exit scores and multiples are always drawn independently. The multiple is
+    not rounded to 2 decimals as the point estimate is. Chunking, seeding and `n_workers`
+    work as in simulate_plan_outcomes.
+    """
+    unknown = [metric for metric in metrics if metric not in VALUATION_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown valuation metric(s) {unknown}; expected some of {VALUATION_METRICS}")
+    inputs = exit_valuation_inputs(companies_df, initiatives_df, total_years, coefficients, success_correlation)
+    sizes = _chunk_sizes(n_paths, chunk_paths, max(len(inputs['prob_success']), inputs['n_companies']),
+                         max_chunk_cells)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(inputs, size, child, exec_quality_concentration, exit_score_concentration, base_multiple_volatility,
+             tuple(metrics)) for size, child in zip(sizes, seeds)]
+
+    if n_workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            chunks = list(pool.map(_simulate_exit_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_exit_chunk(*a) for a in args]
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def simulate_company_exit_valuation(planned_initiatives_df, initial_ebitda_M, exit_scores, base_multiple,
+                                    total_years=3, n_paths=DEFAULT_PATHS, seed=None, sector=None, company='Company',
+                                    **kwargs):
+    """
+    Exit valuation distribution of one company (the app's Step 6): a dict of per-path arrays
+    keyed by VALUATION_METRICS. `exit_scores` is (Visible, Documented, Sustainable); `sector`
+    and `company` are matched against per-sector and per-company success correlations.
+    """
+    companies = pd.DataFrame([[company, initial_ebitda_M, *exit_scores, base_multiple, sector]],
+                             columns=EXIT_COMPANY_COLUMNS + ['Sector'])
+    if sector is None:
+        companies = companies.drop(columns='Sector')
+    samples = simulate_exit_valuations(companies, planned_initiatives_df.assign(Company=company), total_years,
+                                       n_paths, seed, metrics=VALUATION_METRICS, **kwargs)
+    return {metric: samples[metric][:, 0] for metric in VALUATION_METRICS}
+
+
+def default_exit_inputs(companies_df, current_V_org_R):
+    """
+    (companies, initiatives) for simulate_exit_valuations from a portfolio frame with
+    'Company', 'Sector' and 'EBITDA ($M)': every company planned with its sector's default
+    initiatives at `current_V_org_R` (one value per company), the pipeline's default exit
+    scores and its sector's base multiple. Existing exit-score or 'Base Exit Multiple'
+    columns are kept, and so is 'Sector' (for sector success correlation).
+    """
+    companies = companies_df[['Company', 'Sector', 'EBITDA ($M)']].assign(**{'Current V_org_R': current_V_org_R})
+    rows = portfolio_use_case_rows(companies, catalog=default_use_case_catalog())
+    initiatives = pd.concat([rows[['Company']], estimate_project_parameters_batch(rows, include_unadjusted=True)],
+                            axis=1)
+    exit_defaults = {
+        **{column: companies_df[column] if column in companies_df else PIPELINE_DEFAULTS[column]
+           for column in ('Visible Score', 'Documented Score', 'Sustainable Score')},
+        'Base Exit Multiple': (companies_df['Base Exit Multiple'] if 'Base Exit Multiple' in companies_df else
+                               companies_df['Sector'].map(dict(sector_base_multiples)).fillna(DEFAULT_BASE_MULTIPLE)),
+    }
+    exit_companies = companies_df[['Company', 'Sector', 'EBITDA ($M)']].assign(**exit_defaults)
+    return exit_companies[EXIT_COMPANY_COLUMNS + ['Sector']], initiatives
+
+
+def valuation_risk_summary(samples, percentiles=VALUATION_PERCENTILES, var_levels=VAR_LEVELS):
+    """
+    One row per entry of `samples` ({name: per-path values}): Mean, Std, the percentiles and,
+    per level L, 'VaR L%' (Mean minus the (100 - L)th percentile, the shortfall from the
+    expected value not exceeded with probability L) and 'ES L%' (the mean shortfall beyond it).
+    """
+    rows = {}
+    for name, values in samples.items():
+        values = np.asarray(values, dtype=np.float64)
+        mean = float(values.mean())
+        tails = [100 - level for level in var_levels]
+        quantiles = np.percentile(values, [*percentiles, *tails])
+        row = {'Mean': mean, 'Std': float(values.std())}
+        row.update({f'P{p:g}': q for p, q in zip(percentiles, quantiles)})
+        for level, cutoff in zip(var_levels, quantiles[len(percentiles):]):
+            row[f'VaR {level:g}%'] = mean - cutoff
+            row[f'ES {level:g}%'] = mean - float(values[values <= cutoff].mean())
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,97 @@
+"""Compact, typed per-session planner state.
+
+One PlannerState per session replaces the f-string keyed session entries the app used to
+keep per dimension and per use case (current_rating_<dim>, investment_<use case>, ...).
+Ratings are a (2 x dimensions) uint8 array, current and target, in DIMENSIONS order, and
+initiative overrides are a structured array with one record per use case of the company's
+sector catalog, NaN until the use case is first configured. The arrays are sized by the
+catalog and replaced on every company switch, so the state stays small and never
+accumulates entries for companies or use cases the session has moved away from.
+
+Streamlit widgets still need string keys; rating_widget_key and override_widget_key name
+them, and stale_widget_keys finds the ones to evict when the company changes.
+"""
+import numpy as np
+import pandas as pd
+
+from planner.batch import DIMENSIONS
+
+RATING_KINDS = ('current', 'target')
+OVERRIDE_FIELDS = ('investment', 'prob_success', 'exec_quality')
+OVERRIDE_DTYPE = np.dtype([(field, np.float64) for field in OVERRIDE_FIELDS])
+# Override fields as the 'User ...' columns estimate_project_parameters_batch accepts
+OVERRIDE_COLUMNS = {
+    'investment': 'User Investment ($M)',
+    'prob_success': 'User Probability of Success',
+    'exec_quality': 'User Execution Quality',
+}
+
+
+def _slug(name):
+    return name.replace(" ", "_").lower()
+
+
+def rating_widget_key(kind, dimension):
+    return f'{kind}_rating_{_slug(dimension)}'
+
+
+def override_widget_key(field, use_case):
+    return f'{field}_{_slug(use_case)}'
+
+
+WIDGET_KEY_PREFIXES = tuple(f'{kind}_rating_' for kind in RATING_KINDS) + tuple(f'{field}_' for field in OVERRIDE_FIELDS)
+
+
+def stale_widget_keys(keys):
+    """The rating and override widget keys among `keys` (to drop when the company changes)."""
+    return [key for key in keys if isinstance(key, str) and key.startswith(WIDGET_KEY_PREFIXES)]
+
+
+class PlannerState:
+    __slots__ = ('company', 'sector', 'use_cases', 'ratings', 'overrides')
+
+    def __init__(self):
+        self.company = None
+        self.sector = None
+        self.use_cases = ()
+        self.ratings = np.zeros((len(RATING_KINDS), len(DIMENSIONS)), dtype=np.uint8)
+        self.overrides = np.full(0, np.nan, dtype=OVERRIDE_DTYPE)
+
+    def reset(self, company, sector, current_ratings, target_ratings, use_cases):
+        """Start over for `company`; `use_cases` is its sector's catalog, in order."""
+        self.company = company
+        self.sector = sector
+        self.use_cases = tuple(use_cases)
+        self.ratings = np.array([pd.Series(current_ratings).reindex(DIMENSIONS).to_numpy(),
+                                 pd.Series(target_ratings).reindex(DIMENSIONS).to_numpy()], dtype=np.uint8)
+        self.overrides = np.full(len(self.use_cases), np.nan, dtype=OVERRIDE_DTYPE)
+
+    # --- Ratings ---
+
+    def rating(self, kind, dimension):
+        return int(self.ratings[RATING_KINDS.index(kind), DIMENSIONS.index(dimension)])
+
+    def set_rating(self, kind, dimension, value):
+        self.ratings[RATING_KINDS.index(kind), DIMENSIONS.index(dimension)] = value
+
+    def ratings_series(self, kind):
+        return pd.Series(self.ratings[RATING_KINDS.index(kind)].astype(np.int64), index=DIMENSIONS)
+
+    # --- Initiative overrides ---
+
+    def has_override(self, use_case):
+        return not np.isnan(self.overrides[self.use_cases.index(use_case)]['investment'])
+
+    def override(self, use_case):
+        record = self.overrides[self.use_cases.index(use_case)]
+        return {field: float(record[field]) for field in OVERRIDE_FIELDS}
+
+    def set_override(self, use_case, **values):
+        record_id = self.use_cases.index(use_case)
+        for field, value in values.items():
+            self.overrides[field][record_id] = value
+
+    def override_columns(self, use_cases):
+        """{'User ...' column: values} for `use_cases`, ready for DataFrame.assign."""
+        records = self.overrides[[self.use_cases.index(uc) for uc in use_cases]]
+        return {OVERRIDE_COLUMNS[field]: records[field] for field in OVERRIDE_FIELDS}
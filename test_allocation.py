@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.allocation import allocate_fund_budget, portfolio_candidates
+from planner.optimize import candidate_contributions, cost_units, optimize_initiatives
+
+
+def _portfolio_candidates(n_companies, per_company, seed):
+    rng = np.random.default_rng(seed)
+    n = n_companies * per_company
+    return pd.DataFrame({
+        'Company': np.repeat([f'Company {i}' for i in range(n_companies)], per_company),
+        'Use Case': [f'Use Case {i % per_company}' for i in range(n)],
+        'Timeline (months)': rng.choice([2, 4.5, 9, 15, 18], size=n),
+        'Investment ($M)': np.round(rng.uniform(0.1, 2.0, size=n), 2),
+        'EBITDA Impact ($M)': np.round(rng.uniform(0, 1, size=n), 2),
+        'Delta Org-AI-R': np.round(rng.uniform(1, 10, size=n), 2),
+    })
+
+
+def _brute_force(candidates, budget_M, cap_M, objective):
+    # Best value over every subset within the fund budget and the per-company cap
+    cost, ebitda, delta = candidate_contributions(candidates, 5)
+    units, value = cost_units(cost), ebitda if objective == 'ebitda' else delta
+    masks = np.arange(1 << len(candidates))
+    membership = (masks[:, np.newaxis] >> np.arange(len(candidates))) & 1
+    company = pd.factorize(candidates['Company'])[0]
+    per_company = np.stack([membership[:, company == k] @ units[company == k] for k in range(company.max() + 1)], axis=1)
+    feasible = (membership @ units <= round(budget_M * 100)) & (per_company <= round(cap_M * 100)).all(axis=1)
+    return (membership @ value)[feasible].max()
+
+
+@pytest.mark.parametrize('objective', ['ebitda', 'org_ai_r'])
+def test_allocation_matches_exact_optimum(objective):
+    """Uncapped, the allocation equals the pooled knapsack; capped, it equals brute force over all subsets."""
+    for seed in range(10):
+        candidates = _portfolio_candidates(5, 5, seed)
+        budget_M = 3.0 + seed
+        result = allocate_fund_budget(candidates, budget_M, total_years=5, objective=objective)
+        exact = optimize_initiatives(candidates, budget_M, total_years=5, objective=objective)
+        value = result['Cumulative EBITDA Impact ($M)'] if objective == 'ebitda' else result['Delta Org-AI-R']
+        assert result['Total Investment ($M)'] <= budget_M + 1e-9
+        assert value == pytest.approx(exact['Objective Value'], abs=1e-9)
+
+    column = 'Cumulative EBITDA Impact ($M)' if objective == 'ebitda' else 'Delta Org-AI-R'
+    for seed in range(10):
+        candidates = _portfolio_candidates(4, 4, seed)
+        budget_M, cap_M = 2.0 + seed / 2, 1.5
+        result = allocate_fund_budget(candidates, budget_M, total_years=5, objective=objective, max_per_company_M=cap_M)
+        best = _brute_force(candidates, budget_M, cap_M, objective)
+        assert result[column] == pytest.approx(best, abs=1e-9)
+
+
+def test_allocation_respects_per_company_cap_and_totals():
+    """Per-company caps hold and the allocation table adds up to the fund totals."""
+    candidates = _portfolio_candidates(8, 10, seed=3)
+    result = allocate_fund_budget(candidates, 20.0, total_years=3, max_per_company_M=1.5)
+    allocation = result['Allocation']
+    assert len(allocation) == 8
+    assert (allocation['Budget Allocated ($M)'] <= 1.5 + 1e-9).all()
+    assert np.isclose(allocation['Budget Allocated ($M)'].sum(), result['Total Investment ($M)'])
+    assert allocation['Initiatives'].sum() == len(result['Selected'])
+    with pytest.raises(ValueError):
+        allocate_fund_budget(candidates, 20.0, objective='aie', max_per_company_M=1.5)
+
+
+def test_allocation_scales_to_a_full_fund():
+    """40+ companies with ~20 candidates each allocate in well under a few seconds."""
+    candidates = _portfolio_candidates(45, 20, seed=0)
+    start = time.perf_counter()
+    for objective in ['ebitda', 'org_ai_r', 'aie']:
+        result = allocate_fund_budget(candidates, 80.0, total_years=5, objective=objective)
+        assert result['Total Investment ($M)'] <= 80.0 + 1e-9
+    assert time.perf_counter() - start < 5.0
+
+
+def test_portfolio_candidates_cover_every_company_use_case():
+    """Candidates are the sector catalog of each company, estimated from simulated current ratings."""
+    companies = pd.DataFrame({'Company': ['Alpha Manufacturing', 'Beta Healthcare'],
+                              'Sector': ['Manufacturing', 'Healthcare'], 'EBITDA ($M)': [9.0, 8.0]})
+    candidates = portfolio_candidates(companies)
+    assert set(candidates['Company']) == set(companies['Company'])
+    assert (candidates['Investment ($M)'] > 0).all()
+    result = allocate_fund_budget(candidates, 1.0)
+    assert result['Total Investment ($M)'] <= 1.0 + 1e-9
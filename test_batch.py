@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.batch import (
+    DIMENSIONS, SECTORS, WEIGHT_MATRIX, sector_index, score_companies,
+    estimate_project_parameters_batch, portfolio_use_case_rows, create_multi_year_plan_batch,
+)
+from planner.model import (
+    model_coefficients, systematic_opportunity_scores, all_dimension_weights_df,
+    high_value_use_cases, calculate_dimension_score, calculate_V_org_R, calculate_synergy,
+    calculate_org_ai_r, calculate_screening_score, estimate_project_parameters,
+    create_multi_year_plan,
+)
+
+
+def test_weight_matrix_matches_weight_table():
+    assert WEIGHT_MATRIX.shape == (len(DIMENSIONS), len(SECTORS))
+    for j, sector in enumerate(SECTORS):
+        np.testing.assert_allclose(WEIGHT_MATRIX[:, j], all_dimension_weights_df.loc[DIMENSIONS, sector])
+
+
+def test_score_companies_matches_scalar_functions():
+    """
+    Every batch output must equal the per-company scalar path, rounding included.
+    """
+    rng = np.random.default_rng(7)
+    ratings = rng.integers(1, 6, size=(200, len(DIMENSIONS)))
+    sectors = rng.choice(SECTORS, size=200)
+    external = rng.integers(0, 101, size=200)
+
+    out = score_companies(ratings, sector_index(sectors), external)
+
+    for i in range(len(ratings)):
+        H = systematic_opportunity_scores[sectors[i]]
+        scores = calculate_dimension_score(pd.Series(ratings[i], index=DIMENSIONS))
+        v_org_r = calculate_V_org_R(scores, all_dimension_weights_df[sectors[i]])
+        org_ai_r = calculate_org_ai_r(v_org_r, H, calculate_synergy(v_org_r, H),
+                                      model_coefficients['alpha'], model_coefficients['beta'])
+        assert out['V_org_R'][i] == v_org_r
+        assert out['Synergy'][i] == calculate_synergy(v_org_r, H)
+        assert out['Org-AI-R'][i] == org_ai_r
+        assert out['Screening Score'][i] == calculate_screening_score(H, external[i], model_coefficients['epsilon'])
+
+
+def test_score_companies_accepts_dataframe_and_rejects_unknown_sector():
+    ratings = pd.DataFrame([{dim: 5 for dim in DIMENSIONS}])
+    out = score_companies(ratings, sector_index(['Technology']))
+    assert out['V_org_R'][0] == 100.0
+    assert 'Screening Score' not in out
+
+    with pytest.raises(KeyError):
+        sector_index(['Aerospace'])
+
+
+def test_estimate_project_parameters_batch_matches_scalar_with_overrides():
+    """
+    The columnar estimator must reproduce the scalar estimator row for row, including
+    the Diagnostic AI fallback draw, NaN meaning "use the default" and round()'s rounding
+    of ties, over many random companies and overrides.
+    """
+    sectors = list(systematic_opportunity_scores)
+    for seed in range(100):
+        rng = np.random.default_rng(seed)
+        companies = pd.DataFrame({
+            'Company': [f'Company {i}' for i in range(6)],
+            'Sector': rng.choice(sectors, size=6),
+            'Current V_org_R': np.round(rng.uniform(20, 95, size=6), rng.integers(0, 4)),
+            'EBITDA ($M)': np.round(rng.uniform(1, 60, size=6), rng.integers(0, 3)),
+        })
+        rows = portfolio_use_case_rows(companies)
+        assert len(rows) == sum(len(high_value_use_cases[s]) for s in companies['Sector'])
+        for column, low, high in (('User Probability of Success', 0.5, 0.95), ('User Execution Quality', 0.6, 0.9),
+                                  ('User Investment ($M)', 0.1, 3.0)):
+            rows[column] = np.where(rng.random(len(rows)) < 0.3, np.round(rng.uniform(low, high, len(rows)), 2), np.nan)
+        out = estimate_project_parameters_batch(rows)
+
+        for i, row in rows.iterrows():
+            def user(column):
+                return None if np.isnan(row[column]) else row[column]
+            expected = estimate_project_parameters(
+                row, row['Current V_org_R'], row['H_org_k_R'], row['Initial EBITDA ($M)'],
+                user_investment=user('User Investment ($M)'), user_prob_success=user('User Probability of Success'),
+                user_exec_quality=user('User Execution Quality'))
+            for column, value in expected.items():
+                assert out.loc[i, column] == value, (seed, row['Use Case'], column)
+
+
+def test_create_multi_year_plan_batch_matches_per_company_plans():
+    """
+    The long-format batch plan must equal create_multi_year_plan run company by company,
+    and companies without initiatives still get a flat trajectory.
+    """
+    rng = np.random.default_rng(5)
+    n = 40
+    initiatives = pd.DataFrame({
+        'Company': rng.choice(['A', 'B', 'C'], size=n),
+        'Timeline (months)': rng.choice([2, 4.5, 9, 15, 18, 30], size=n),
+        'Investment ($M)': np.round(rng.uniform(0.1, 2.0, size=n), 2),
+        'Delta Org-AI-R': np.round(rng.uniform(1, 10, size=n), 2),
+        'EBITDA Impact ($M)': np.round(rng.uniform(0, 1, size=n), 2),
+    })
+    initial = pd.Series({'A': 48.5, 'B': 61.0, 'C': 39.25, 'D': 70.0})
+
+    plans = create_multi_year_plan_batch(initiatives, initial, total_years=5)
+    assert len(plans) == len(initial) * 5
+
+    for company, org_ai_r in initial.items():
+        expected = create_multi_year_plan(company, org_ai_r, 10.0,
+                                          initiatives[initiatives['Company'] == company], 72, total_years=5)
+        actual = plans[plans['Company'] == company].drop(columns='Company').reset_index(drop=True)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    flat = plans[plans['Company'] == 'D']
+    assert (flat['Org-AI-R'] == 70.0).all() and (flat['Cumulative Investment ($M)'] == 0).all()
@@ -0,0 +1,37 @@
+import copy
+import json
+
+from planner.benchmark import BENCHMARKS, run_benchmarks, compare_to_baseline, main
+
+
+def test_every_case_runs_and_records_throughput_and_memory():
+    """Each case reports time, rows/s and peak memory per size; scalar loops stop at their max_rows."""
+    report = run_benchmarks(sizes=(10, 2_000), min_seconds=0)
+    assert set(report['results']) == set(BENCHMARKS)
+    for name, by_size in report['results'].items():
+        max_rows = BENCHMARKS[name][1]
+        assert set(by_size) == ({'10', '2000'} if max_rows is None or max_rows >= 2_000 else {'10'})
+        for size, result in by_size.items():
+            assert result['seconds'] > 0 and result['peak_memory_bytes'] > 0
+            assert result['rows_per_second'] == int(size) / result['seconds']
+    json.dumps(report)
+
+
+def test_regressions_beyond_tolerance_fail_the_run(tmp_path, capsys):
+    """A baseline saved as JSON passes against itself and fails once a case is slower than tolerated."""
+    baseline_path = tmp_path / 'baseline.json'
+    args = ['--sizes', '200000', '--cases', 'score_companies', 'batch_exit_valuation', '--min-seconds', '0']
+    assert main(args + ['--save', str(baseline_path)]) == 0
+    baseline = json.loads(baseline_path.read_text())
+    assert compare_to_baseline(baseline, baseline) == []
+
+    faster = copy.deepcopy(baseline)
+    faster['results']['score_companies']['200000']['seconds'] /= 10
+    faster['results']['batch_exit_valuation']['200000']['peak_memory_bytes'] //= 10
+    regressions = compare_to_baseline(baseline, faster)
+    assert len(regressions) == 2 and 'score_companies @ 200000 rows' in regressions[0] and 'peak memory' in regressions[1]
+    assert compare_to_baseline(baseline, faster, tolerance=20, memory_tolerance=20) == []
+
+    (tmp_path / 'faster.json').write_text(json.dumps(faster))
+    assert main(args + ['--baseline', str(tmp_path / 'faster.json'), '--tolerance', '1']) == 1
+    assert 'REGRESSION score_companies' in capsys.readouterr().err
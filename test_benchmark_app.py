@@ -0,0 +1,19 @@
+import json
+
+from benchmark_app import SCENARIOS, main
+
+
+def test_step_latency_report(tmp_path):
+    """A rerun and a widget interaction report p50/p99 wall time and peak allocation, saved as JSON."""
+    scenarios = ['Step 4 rerun', 'Step 4 planning horizon slider']
+    assert all(SCENARIOS[name][0] == 4 for name in scenarios)
+    out = tmp_path / 'latency.json'
+    assert main(['--scenarios', *scenarios, '--repeats', '3', '--memory-repeats', '1', '--save', str(out)]) == 0
+
+    report = json.loads(out.read_text())
+    assert report['script_compile']['peak_memory_bytes'] > 0
+    for name in scenarios:
+        result = report['scenarios'][name]
+        assert result['repeats'] == 3
+        assert 0 < result['seconds']['p50'] <= result['seconds']['p99']
+        assert result['peak_memory_bytes']['p50'] >= report['script_compile']['peak_memory_bytes']
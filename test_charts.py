@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from planner.charts import ChartCache, render_chart, plan_line_chart, portfolio_bar_chart
+from planner.model import high_value_use_cases, create_multi_year_plan, estimate_project_parameters
+
+
+def _plan(initial_ebitda_M=9.0):
+    catalog = high_value_use_cases['Manufacturing']
+    planned = pd.DataFrame([estimate_project_parameters(row, 55.0, 72, initial_ebitda_M)
+                            for _, row in catalog.head(3).iterrows()])
+    return create_multi_year_plan('Alpha Manufacturing', 60.0, initial_ebitda_M, planned, 72)
+
+
+def test_unchanged_chart_is_served_from_cache_and_figures_are_closed():
+    """A second render of the same data and styling is a cache hit, and no figure stays open."""
+    cache = ChartCache()
+    plan = _plan()
+    first = render_chart(plan_line_chart, plan, 'Org-AI-R', 'Progression', 'Org-AI-R Score', ylim=(0, 100), cache=cache)
+    again = render_chart(plan_line_chart, plan.copy(), 'Org-AI-R', 'Progression', 'Org-AI-R Score', ylim=(0, 100),
+                         cache=cache)
+    assert first == again and first.startswith(b'\x89PNG')
+    restyled = render_chart(plan_line_chart, plan, 'Org-AI-R', 'Progression', 'Org-AI-R Score', cache=cache)
+    assert restyled != first
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+    assert plt.get_fignums() == []
+
+
+def test_cache_is_bounded_lru_and_closes_figures_on_error():
+    """Least recently used charts are evicted first; a failing chart still releases its figure."""
+    cache = ChartCache(max_entries=2)
+    plans = [_plan(ebitda) for ebitda in (5.0, 9.0, 12.0)]
+    render_chart(plan_line_chart, plans[0], 'Org-AI-R', 'A', 'Score', cache=cache)
+    render_chart(plan_line_chart, plans[1], 'Org-AI-R', 'A', 'Score', cache=cache)
+    render_chart(plan_line_chart, plans[0], 'Org-AI-R', 'A', 'Score', cache=cache)  # plans[0] is now most recent
+    render_chart(plan_line_chart, plans[2], 'Org-AI-R', 'A', 'Score', cache=cache)
+    assert cache.stats()['entries'] == 2
+    render_chart(plan_line_chart, plans[0], 'Org-AI-R', 'A', 'Score', cache=cache)
+    assert cache.stats()['hits'] == 2
+
+    portfolio = pd.DataFrame({'Company': ['A', 'B'], 'Sector': ['Retail', 'Retail'], 'Score': [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        render_chart(portfolio_bar_chart, portfolio, 'Score', 'viridis', 1.5, 'You', 'T', 'Score', 'no such location',
+                     cache=cache)
+    assert plt.get_fignums() == []
+
+
+def test_first_page_does_not_load_plotting_libraries():
+    """A fresh process running the app's first step never imports matplotlib, seaborn or scipy."""
+    code = (
+        "import sys\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "at = AppTest.from_file('app.py', default_timeout=60)\n"
+        "at.run()\n"
+        "assert not at.exception\n"
+        "print(sorted(m for m in ('matplotlib', 'seaborn', 'scipy') if m in sys.modules))\n"
+    )
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=root, check=True)
+    assert result.stdout.strip().splitlines()[-1] == '[]'
@@ -0,0 +1,91 @@
+import time
+
+import pandas as pd
+import pytest
+
+from planner.graph import DependencyGraph, build_planner_graph
+from planner.model import high_value_use_cases, simulate_dimension_ratings, create_multi_year_plan
+
+
+def test_only_downstream_nodes_recompute_with_early_cutoff():
+    """A changed input recomputes its descendants; a node whose value did not change stops the cascade."""
+    graph = DependencyGraph().add_input('a').add_input('b')
+    graph.add_node('sign_a', lambda a: a >= 0, ['a'])
+    graph.add_node('b_squared', lambda b: b * b, ['b'])
+    graph.add_node('report', lambda s, b2: (s, b2), ['sign_a', 'b_squared'])
+    graph.set_input('a', 1)
+    graph.set_input('b', 3)
+    assert graph.get('report') == (True, 9)
+    assert sorted(graph.recomputed) == ['b_squared', 'report', 'sign_a']
+
+    graph.begin_run()
+    assert not graph.set_input('b', 3.0)  # same content
+    graph.get('report')
+    assert graph.recomputed == []
+
+    graph.begin_run()
+    graph.set_input('a', 5)  # sign unchanged, so 'report' is not recomputed
+    assert graph.get('report') == (True, 9)
+    assert graph.recomputed == ['sign_a']
+
+    with pytest.raises(KeyError):
+        graph.set_input('missing', 1)
+
+
+def _planner_inputs(graph, use_cases):
+    sector = 'Manufacturing'
+    ratings = simulate_dimension_ratings('Alpha Manufacturing', sector).to_dict()
+    graph.set_input('company', 'Alpha Manufacturing')
+    graph.set_input('sector', sector)
+    graph.set_input('current_ratings', ratings)
+    graph.set_input('target_ratings', ratings)
+    graph.set_input('initial_ebitda_M', 9.0)
+    graph.set_input('use_case_rows', use_cases)
+    graph.set_input('planning_horizon', 3)
+    graph.set_input('exit_scores', (75, 80, 70))
+    graph.set_input('base_exit_multiple', 6.0)
+    return ratings
+
+
+def test_planner_graph_matches_direct_chain_and_tracks_changes():
+    """Planner nodes equal the direct computation, and an exit slider leaves the plan alone."""
+    graph = build_planner_graph()
+    use_cases = high_value_use_cases['Manufacturing']
+    _planner_inputs(graph, use_cases)
+    scores = graph.get('current_scores')
+    expected_plan = create_multi_year_plan('Alpha Manufacturing', scores['Org-AI-R'], 9.0,
+                                           graph.get('planned_initiatives'), 72, 3)
+    pd.testing.assert_frame_equal(graph.get('plan_trajectory'), expected_plan)
+    graph.get('exit_valuation')
+
+    graph.begin_run()
+    graph.set_input('exit_scores', (90, 80, 70))
+    graph.get('exit_valuation')
+    graph.get('plan_trajectory')
+    assert graph.recomputed == ['exit_ai_r', 'exit_multiple', 'exit_valuation']
+
+    graph.begin_run()
+    graph.set_input('planning_horizon', 5)
+    graph.get('exit_valuation')
+    assert 'planned_initiatives' not in graph.recomputed
+    assert graph.recomputed[0] == 'plan_trajectory'
+
+
+def test_unchanged_rerun_cost_does_not_grow_with_initiatives():
+    """A rerun with unchanged inputs does not recompute anything, however large the plan."""
+    catalog = high_value_use_cases['Manufacturing']
+    timings = []
+    for copies in [1, 200]:
+        use_cases = pd.concat([catalog] * copies, ignore_index=True)
+        use_cases['Use Case'] = [f'{name} {i}' for i, name in enumerate(use_cases['Use Case'])]
+        graph = build_planner_graph()
+        ratings = _planner_inputs(graph, use_cases)
+        graph.get('exit_valuation')
+        graph.begin_run()
+        start = time.perf_counter()
+        for _ in range(20):
+            graph.set_input('current_ratings', ratings)
+            graph.get('exit_valuation')
+        timings.append(time.perf_counter() - start)
+        assert graph.recomputed == []
+    assert timings[1] < 0.5
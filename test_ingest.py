@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.batch import DIMENSIONS, SECTORS
+from planner.graph import build_planner_graph
+from planner.ingest import score_company_chunk, score_company_file, portfolio_benchmark
+from planner.model import (
+    high_value_use_cases, default_use_cases_for_sector, calculate_within_portfolio_percentile,
+    calculate_cross_portfolio_z_score,
+)
+
+
+def _pipeline(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Company': [f'Company {i % 50}' for i in range(n)], 'Sector': rng.choice(SECTORS, n),
+                       'EBITDA ($M)': rng.uniform(2, 30, n).round(1), 'Unused': 'x'})
+    for dim in DIMENSIONS:
+        df[dim] = rng.integers(1, 6, n)
+    return df
+
+
+def test_chunked_file_scoring_matches_whole_file_and_planner_graph(tmp_path):
+    """CSV and Parquet, read in small chunks, score exactly like one chunk and like the app's graph."""
+    df = _pipeline(300)
+    df.to_csv(tmp_path / 'pipeline.csv', index=False)
+    df.to_parquet(tmp_path / 'pipeline.parquet')
+    whole = score_company_chunk(df)
+    for name in ['pipeline.csv', 'pipeline.parquet']:
+        chunks = list(score_company_file(str(tmp_path / name), chunk_rows=64))
+        assert [len(c) for c in chunks] == [64, 64, 64, 64, 44]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+    for i in [0, 7, 123]:
+        row = df.iloc[i]
+        ratings = row[DIMENSIONS].astype(int).to_dict()
+        catalog = high_value_use_cases[row['Sector']]
+        graph = build_planner_graph()
+        for name, value in [('company', row['Company']), ('sector', row['Sector']), ('current_ratings', ratings),
+                            ('target_ratings', ratings), ('initial_ebitda_M', float(row['EBITDA ($M)'])),
+                            ('planning_horizon', 3),
+                            ('use_case_rows', catalog[catalog['Use Case'].isin(
+                                default_use_cases_for_sector[row['Sector']])].reset_index(drop=True))]:
+            graph.set_input(name, value)
+        totals = graph.get('plan_totals')
+        assert whole.loc[i, 'Baseline Org-AI-R'] == graph.get('current_scores')['Org-AI-R']
+        assert whole.loc[i, 'Current Org-AI-R'] == totals['Final Org-AI-R']
+        assert whole.loc[i, 'Efficiency (pts/$M$)'] == totals['AIE']
+
+
+def test_invalid_files_and_benchmark():
+    """Bad files raise clear errors; the array benchmark equals the scalar percentile/z-score."""
+    df = _pipeline(20)
+    with pytest.raises(ValueError, match='missing'):
+        score_company_chunk(df.drop(columns='Talent'))
+    with pytest.raises(ValueError, match='between 1 and 5'):
+        score_company_chunk(df.assign(Talent=6))
+    with pytest.raises(KeyError):
+        score_company_chunk(df.assign(Sector='Mining'))
+    blank_sector = df.assign(Sector=['Mining', ''] + df['Sector'].tolist()[2:]).to_csv(index=False)
+    with pytest.raises(KeyError, match=r"\['\(blank\)', 'Mining'\]"):
+        next(score_company_file(io.StringIO(blank_sector), file_format='csv'))
+    with pytest.raises(ValueError, match=r'EBITDA \(\$M\) is blank for 1 '):
+        score_company_chunk(df.assign(**{'EBITDA ($M)': [np.nan] + df['EBITDA ($M)'].tolist()[1:]}))
+    with pytest.raises(ValueError, match='Unsupported'):
+        next(score_company_file('pipeline.xlsx'))
+
+    values = score_company_chunk(df)['Current Org-AI-R']
+    benchmark = portfolio_benchmark(values, 70.0)
+    assert benchmark['Percentile'] == calculate_within_portfolio_percentile(70.0, values.tolist())
+    assert benchmark['Z-Score'] == calculate_cross_portfolio_z_score(70.0, values.mean(), values.std())
@@ -0,0 +1,56 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.batch import DIMENSIONS, SECTORS
+from planner.lattice import default_rating_lattice, lattice_index
+from planner.model import (
+    model_coefficients, systematic_opportunity_scores, all_dimension_weights_df,
+    calculate_dimension_score, calculate_V_org_R, calculate_synergy, calculate_org_ai_r,
+)
+
+
+def _scalar_scores(ratings, sector):
+    V_org_R = calculate_V_org_R(calculate_dimension_score(ratings), all_dimension_weights_df[sector])
+    H_org_k_R = systematic_opportunity_scores[sector]
+    return V_org_R, calculate_org_ai_r(V_org_R, H_org_k_R, calculate_synergy(V_org_R, H_org_k_R),
+                                       model_coefficients['alpha'], model_coefficients['beta'])
+
+
+def test_lattice_lookup_matches_scalar_model():
+    """Lookups return exactly what the scalar Step 2 functions compute, rounding included."""
+    lattice = default_rating_lattice()
+    assert lattice.codes.dtype == np.uint8 and lattice.org_ai_r.dtype == np.float32
+    rng = np.random.default_rng(11)
+    for _ in range(300):
+        ratings = pd.Series(rng.integers(1, 6, size=len(DIMENSIONS)), index=DIMENSIONS)
+        sector = rng.choice(SECTORS)
+        assert lattice.lookup(ratings, sector) == _scalar_scores(ratings, sector)
+    np.testing.assert_array_equal(lattice.codes[lattice_index(lattice.codes + 1)], lattice.codes)
+    with pytest.raises(ValueError):
+        lattice_index([0, 1, 2, 3, 4, 5, 6])
+
+
+def test_min_upgrades_is_cheapest_reaching_goal():
+    """The inverse query agrees with a brute-force search over every upgrade vector."""
+    lattice = default_rating_lattice()
+    current = pd.Series([2, 1, 3, 2, 1, 2, 3], index=DIMENSIONS)
+    target = pd.Series([4, 3, 4, 3, 3, 4, 4], index=DIMENSIONS)
+    sector = 'Manufacturing'
+    for goal in [55.0, 62.5, 70.0, 80.0]:
+        result = lattice.min_upgrades(current, sector, goal, max_ratings=target)
+        best_steps = None
+        for candidate in itertools.product(*[range(c, t + 1) for c, t in zip(current, target)]):
+            candidate = pd.Series(candidate, index=DIMENSIONS)
+            if _scalar_scores(candidate, sector)[1] >= goal:
+                steps = int((candidate - current).sum())
+                best_steps = steps if best_steps is None else min(best_steps, steps)
+        if best_steps is None:
+            assert result is None
+            continue
+        assert result['Steps'] == best_steps
+        assert result['Org-AI-R'] >= goal
+        assert (result['Ratings'] >= current).all() and (result['Ratings'] <= target).all()
+        assert (result['V_org_R'], result['Org-AI-R']) == _scalar_scores(result['Ratings'], sector)
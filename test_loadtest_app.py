@@ -0,0 +1,15 @@
+from loadtest_app import LAST_STEP, capacity, run_load
+
+
+def test_concurrent_sessions_report():
+    """Two analysts run Steps 1-6 at once without failing; every script run is timed and counted."""
+    level = run_load(2, interactions=1)
+    assert level['errors'] == []
+    # per analyst: the first run, one interaction per step and at least one run per step change
+    assert level['runs'] >= 2 * (1 + LAST_STEP + (LAST_STEP - 1))
+    assert 0 < level['latency_seconds']['p50'] <= level['latency_seconds']['p95'] <= level['latency_seconds']['p99']
+    assert list(level['latency_by_step']) == [str(step) for step in range(1, LAST_STEP + 1)]
+    assert level['runs_per_second'] > 0 and level['rss_growth_bytes'] is not None
+
+    slow = {**level, 'sessions': 4, 'latency_seconds': {'p95': level['latency_seconds']['p95'] + 1}}
+    assert capacity([level, slow], p95_budget=level['latency_seconds']['p95']) == 2
@@ -0,0 +1,68 @@
+import urllib.request
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from planner.metrics import (
+    MetricsRegistry, SessionRegistry, approximate_size, reruns, start_http_server, write_metrics_file,
+)
+
+
+def test_exposition_format_and_sessions(tmp_path):
+    """Counters, cumulative histogram buckets and collectors render as Prometheus text; idle sessions expire."""
+    metrics = MetricsRegistry()
+    counter = metrics.counter('demo_total', "Demo.", ['step'])
+    histogram = metrics.histogram('demo_seconds', "Demo.", ['step'], buckets=(0.1, 1.0))
+    metrics.collector(lambda: [('demo_gauge', 'gauge', "Demo.", [({'name': 'a "b"'}, 2)])])
+    counter.inc(step=3)
+    counter.inc(2, step=3)
+    for seconds in (0.05, 0.5, 5.0):
+        histogram.observe(seconds, step=3)
+    lines = metrics.render().splitlines()
+    assert '# TYPE demo_total counter' in lines and 'demo_total{step="3"} 3.0' in lines
+    assert ['demo_seconds_bucket{step="3",le="0.1"} 1', 'demo_seconds_bucket{step="3",le="1.0"} 2',
+            'demo_seconds_bucket{step="3",le="+Inf"} 3', 'demo_seconds_sum{step="3"} 5.55',
+            'demo_seconds_count{step="3"} 3'] == [line for line in lines if line.startswith('demo_seconds_')]
+    assert 'demo_gauge{name="a \\"b\\""} 2' in lines
+
+    now = [0.0]
+    session_registry = SessionRegistry(idle_seconds=60, size_interval=10, clock=lambda: now[0])
+    session_registry.touch('a', lambda: 100)
+    now[0] = 5
+    session_registry.touch('a', lambda: 999)  # size not due yet
+    session_registry.touch('b')
+    assert session_registry.active() == {'a': 100, 'b': 0}
+    now[0] = 30
+    session_registry.touch('a')
+    now[0] = 66
+    assert session_registry.active() == {'a': 100}
+    assert approximate_size({'frame': pd.DataFrame({'x': np.zeros(1000)})}) > 8000
+
+    path = tmp_path / 'planner.prom'
+    write_metrics_file(path)
+    assert '# TYPE planner_cache_hits_total counter' in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_app_reruns_are_served_over_http():
+    """App reruns are counted by step and the registry is served at /metrics."""
+    before = reruns.value(step=4, kind='full')
+    at = AppTest.from_file('app.py', default_timeout=60)
+    at.run()
+    at.session_state['current_step'] = 4
+    at.run()
+    assert reruns.value(step=4, kind='full') == before + 1
+
+    server = start_http_server(0, addr='127.0.0.1')
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'planner_rerun_duration_seconds_bucket{step="4",kind="full",le="+Inf"}' in body
+    assert 'planner_active_sessions ' in body and 'planner_cache_hit_ratio{cache="charts"}' in body
+    assert 'planner_chart_render_seconds_count{chart="plan_line_chart"}' in body
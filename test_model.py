@@ -0,0 +1,100 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from planner.model import (
+    model_coefficients, systematic_opportunity_scores, all_dimension_weights_df,
+    high_value_use_cases, calculate_dimension_score, calculate_V_org_R,
+    calculate_synergy, calculate_org_ai_r, screening_recommendation,
+    estimate_project_parameters, create_multi_year_plan,
+)
+
+
+def test_import_has_no_streamlit_side_effects():
+    """
+    The scoring core must be importable in a plain interpreter without pulling
+    in Streamlit or any plotting library.
+    """
+    code = (
+        "import sys, planner.model; "
+        "print(any(m.split('.')[0] in ('streamlit', 'matplotlib', 'seaborn') for m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_reference_tables_cover_every_sector():
+    for sector in systematic_opportunity_scores:
+        assert sector in all_dimension_weights_df.columns
+        assert sector in high_value_use_cases
+        assert abs(all_dimension_weights_df[sector].sum() - 1.0) < 1e-9
+
+
+def test_org_ai_r_chain_matches_formula():
+    ratings = pd.Series({dim: 3 for dim in all_dimension_weights_df.index})
+    scores = calculate_dimension_score(ratings)
+    v_org_r = calculate_V_org_R(scores, all_dimension_weights_df['Manufacturing'])
+    assert v_org_r == 60.0
+
+    H = systematic_opportunity_scores['Manufacturing']
+    org_ai_r = calculate_org_ai_r(v_org_r, H, calculate_synergy(v_org_r, H),
+                                  model_coefficients['alpha'], model_coefficients['beta'])
+    assert org_ai_r == round(0.65 * 60 + 0.35 * 72 + 0.15 * 60, 2)
+    assert screening_recommendation(130, 61).startswith("Strong")
+    assert screening_recommendation(90, 40).startswith("Watchlist")
+
+
+def test_multi_year_plan_accumulates_completed_initiatives():
+    catalog = high_value_use_cases['Manufacturing']
+    rows = []
+    for _, uc in catalog.iterrows():
+        params = estimate_project_parameters(uc, 60.0, 72, 9.0)
+        rows.append({**params, 'Use Case': uc['Use Case']})
+    plan = create_multi_year_plan('Test Co', 50.0, 9.0, pd.DataFrame(rows), 72, total_years=3)
+
+    assert plan['Year'].tolist() == [1, 2, 3]
+    assert plan['Cumulative Investment ($M)'].is_monotonic_increasing
+    assert plan['Cumulative EBITDA Impact ($M)'].is_monotonic_increasing
+
+
+def _per_initiative_plan(initial_org_ai_r, initiatives, total_years):
+    # The original iterrows implementation of create_multi_year_plan
+    added = {'investment': [0] * (total_years + 1), 'delta': [0] * (total_years + 1), 'ebitda': [0] * (total_years + 1)}
+    for _, initiative in initiatives.sort_values(by='Timeline (months)').iterrows():
+        completion_year = min(total_years, int(np.ceil(initiative['Timeline (months)'] / 12)))
+        if completion_year > 0:
+            added['investment'][completion_year] += initiative['Investment ($M)']
+            added['delta'][completion_year] += initiative['Delta Org-AI-R']
+            for year in range(completion_year, total_years + 1):
+                added['ebitda'][year] += initiative['EBITDA Impact ($M)']
+    org_ai_r, cumulative_ebitda, cumulative_investment, rows = initial_org_ai_r, 0, 0, []
+    for year in range(1, total_years + 1):
+        org_ai_r += added['delta'][year]
+        cumulative_investment += added['investment'][year]
+        cumulative_ebitda += added['ebitda'][year]
+        rows.append([year, round(org_ai_r, 2), round(added['ebitda'][year], 2), round(cumulative_ebitda, 2),
+                     round(added['investment'][year], 2), round(cumulative_investment, 2)])
+    return np.array(rows, dtype=np.float64)
+
+
+def test_multi_year_plan_matches_per_initiative_loop():
+    """
+    Identical to the original loop on the 0.01 grid; finer inputs may flip a rounding tie,
+    so they agree to within 0.01.
+    """
+    rng = np.random.default_rng(4)
+    for decimals, tolerance in ((2, 0.0), (3, 0.01 + 1e-9)):
+        for _ in range(200):
+            n = rng.integers(1, 12)
+            initiatives = pd.DataFrame({
+                'Timeline (months)': rng.choice([2, 4.5, 9, 15, 18, 30], size=n),
+                'Investment ($M)': np.round(rng.uniform(0.1, 2.0, size=n), decimals),
+                'Delta Org-AI-R': np.round(rng.uniform(1, 10, size=n), decimals),
+                'EBITDA Impact ($M)': np.round(rng.uniform(0, 1, size=n), decimals),
+            })
+            initial = round(float(rng.uniform(30, 70)), decimals)
+            plan = create_multi_year_plan('Test Co', initial, 9.0, initiatives, 72, total_years=5)
+            expected = _per_initiative_plan(initial, initiatives, 5)
+            assert np.abs(plan.to_numpy(dtype=np.float64) - expected).max() <= tolerance
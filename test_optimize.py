@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.memo import cached_optimize_use_cases
+from planner.model import create_multi_year_plan
+from planner.optimize import optimize_initiatives, optimize_use_cases, candidate_contributions
+
+
+def _random_candidates(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Use Case': [f'Use Case {i}' for i in range(n)],
+        'Timeline (months)': rng.choice([2, 4.5, 9, 15, 18, 30], size=n),
+        'Investment ($M)': np.round(rng.uniform(0.1, 2.0, size=n), 2),
+        'EBITDA Impact ($M)': np.round(rng.uniform(0, 1, size=n), 2),
+        'Delta Org-AI-R': np.round(rng.uniform(1, 10, size=n), 2),
+    })
+
+
+def _brute_force(candidates, budget_M, total_years, objective):
+    cost, ebitda, delta = candidate_contributions(candidates, total_years)
+    best = 0.0
+    for k in range(len(candidates) + 1):
+        for subset in map(list, itertools.combinations(range(len(candidates)), k)):
+            if cost[subset].sum() > budget_M + 1e-9:
+                continue
+            if objective == 'ebitda':
+                value = ebitda[subset].sum()
+            elif objective == 'org_ai_r':
+                value = delta[subset].sum()
+            else:
+                value = delta[subset].sum() / cost[subset].sum() * ebitda[subset].sum() if subset else 0.0
+            best = max(best, value)
+    return best
+
+
+@pytest.mark.parametrize('objective', ['ebitda', 'org_ai_r', 'aie'])
+def test_exact_methods_match_brute_force(objective):
+    for seed in range(15):
+        candidates = _random_candidates(8, seed)
+        result = optimize_initiatives(candidates, budget_M=3.0, total_years=4, objective=objective)
+        expected = _brute_force(candidates, 3.0, 4, objective)
+        assert result['Objective Value'] == pytest.approx(expected, abs=1e-9)
+        assert result['Total Investment ($M)'] <= 3.0 + 1e-9
+        assert result['Method'] in ('dynamic-programming', 'enumeration')
+
+
+def test_selection_totals_agree_with_multi_year_plan():
+    candidates = _random_candidates(10, 99)
+    result = optimize_initiatives(candidates, budget_M=4.0, total_years=5, objective='ebitda', initial_org_ai_r=50.0)
+    plan = create_multi_year_plan('Test Co', 50.0, 10.0, result['Selected'], 72, total_years=5).iloc[-1]
+
+    assert result['Cumulative EBITDA Impact ($M)'] == pytest.approx(plan['Cumulative EBITDA Impact ($M)'], abs=0.01)
+    assert result['Final Org-AI-R'] == pytest.approx(plan['Org-AI-R'], abs=0.01)
+    assert result['Total Investment ($M)'] == pytest.approx(plan['Cumulative Investment ($M)'], abs=0.01)
+
+
+def test_large_catalogs_use_heuristics_within_budget():
+    candidates = _random_candidates(400, 1)
+    aie = optimize_initiatives(candidates, budget_M=25.0, total_years=5, objective='aie')
+    assert aie['Method'] == 'local-search'
+    assert 0 < aie['Total Investment ($M)'] <= 25.0 + 1e-9
+
+    # The heuristic should not be beaten by simply taking the best exact answer on a subset
+    subset = optimize_initiatives(candidates.iloc[:12], budget_M=25.0, total_years=5, objective='aie')
+    assert aie['AIE'] >= subset['AIE'] - 1e-9
+
+
+def test_optimize_use_cases_over_sector_catalog():
+    result = optimize_use_cases('Technology', 70.0, 15.0, 75.0, budget_M=0.5, total_years=3)
+    assert set(result['Selected']['Use Case']) <= {'Product AI Embedding', 'Automated Code Generation',
+                                                    'Predictive Cybersecurity', 'ML-driven DevOps'}
+    assert result['Total Investment ($M)'] <= 0.5 + 1e-9
+
+    with pytest.raises(ValueError):
+        optimize_use_cases('Technology', 70.0, 15.0, 75.0, budget_M=1.0, objective='irr')
+
+
+def test_cached_optimize_use_cases_reuses_the_solve():
+    args = ('Healthcare', 62.0, 40.0, 58.0, 2.5, 4, 'aie')
+    hits = cached_optimize_use_cases.memo.stats()['hits']
+    first = cached_optimize_use_cases(*args)
+    second = cached_optimize_use_cases(*args)
+    assert cached_optimize_use_cases.memo.stats()['hits'] == hits + 1
+    pd.testing.assert_frame_equal(second['Selected'], optimize_use_cases(*args)['Selected'])
+    assert first['AIE'] == second['AIE']
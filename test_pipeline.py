@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.__main__ import main
+from planner.batch import DIMENSIONS, SECTORS
+from planner.graph import build_planner_graph
+from planner.ingest import portfolio_benchmark
+from planner.model import (
+    high_value_use_cases, default_use_cases_for_sector, sector_base_multiples, model_coefficients,
+    calculate_screening_score, screening_recommendation,
+)
+from planner.pipeline import PIPELINE_COLUMNS, run_pipeline
+
+
+def _companies(n, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Company': [f'Company {i}' for i in range(n)], 'Sector': rng.choice(SECTORS, n),
+                       'EBITDA ($M)': rng.uniform(2, 30, n).round(1)})
+    for dim in DIMENSIONS:
+        df[dim] = rng.integers(1, 6, n)
+    df['External Signals Score'] = rng.integers(0, 101, n)
+    return df
+
+
+def test_pipeline_matches_planner_graph_for_any_worker_count(tmp_path):
+    """Every column equals the app's single-company result, and workers/chunking do not change the output."""
+    df = _companies(200)
+    df.loc[3, 'Visible Score'] = 40
+    df.loc[5, 'Base Exit Multiple'] = 9.0
+    df.to_parquet(tmp_path / 'companies.parquet')
+    results = run_pipeline(str(tmp_path / 'companies.parquet'), chunk_rows=64)
+    assert list(results.columns) == PIPELINE_COLUMNS and len(results) == 200
+    pd.testing.assert_frame_equal(run_pipeline(str(tmp_path / 'companies.parquet'), chunk_rows=30, n_workers=2), results)
+
+    for i in [0, 3, 5, 150]:
+        row, result = df.iloc[i], results.iloc[i]
+        ratings = row[DIMENSIONS].astype(int).to_dict()
+        catalog = high_value_use_cases[row['Sector']]
+        exit_scores = (75 if np.isnan(row['Visible Score']) else row['Visible Score'], 80, 70)
+        base_multiple = sector_base_multiples[row['Sector']] if np.isnan(row['Base Exit Multiple']) else row['Base Exit Multiple']
+        graph = build_planner_graph()
+        for name, value in [('company', row['Company']), ('sector', row['Sector']), ('current_ratings', ratings),
+                            ('target_ratings', ratings), ('initial_ebitda_M', float(row['EBITDA ($M)'])),
+                            ('planning_horizon', 3), ('exit_scores', exit_scores), ('base_exit_multiple', base_multiple),
+                            ('use_case_rows', catalog[catalog['Use Case'].isin(
+                                default_use_cases_for_sector[row['Sector']])].reset_index(drop=True))]:
+            graph.set_input(name, value)
+        scores, totals = graph.get('current_scores'), graph.get('plan_totals')
+        screening = calculate_screening_score(graph.get('H_org_k_R'), row['External Signals Score'], model_coefficients['epsilon'])
+        assert result['Org-AI-R'] == scores['Org-AI-R'] and result['Screening Score'] == screening
+        assert result['Screening Recommendation'] == screening_recommendation(screening, scores['Org-AI-R'])
+        assert result['Final Org-AI-R'] == totals['Final Org-AI-R'] and result['AIE'] == totals['AIE']
+        assert result['Exit Multiple'] == graph.get('exit_multiple')
+        assert result['Implied Valuation ($M)'] == pytest.approx(graph.get('exit_valuation')['Implied Valuation ($M)'])
+        benchmark = portfolio_benchmark(results['Final Org-AI-R'], result['Final Org-AI-R'])
+        assert (result['Org-AI-R Percentile'], result['Org-AI-R Z-Score']) == (benchmark['Percentile'], benchmark['Z-Score'])
+
+
+def test_command_line_writes_columnar_output(tmp_path, capsys):
+    """`python -m planner in out` writes Parquet or CSV by extension and reports bad input without a traceback."""
+    _companies(50).to_csv(tmp_path / 'companies.csv', index=False)
+    assert main([str(tmp_path / 'companies.csv'), str(tmp_path / 'scored.parquet'), '--workers', '1']) == 0
+    assert main([str(tmp_path / 'companies.csv'), str(tmp_path / 'scored.csv'), '--years', '5', '--workers', '1']) == 0
+    scored = pd.read_parquet(tmp_path / 'scored.parquet')
+    assert len(scored) == 50 and scored['Screening Recommendation'].dtype == 'category'
+    assert (pd.read_csv(tmp_path / 'scored.csv')['Final Org-AI-R'] >= scored['Final Org-AI-R']).all()
+    assert 'Scored 50 companies' in capsys.readouterr().out
+
+    _companies(5).drop(columns='Talent').to_csv(tmp_path / 'bad.csv', index=False)
+    assert main([str(tmp_path / 'bad.csv'), str(tmp_path / 'out.parquet')]) == 1
+    assert 'missing' in capsys.readouterr().err
@@ -0,0 +1,61 @@
+import json
+
+from planner.graph import build_planner_graph
+from planner.model import calculate_org_ai_r
+from planner.profiling import Profiler, active_profiler, open_span, profiled, profiled_entry, span
+
+
+@profiled
+def _leaf(x):
+    return x * 2
+
+
+def test_spans_aggregate_per_call_path_and_export():
+    """Nested spans aggregate by path with self time excluding children; nothing is recorded when inactive."""
+    assert active_profiler() is None
+    with span('ignored'):
+        assert _leaf(2) == 4
+
+    profiler = Profiler()
+    with profiler.rerun('Rerun'):
+        open_span('Step 4')
+        for i in range(3):
+            with span('panel'):
+                _leaf(i)
+        calculate_org_ai_r(50.0, 70, 50.0, 0.6, 0.15)
+    assert active_profiler() is None
+    records = profiler.last_rerun()['records']
+    assert list(records) == [('Rerun',), ('Rerun', 'Step 4'), ('Rerun', 'Step 4', 'panel'),
+                             ('Rerun', 'Step 4', 'panel', '_leaf'), ('Rerun', 'Step 4', 'calculate_org_ai_r')]
+    calls, seconds, self_seconds, _ = records[('Rerun', 'Step 4', 'panel')]
+    assert calls == 3 and 0 < self_seconds < seconds
+    assert profiler.last_rerun()['seconds'] >= seconds
+
+    table = profiler.table()
+    assert table.loc[3, 'Path'] == 'Rerun / Step 4 / panel / _leaf' and table.loc[3, 'Calls'] == 3
+    exported = json.loads(profiler.to_json())
+    assert exported[0]['spans'][1]['path'] == ['Rerun', 'Step 4']
+    lines = profiler.to_collapsed().splitlines()
+    assert lines[2].startswith('Rerun;Step 4;panel ') and int(lines[2].split()[-1]) >= 0
+
+
+def test_fragment_entry_points_and_graph_nodes():
+    """A fragment run on its own is a rerun of its own; inside a rerun it is a span around its graph nodes."""
+    profiler = Profiler(track_memory=True)
+    graph = build_planner_graph()
+    graph.set_input('exit_scores', (75, 80, 70))
+
+    def exit_panel():
+        return graph.get('exit_ai_r')
+    panel = profiled_entry(exit_panel, lambda: profiler)
+
+    assert panel() == 75.75
+    fragment_rerun = profiler.last_rerun()
+    assert fragment_rerun['label'] == 'exit_panel'
+    assert ('exit_panel', 'graph:exit_ai_r', 'assess_exit_readiness') in fragment_rerun['records']
+
+    with profiler.rerun('Rerun'):
+        panel()
+    assert ('Rerun', 'exit_panel') in profiler.last_rerun()['records']
+    assert len(profiler.reruns) == 2
+    profiler.close()
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from planner.model import high_value_use_cases, model_coefficients, sector_dimension_weight_adjustments
+from planner.reference import reference_portfolio, portfolio_view
+
+
+def test_session_overlay_never_touches_shared_portfolio():
+    """Overlaid rows show up in the session's view only; the shared frame and other rows are untouched."""
+    before = reference_portfolio().copy()
+    overlay = {'Alpha Manufacturing': {'Current Org-AI-R': 65.52, 'EBITDA ($M)': 9.6}}
+    view = portfolio_view(overlay)
+    alpha = view[view['Company'] == 'Alpha Manufacturing'].iloc[0]
+    assert alpha['Current Org-AI-R'] == 65.52 and alpha['EBITDA ($M)'] == 9.6
+    pd.testing.assert_frame_equal(view[view['Company'] != 'Alpha Manufacturing'],
+                                  before[before['Company'] != 'Alpha Manufacturing'])
+
+    # Writing straight into a handed-out copy does not leak into the next session either
+    session_df = reference_portfolio()
+    session_df.loc[0, 'Investment ($M)'] = 99.0
+    pd.testing.assert_frame_equal(reference_portfolio(), before)
+    pd.testing.assert_frame_equal(portfolio_view(), before)
+
+
+def test_reference_tables_are_read_only():
+    """Coefficient and weight tables reject writes; catalog lookups are independent copies."""
+    with pytest.raises(TypeError):
+        model_coefficients['alpha'] = 0.5
+    with pytest.raises(TypeError):
+        sector_dimension_weight_adjustments['Retail']['Talent'] = 0.5
+    catalog = high_value_use_cases['Retail']
+    catalog.loc[0, 'Use Case'] = 'Edited'
+    catalog['Extra'] = 1
+    assert high_value_use_cases['Retail'].loc[0, 'Use Case'] == 'Demand Forecasting'
+    assert 'Extra' not in high_value_use_cases['Retail']
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from planner import memo as memo_module
+from planner.memo import PersistentMemo, persistent_memo
+from planner.model import simulate_dimension_ratings, high_value_use_cases, estimate_project_parameters
+from planner.seeding import content_digest
+
+
+def _simulate_in_fresh_process(hash_seed):
+    code = (
+        "from planner.model import simulate_dimension_ratings, estimate_project_parameters, high_value_use_cases; "
+        "uc = high_value_use_cases['Retail'].iloc[2]; "
+        "print(simulate_dimension_ratings('Gamma Retail', 'Retail').tolist(), "
+        "estimate_project_parameters(uc, 55.0, 75, 12.0)['Investment ($M)'])"
+    )
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env).stdout
+
+
+def test_simulations_are_identical_across_processes():
+    """
+    Seeds must not depend on Python's per-process string hash salt.
+    """
+    assert _simulate_in_fresh_process(1) == _simulate_in_fresh_process(2)
+
+
+def test_content_digest_is_canonical():
+    assert content_digest('a', 4) == content_digest('a', 4.0)
+    assert content_digest({'x': 1, 'y': 2}) == content_digest({'y': 2, 'x': 1})
+    assert content_digest('Alpha', 'Retail', True) != content_digest('Alpha', 'Retail', False)
+    assert content_digest(pd.Series({'a': 1})) == content_digest(pd.Series({'a': 1.0}))
+
+
+def test_persistent_memo_reuses_results_across_instances(tmp_path):
+    calls = []
+
+    def ratings(company, sector):
+        calls.append(company)
+        return simulate_dimension_ratings(company, sector)
+
+    cached = persistent_memo('ratings', cache_dir=str(tmp_path))(ratings)
+    first = cached('Alpha Manufacturing', 'Manufacturing')
+    first.iloc[0] = 99  # callers get a copy, the cached value is untouched
+    second = cached('Alpha Manufacturing', 'Manufacturing')
+    assert calls == ['Alpha Manufacturing']
+    assert second.iloc[0] != 99
+    assert cached.memo.stats()['hits'] == 1
+
+    # A new process-level memo (e.g. another worker) finds the entry on disk
+    warm = persistent_memo('ratings', cache_dir=str(tmp_path))(ratings)
+    pd.testing.assert_series_equal(warm('Alpha Manufacturing', 'Manufacturing'), second)
+    assert calls == ['Alpha Manufacturing']
+
+
+def test_persistent_memo_ignores_entries_from_another_model_version(tmp_path, monkeypatch):
+    calls = []
+
+    def ratings(company, sector):
+        calls.append(company)
+        return simulate_dimension_ratings(company, sector)
+
+    persistent_memo('ratings', cache_dir=str(tmp_path))(ratings)('Alpha Manufacturing', 'Manufacturing')
+    monkeypatch.setattr(memo_module, 'MEMO_VERSION', memo_module.MEMO_VERSION + 1)
+    persistent_memo('ratings', cache_dir=str(tmp_path))(ratings)('Alpha Manufacturing', 'Manufacturing')
+    assert calls == ['Alpha Manufacturing', 'Alpha Manufacturing']
+
+
+def test_memo_without_directory_stays_in_memory():
+    memo = PersistentMemo('params', cache_dir='')
+    uc = high_value_use_cases['Healthcare'].iloc[0]
+    value = memo.get_or_compute('k', lambda: estimate_project_parameters(uc, 60.0, 78, 8.0))
+    assert memo.get_or_compute('k', lambda: None) == value
+    assert memo.stats() == {'namespace': 'params', 'entries': 1, 'hits': 1, 'misses': 1}
+
+
+def test_memo_evicts_least_recently_used_entries():
+    memo = PersistentMemo('params', cache_dir='', max_entries=2)
+    for key in ('a', 'b', 'a', 'c'):
+        memo.get_or_compute(key, lambda: key.upper())
+    assert memo.get_or_compute('a', lambda: 'recomputed') == 'A'
+    assert memo.get_or_compute('b', lambda: 'recomputed') == 'recomputed'
+    assert memo.stats()['entries'] == 2
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+
+from planner.batch import estimate_project_parameters_batch
+from planner.lattice import default_rating_lattice
+from planner.model import (
+    high_value_use_cases, default_use_cases_for_sector, systematic_opportunity_scores, simulate_dimension_ratings,
+    create_multi_year_plan, calculate_ai_investment_efficiency, assess_exit_readiness, predict_exit_multiple,
+    model_coefficients,
+)
+from planner.sensitivity import (
+    SENSITIVITY_OUTPUTS, sensitivity_parameters, chain_context, evaluate_chain, one_at_a_time, sobol_indices,
+)
+
+SECTOR = 'Manufacturing'
+EXIT_SCORES = (75, 80, 70)
+
+
+def _context():
+    ratings = simulate_dimension_ratings('Alpha Manufacturing', SECTOR)
+    catalog = high_value_use_cases[SECTOR]
+    rows = catalog[catalog['Use Case'].isin(default_use_cases_for_sector[SECTOR])].reset_index(drop=True)
+    return ratings, rows, chain_context(rows, ratings, 9.0, 3, 45, EXIT_SCORES, 6.0)
+
+
+def test_chain_at_base_matches_scalar_model():
+    """At the base parameters the chain reproduces the app's numbers up to display rounding."""
+    ratings, rows, context = _context()
+    outputs = evaluate_chain(sensitivity_parameters(SECTOR).to_frame().T, context).iloc[0]
+
+    V_org_R, org_ai_r = default_rating_lattice().lookup(ratings, SECTOR)
+    planned = estimate_project_parameters_batch(rows, V_org_R, systematic_opportunity_scores[SECTOR], 9.0)
+    plan = create_multi_year_plan('Alpha Manufacturing', org_ai_r, 9.0, planned, systematic_opportunity_scores[SECTOR])
+    exit_multiple = predict_exit_multiple(6.0, assess_exit_readiness(
+        *EXIT_SCORES, model_coefficients['w1_exit'], model_coefficients['w2_exit'], model_coefficients['w3_exit']),
+        model_coefficients['delta_exit'])
+
+    assert np.isclose(outputs['Org-AI-R'], org_ai_r, atol=0.01)
+    assert np.isclose(outputs['Final Org-AI-R'], plan['Org-AI-R'].iloc[-1], atol=0.05)
+    assert np.isclose(outputs['Cumulative EBITDA Impact ($M)'], plan['Cumulative EBITDA Impact ($M)'].iloc[-1], atol=0.05)
+    assert np.isclose(outputs['Exit Multiple'], exit_multiple, atol=0.01)
+    aie = calculate_ai_investment_efficiency(plan['Org-AI-R'].iloc[-1] - org_ai_r, plan['Cumulative Investment ($M)'].iloc[-1],
+                                             plan['Cumulative EBITDA Impact ($M)'].iloc[-1])
+    assert np.isclose(outputs['AIE'], aie, rtol=0.1)
+
+
+def test_tornado_swings_and_sobol_indices():
+    """Known linear effects show up exactly in the tornado and Sobol indices of an additive output sum to 1."""
+    _, _, context = _context()
+    base = sensitivity_parameters(SECTOR)
+    tornado = one_at_a_time(base, context, relative_step=0.1)
+    multiple = tornado[tornado['Output'] == 'Exit Multiple'].set_index('Parameter')
+    exit_ai_r = np.dot([base['w1_exit'], base['w2_exit'], base['w3_exit']], EXIT_SCORES)
+    assert np.isclose(multiple.loc['delta_exit', 'Swing'], 0.2 * base['delta_exit'] * exit_ai_r / 100)
+    assert multiple.index[0] == 'delta_exit'
+    # gamma feeds no output of the current model
+    assert (tornado.loc[tornado['Parameter'] == 'gamma', 'Swing'] == 0).all()
+
+    sobol = sobol_indices(base, context, relative_range=0.1, n_samples=4096)
+    assert set(sobol['Output']) == set(SENSITIVITY_OUTPUTS)
+    screening = sobol[sobol['Output'] == 'Screening Score']
+    assert np.isclose(screening['First Order'].sum(), 1.0, atol=0.1)
+    assert np.isclose(screening['Total'].sum(), 1.0, atol=0.1)
+
+
+def test_full_sweep_is_interactive():
+    """One-at-a-time plus a default Sobol design runs well under a second."""
+    _, _, context = _context()
+    base = sensitivity_parameters(SECTOR)
+    start = time.perf_counter()
+    one_at_a_time(base, context)
+    sobol_indices(base, context)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,162 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planner.batch import estimate_project_parameters_batch, batch_exit_valuation
+from planner.model import high_value_use_cases, create_multi_year_plan, calculate_ai_investment_efficiency
+from planner.reference import reference_portfolio
+from planner.simulation import (
+    initiative_outcome_inputs, simulate_plan_outcomes, summarize_outcomes, OUTCOME_METRICS,
+    simulate_company_exit_valuation, simulate_exit_valuations, default_exit_inputs, valuation_risk_summary,
+    EXIT_COMPANY_COLUMNS, VALUATION_METRICS, success_copula_inputs,
+)
+
+
+def _manufacturing_plan():
+    return estimate_project_parameters_batch(high_value_use_cases['Manufacturing'], 55.0, 72, 9.0,
+                                             include_unadjusted=True)
+
+
+def test_certain_initiatives_reproduce_deterministic_plan():
+    """
+    With Probability of Success = Execution Quality = 1 every path is the point estimate.
+    """
+    plan = _manufacturing_plan().assign(**{'Probability of Success': 1.0, 'Execution Quality': 1.0})
+    plan['EBITDA Impact ($M)'] = 9.0 * plan['EBITDA Impact (%) - Unadjusted'] / 100
+    plan['Delta Org-AI-R'] = np.maximum(plan['Delta Org-AI-R - Unadjusted'], 1)
+    trajectory = create_multi_year_plan('Test Co', 50.0, 9.0, plan, 72, total_years=4)
+
+    samples = simulate_plan_outcomes(plan, 50.0, 9.0, total_years=4, n_paths=100, seed=0)
+
+    final = trajectory.iloc[-1]
+    np.testing.assert_allclose(samples['Cumulative EBITDA Impact ($M)'], final['Cumulative EBITDA Impact ($M)'], atol=0.01)
+    np.testing.assert_allclose(samples['Org-AI-R'], final['Org-AI-R'], atol=0.01)
+    expected_aie = calculate_ai_investment_efficiency(final['Org-AI-R'] - 50.0, final['Cumulative Investment ($M)'],
+                                                      final['Cumulative EBITDA Impact ($M)'])
+    np.testing.assert_allclose(samples['AIE'], expected_aie, rtol=0.02)
+
+
+def test_simulated_mean_ebitda_matches_point_estimate():
+    """
+    Execution-quality noise is centred on the assessed quality, so the simulated mean is
+    the (unrounded) deterministic estimate Probability x Quality x unadjusted impact.
+    """
+    plan = _manufacturing_plan()
+    inputs = initiative_outcome_inputs(plan, 9.0, total_years=5)
+    expected = (inputs['prob_success'] * inputs['exec_quality'] * inputs['ebitda_base_M']) @ inputs['years_live']
+    samples = simulate_plan_outcomes(plan, 50.0, 9.0, total_years=5, n_paths=200_000, seed=3)
+
+    assert samples['Cumulative EBITDA Impact ($M)'].mean() == pytest.approx(expected, rel=0.01)
+    summary = summarize_outcomes(samples)
+    assert list(summary.index) == OUTCOME_METRICS
+    assert (summary['P5'] <= summary['P50']).all() and (summary['P50'] <= summary['P95']).all()
+
+
+def test_results_depend_on_seed_not_worker_count():
+    plan = _manufacturing_plan()
+    serial = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=5_000, seed=42, chunk_paths=1_000)
+    pooled = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=5_000, seed=42, chunk_paths=1_000, n_workers=2)
+    other = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=5_000, seed=43, chunk_paths=1_000)
+
+    for metric in OUTCOME_METRICS:
+        np.testing.assert_array_equal(serial[metric], pooled[metric])
+    assert not np.array_equal(serial['Cumulative EBITDA Impact ($M)'], other['Cumulative EBITDA Impact ($M)'])
+
+
+def test_certain_exit_reproduces_point_valuation():
+    """Certain initiatives, exit scores of 100 and no multiple noise give the Step 6 point estimate on every path."""
+    plan = _manufacturing_plan().assign(**{'Probability of Success': 1.0, 'Execution Quality': 1.0})
+    plan['EBITDA Impact ($M)'] = 9.0 * plan['EBITDA Impact (%) - Unadjusted'] / 100
+    samples = simulate_company_exit_valuation(plan, 9.0, (100, 100, 100), 6.0, total_years=3, n_paths=1_000,
+                                              seed=0, base_multiple_volatility=0.0)
+    cumulative_M = create_multi_year_plan('Co', 50.0, 9.0, plan, 72, 3)['Cumulative EBITDA Impact ($M)'].iloc[-1]
+    point = batch_exit_valuation(100, 100, 100, 6.0, 9.0, cumulative_M)
+    for metric in VALUATION_METRICS:
+        assert np.allclose(samples[metric], point[metric], atol=0.05), metric
+
+
+def test_fund_exit_distribution():
+    """The fund value is the per-path sum over companies; summaries give ordered percentiles and tail risk."""
+    portfolio = reference_portfolio()
+    companies, initiatives = default_exit_inputs(portfolio, np.full(len(portfolio), 50.0))
+    assert list(companies.columns) == EXIT_COMPANY_COLUMNS + ['Sector'] and set(initiatives['Company']) <= set(portfolio['Company'])
+    # A company without initiatives keeps its current EBITDA
+    initiatives = initiatives[initiatives['Company'] != 'Gamma Retail']
+    samples = simulate_exit_valuations(companies, initiatives, n_paths=20_000, seed=1, chunk_paths=7_000,
+                                       metrics=('Projected EBITDA ($M)', 'Implied Valuation ($M)'))
+    assert samples['Implied Valuation ($M)'].shape == (20_000, len(portfolio))
+    assert np.allclose(samples['Implied Valuation ($M)'].sum(axis=1), samples['Fund Implied Valuation ($M)'])
+    assert (samples['Projected EBITDA ($M)'][:, 2] == 12.0).all()
+    pooled = simulate_exit_valuations(companies, initiatives, n_paths=20_000, seed=1, chunk_paths=7_000, n_workers=2)
+    assert np.array_equal(pooled['Fund Implied Valuation ($M)'], samples['Fund Implied Valuation ($M)'])
+
+    summary = valuation_risk_summary({'Fund': samples['Fund Implied Valuation ($M)']}).loc['Fund']
+    assert summary['P1'] < summary['P5'] < summary['P50'] < summary['P95'] < summary['P99']
+    assert 0 < summary['VaR 95%'] < summary['ES 95%'] < summary['ES 99%']
+    assert summary['VaR 95%'] == pytest.approx(summary['Mean'] - summary['P5'])
+
+
+def test_correlated_success_copula():
+    """The copula keeps each success probability, makes failures cluster, and bounds chunk memory."""
+    plan = _manufacturing_plan()
+    p = plan['Probability of Success'].to_numpy()
+    independent = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=50_000, seed=0)
+    correlated = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=50_000, seed=0, sector='Manufacturing',
+                                        success_correlation={'sector': {'Manufacturing': 0.3}, 'company': 0.3,
+                                                             'complexity': 0.1})
+    assert correlated['Initiatives Succeeded'].var() > 1.5 * independent['Initiatives Succeeded'].var()
+    assert correlated['Initiatives Succeeded'].mean() == pytest.approx(independent['Initiatives Succeeded'].mean(),
+                                                                        rel=0.02)
+
+    with pytest.raises(ValueError):
+        success_copula_inputs({'sector': 0.6, 'company': 0.6}, p, [None] * 4, [0] * 4, plan['Complexity'])
+    # 4 initiatives in at most 4,000 cells: correlated chunks of 1,000 paths
+    capped = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=5_000, seed=42, max_chunk_cells=4_000,
+                                    success_correlation={'company': 0.2})
+    chunked = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=5_000, seed=42, chunk_paths=1_000,
+                                     success_correlation={'company': 0.2})
+    assert np.array_equal(capped['AIE'], chunked['AIE'])
+
+    portfolio = reference_portfolio()
+    companies, initiatives = default_exit_inputs(portfolio, np.full(len(portfolio), 50.0))
+    fund = simulate_exit_valuations(companies, initiatives, n_paths=2_000, seed=0, max_chunk_cells=10_000,
+                                    success_correlation={'sector': {'Retail': 0.5}, 'company': 0.2})
+    assert fund['Implied Valuation ($M)'].shape == (2_000, len(portfolio))
+
+
+def test_named_correlations_and_independent_draws():
+    """
+    Per-company rhos are keyed by company name, a sector rho needs sectors, and independent
+    runs keep the draws of the uncorrelated engine.
+    """
+    portfolio = reference_portfolio()
+    companies, initiatives = default_exit_inputs(portfolio, np.full(len(portfolio), 50.0))
+    metrics = ('Projected EBITDA ($M)',)
+    independent = simulate_exit_valuations(companies, initiatives, n_paths=20_000, seed=0, metrics=metrics)
+    correlated = simulate_exit_valuations(companies, initiatives, n_paths=20_000, seed=0, metrics=metrics,
+                                          success_correlation={'company': {'Alpha Manufacturing': 0.9}})
+    variance_ratio = correlated['Projected EBITDA ($M)'].var(axis=0) / independent['Projected EBITDA ($M)'].var(axis=0)
+    assert variance_ratio[0] > 1.25 and np.allclose(variance_ratio[1:], 1.0, atol=0.1)
+    with pytest.raises(ValueError, match='sector'):
+        simulate_exit_valuations(companies.drop(columns='Sector'), initiatives, n_paths=100,
+                                 success_correlation={'sector': 0.3})
+
+    fund = simulate_exit_valuations(companies, initiatives, n_paths=3_000, seed=1)['Fund Implied Valuation ($M)']
+    np.testing.assert_allclose(fund[:3], [710.4644141, 717.92176992, 697.34731124], rtol=1e-9)
+
+
+def test_wide_independent_run_stays_within_chunk_cap():
+    """Without success_correlation the chunk cell cap still bounds paths x initiatives per chunk."""
+    plan = pd.concat([_manufacturing_plan()] * 250, ignore_index=True)
+    tracemalloc.start()
+    try:
+        capped = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=20_000, seed=3, max_chunk_cells=100_000)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # One uncapped chunk would hold 20,000 x 1,000 float64 draws (160 MB) per array
+    assert peak < 32 * 2**20
+    chunked = simulate_plan_outcomes(plan, 50.0, 9.0, n_paths=20_000, seed=3, chunk_paths=100_000 // len(plan))
+    assert np.array_equal(capped['AIE'], chunked['AIE'])
@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+
+from planner.batch import DIMENSIONS
+from planner.model import high_value_use_cases, simulate_dimension_ratings
+from planner.state import PlannerState, rating_widget_key, override_widget_key, stale_widget_keys
+
+
+def _reset(state, company, sector):
+    current = simulate_dimension_ratings(company, sector)
+    target = simulate_dimension_ratings(company, sector, is_target=True)
+    state.reset(company, sector, current, target, high_value_use_cases[sector]['Use Case'])
+    return current
+
+
+def test_ratings_and_overrides_round_trip():
+    """Ratings come back as ints per dimension and overrides as the 'User ...' batch columns."""
+    state = PlannerState()
+    current = _reset(state, 'Alpha Manufacturing', 'Manufacturing')
+    assert state.ratings.dtype == np.uint8
+    assert state.ratings_series('current').to_dict() == current.to_dict()
+    state.set_rating('target', 'Talent', 5)
+    assert state.rating('target', 'Talent') == 5
+
+    assert not state.has_override('Demand Forecasting')
+    state.set_override('Demand Forecasting', investment=1.5, prob_success=0.8, exec_quality=0.7)
+    state.set_override('Predictive Maintenance', investment=0.4, prob_success=0.6, exec_quality=0.9)
+    assert state.override('Demand Forecasting') == {'investment': 1.5, 'prob_success': 0.8, 'exec_quality': 0.7}
+    columns = state.override_columns(['Predictive Maintenance', 'Demand Forecasting'])
+    np.testing.assert_array_equal(columns['User Investment ($M)'], [0.4, 1.5])
+    np.testing.assert_array_equal(columns['User Execution Quality'], [0.9, 0.7])
+
+
+def test_company_switch_drops_previous_state_and_size_stays_flat():
+    """A new company replaces every rating and override, and the pickled state does not grow."""
+    state = PlannerState()
+    _reset(state, 'Alpha Manufacturing', 'Manufacturing')
+    for use_case in state.use_cases:
+        state.set_override(use_case, investment=1.0, prob_success=0.8, exec_quality=0.8)
+    size = len(pickle.dumps(state))
+
+    _reset(state, 'Beta Healthcare', 'Healthcare')
+    assert state.company == 'Beta Healthcare' and 'Predictive Maintenance' not in state.use_cases
+    assert not any(state.has_override(use_case) for use_case in state.use_cases)
+    for use_case in state.use_cases:
+        state.set_override(use_case, investment=1.0, prob_success=0.8, exec_quality=0.8)
+    assert len(pickle.dumps(state)) <= size + 64
+
+    keys = ['selected_company', 'planning_horizon', rating_widget_key('current', DIMENSIONS[0]),
+            override_widget_key('exec_quality', 'Demand Forecasting'), 'investment_predictive_maintenance']
+    assert stale_widget_keys(keys) == keys[2:]